@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: translation history search latency, full-text index vs LIKE scan.
+
+Fills a temporary history database with synthetic entries and times the
+queries an as-you-type search issues, once through HistoryStore.search (FTS5
+trigram index) and once as a plain LIKE scan over every row.
+
+Usage:
+    python benchmarks/bench_history_search.py [--entries N] [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transpaste.core.history import HistoryStore, RetentionPolicy, TranslationEntry
+
+WORDS = ("meeting", "invoice", "weather", "tomorrow", "contract", "delivery", "kitchen", "station",
+         "morning", "report", "garden", "ticket", "budget", "holiday", "printer", "library")
+QUERIES = ("m", "mo", "mor", "morn", "morning", "morning rep", "invoice delivery", "#4242", "kitchen #77", "xyzzy")
+
+
+def fill(store, entries):
+    rng = random.Random(0)
+    batch = []
+    for i in range(entries):
+        text = " ".join(rng.choice(WORDS) for _ in range(12)) + f" #{i}"
+        batch.append(TranslationEntry.now(text, text.upper(), "English", "French"))
+        if len(batch) == 5_000:
+            store.add_many(batch)
+            batch = []
+    store.add_many(batch)
+
+
+def like_scan(store, query, limit=100):
+    sql = "SELECT id FROM history WHERE 1"
+    params = []
+    for term in query.split():
+        sql += " AND (original LIKE ? OR translated LIKE ?)"
+        params.extend([f"%{term}%"] * 2)
+    return store._db.execute(sql + " ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.sqlite3"), RetentionPolicy(max_entries=None))
+        fill(store, args.entries)
+        print(f"{len(store)} entries, full-text index: {store.has_fts}\n")
+        print(f"{'query':<20} {'LIKE scan':>12} {'search()':>12}")
+        for query in QUERIES:
+            scan_ms = timed(lambda: like_scan(store, query), args.repeat)
+            search_ms = timed(lambda: store.search(query, 100), args.repeat)
+            print(f"{query!r:<20} {scan_ms:9.2f} ms {search_ms:9.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request latency of bare requests.post vs the pooled OllamaClient.
+
+Runs the test suite's MockOllamaHandler over HTTP/1.1 (like a real Ollama
+server) and streams a short generation N times with each strategy.
+
+Usage:
+    python benchmarks/bench_http_pool.py [--requests N]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import requests
+
+from tests.test_transpaste import MockOllamaHandler, find_free_port
+from transpaste.core.client import OllamaClient
+
+
+class KeepAliveOllamaHandler(MockOllamaHandler):
+    """MockOllamaHandler speaking HTTP/1.1 with chunked streaming, so connections can be reused"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Ollama's Go server disables Nagle; without this, small chunk writes on a
+        # reused connection stall on delayed ACKs and the comparison is meaningless.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def do_POST(self):
+        content_length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(content_length)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for char in MockOllamaHandler.response_text:
+            self._write_chunk((json.dumps({"response": char, "done": False}) + "\n").encode())
+        self._write_chunk((json.dumps({"response": "", "done": True}) + "\n").encode())
+        self._write_chunk(b"")
+        self.wfile.flush()
+
+
+def consume(response):
+    for _ in response.iter_lines():
+        pass
+    response.close()
+
+
+def bench(label, send, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        send()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<28} mean {statistics.mean(samples):7.3f} ms   "
+          f"p50 {statistics.median(samples):7.3f} ms   "
+          f"p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    port = find_free_port()
+    server = ThreadingHTTPServer(('localhost', port), KeepAliveOllamaHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base_url = f"http://localhost:{port}"
+    payload = {"model": "test-model:latest", "prompt": "Hello", "stream": True}
+
+    def bare():
+        consume(requests.post(f"{base_url}/api/generate", json=payload, stream=True, timeout=10))
+
+    client = OllamaClient(base_url)
+
+    def pooled():
+        consume(client.generate(payload))
+
+    print(f"{args.requests} streamed generate requests against MockOllamaHandler\n")
+    bare()
+    pooled()
+    bench("before: bare requests.post", bare, args.requests)
+    bench("after:  pooled OllamaClient", pooled, args.requests)
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
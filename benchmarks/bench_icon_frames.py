@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tray animation frames per CPU-millisecond, repainting vs cached frames.
+
+Simulates the 80 ms animation timer over a series of translations whose
+progress ramps from 0 to 100%, producing the same (progress, rotation)
+sequence as ClipboardTranslator._update_animation, and measures CPU time per
+frame.
+
+Usage:
+    python benchmarks/bench_icon_frames.py [--translations N] [--frames-per-translation N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PySide6.QtWidgets import QApplication
+
+from transpaste.main import IconGenerator
+
+
+def animation_sequence(translations, frames_per_translation):
+    rotation = 0
+    for _ in range(translations):
+        for i in range(frames_per_translation):
+            rotation = (rotation + 15) % 360
+            yield i / frames_per_translation, rotation
+
+
+def bench(label, make_icon, frames):
+    start = time.process_time()
+    for progress, rotation in frames:
+        make_icon(IconGenerator.STATUS_TRANSLATING, progress, rotation)
+    cpu_ms = (time.process_time() - start) * 1000
+    print(f"{label:<30} {cpu_ms:9.1f} CPU ms   {len(frames) / cpu_ms:9.2f} frames/CPU-ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--translations", type=int, default=50)
+    parser.add_argument("--frames-per-translation", type=int, default=60)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+
+    frames = list(animation_sequence(args.translations, args.frames_per_translation))
+    print(f"{args.translations} translations x {args.frames_per_translation} frames "
+          f"(~{len(frames) * 80 / 1000:.0f} s of animation)\n")
+    bench("before: repaint every tick", IconGenerator().render_icon, frames)
+    bench("after:  cached frames", IconGenerator().create_icon, frames)
+
+
+if __name__ == "__main__":
+    main()
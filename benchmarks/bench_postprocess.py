@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: post-processing large translations, per-call regexes vs the cleaner pipeline.
+
+Cleans synthetic model outputs of growing size with the old post_process
+(five re.sub prefix patterns with string flags, then a DOTALL markdown
+re.sub over the whole text) and with the compiled cleaner pipeline, once
+with the default cleaners and once with every built-in cleaner enabled.
+Half of the outputs carry a chatty prefix and a code fence, half are clean.
+
+Usage:
+    python benchmarks/bench_postprocess.py [--sizes 1000,100000,1000000] [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transpaste.core.postprocess import cleaner_names, post_process
+
+WORDS = ("le", "rapport", "trimestriel", "montre", "une", "hausse", "des", "ventes", "dans", "toutes", "les",
+         "régions", "et", "prévisions", "pour", "année", "prochaine", "sont", "positives")
+
+
+def legacy_post_process(translated_text, original):
+    """post_process() as it was before the cleaner pipeline."""
+    prefixes = [
+        r"^Here is the translation.*?:",
+        r"^Here's the translation.*?:",
+        r"^Sure, here is the translation.*?:",
+        r"^Translation:",
+        r"^Translated text:",
+    ]
+    for p in prefixes:
+        translated_text = re.sub(p, "", translated_text, flags=re.IGNORECASE).strip()
+
+    markdown_pattern = r"^```(?:text|markdown)?\s*\n?(.*?)\n?```$"
+    translated_text = re.sub(markdown_pattern, r"\1", translated_text, flags=re.DOTALL).strip()
+
+    original = original.strip()
+    original_has_quotes = (original.startswith('"') and original.endswith('"')) or (
+        original.startswith("'") and original.endswith("'")
+    )
+    if not original_has_quotes:
+        if translated_text.startswith('"') and translated_text.endswith('"'):
+            translated_text = translated_text[1:-1].strip()
+        elif translated_text.startswith("'") and translated_text.endswith("'"):
+            translated_text = translated_text[1:-1].strip()
+    return translated_text
+
+
+def outputs(size):
+    rng = random.Random(size)
+    body = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "."
+        body.append(sentence)
+        length += len(sentence) + 1
+    text = " ".join(body)
+    return [text, f"Here is the translation into French:\n```text\n{text}\n```"]
+
+
+def timed(fn, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma-separated output sizes in characters")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    every = [name for name in cleaner_names()]
+    variants = [
+        ("per-call re.sub", lambda text: legacy_post_process(text, "source")),
+        ("pipeline (default)", lambda text: post_process(text, "source")),
+        ("pipeline (all cleaners)", lambda text: post_process(text, "source", every)),
+    ]
+    print(f"{'output size':>12}  " + "  ".join(f"{name:>24}" for name, _ in variants))
+    for size in (int(value) for value in args.sizes.split(",")):
+        texts = outputs(size)
+        expected = legacy_post_process(texts[1], "source")
+        assert post_process(texts[1], "source") == expected, "pipeline disagrees with the old post_process"
+        row = [timed(fn, texts, args.repeat) for _, fn in variants]
+        print(f"{size:>12,}  " + "  ".join(f"{ms:>21.3f} ms" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
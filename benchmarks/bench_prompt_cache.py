@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt evaluation per request, /api/generate prompt vs /api/chat system message.
+
+Translates the same series of short texts in each request mode and reports
+Ollama's prompt_eval_count and prompt_eval_duration. Tokens Ollama can serve
+from its KV cache (a prefix identical to the previous request) are not
+evaluated again, so the fewer prompt tokens per request, the better the
+instruction prefix is being reused.
+
+Needs a running Ollama server with the model pulled. --mock runs against a
+local stand-in that evaluates 4 characters per token at 1 ms per token and
+caches the longest common prefix of consecutive prompts, for a quick
+self-contained run. Such a pure prefix cache reuses the instructions in
+both modes, so the mock shows them level; on a real server the difference
+depends on how the model's template renders a bare prompt versus a system
+message.
+
+Usage:
+    python benchmarks/bench_prompt_cache.py [--base-url URL] [--model NAME] [--requests N] [--mock]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from transpaste.core.client import OllamaClient
+from transpaste.core.config import DEFAULT_MODEL, OLLAMA_API_URL
+from transpaste.core.prompt import build_messages, build_prompt
+
+TEXTS = [
+    "The deployment finished without errors.",
+    "Please restart the service after updating the configuration file.",
+    "Disk usage on node 7 is above 90 percent.",
+    "The meeting has been moved to Thursday afternoon.",
+    "Could you review the pull request before lunch?",
+    "Backups are stored for thirty days.",
+    "Login attempts from unknown devices are blocked.",
+    "The invoice was sent to the billing address on file.",
+]
+SETTINGS = ("English", "en", "French", "fr")
+STYLE, LENGTH = "Technical", "Unlimited"
+
+
+class PrefixCachingHandler(BaseHTTPRequestHandler):
+    """Answers generate and chat requests, charging only for the prompt beyond the cached prefix"""
+
+    cached = ""
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if self.path == "/api/chat":
+            # Roughly how a chat template renders: one block per message, in order.
+            rendered = "".join(f"<{m['role']}>{m['content']}</{m['role']}>" for m in data["messages"])
+        else:
+            rendered = f"<user>{data['prompt']}</user>"
+        with PrefixCachingHandler.lock:
+            common = len(os.path.commonprefix([PrefixCachingHandler.cached, rendered]))
+            PrefixCachingHandler.cached = rendered
+        tokens = -(-(len(rendered) - common) // 4)
+        body = {"done": True, "prompt_eval_count": tokens, "prompt_eval_duration": tokens * 1_000_000}
+        body.update({"message": {"role": "assistant", "content": "ok"}} if "messages" in data else {"response": "ok"})
+        encoded = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+def run(client, model, mode, count):
+    """Send count translations in one mode; return per-request (prompt_eval_count, prompt_eval_ms)."""
+    samples = []
+    # The first request fills the cache; only the ones after it are measured.
+    for i in range(count + 1):
+        text = TEXTS[i % len(TEXTS)]
+        payload = {"model": model, "stream": False, "options": {"temperature": 0, "num_predict": 1}}
+        if mode == "chat":
+            payload["messages"] = build_messages(*SETTINGS[:2], *SETTINGS[2:], text, STYLE, LENGTH)
+            response = client.chat(payload, stream=False)
+        else:
+            payload["prompt"] = build_prompt(*SETTINGS[:2], *SETTINGS[2:], text, STYLE, LENGTH)
+            response = client.generate(payload, stream=False)
+        data = response.json()
+        if i:
+            samples.append((data.get("prompt_eval_count", 0), data.get("prompt_eval_duration", 0) / 1e6))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=OLLAMA_API_URL)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--mock", action="store_true", help="use a local prefix-caching stand-in for Ollama")
+    args = parser.parse_args()
+
+    server = None
+    if args.mock:
+        server = ThreadingHTTPServer(("localhost", 0), PrefixCachingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        args.base_url = f"http://localhost:{server.server_address[1]}"
+
+    client = OllamaClient(args.base_url)
+    print(f"{args.requests} translations per mode, model {args.model} at {args.base_url}\n")
+    print(f"{'mode':<10} {'prompt tokens (mean)':>22} {'prompt eval p50':>17} {'prompt eval mean':>18}")
+    for mode in ("generate", "chat"):
+        samples = run(client, args.model, mode, args.requests)
+        counts = [count for count, _ in samples]
+        durations = [ms for _, ms in samples]
+        print(
+            f"{mode:<10} {statistics.mean(counts):>22.1f} "
+            f"{statistics.median(durations):>14.2f} ms {statistics.mean(durations):>15.2f} ms"
+        )
+
+    client.close()
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
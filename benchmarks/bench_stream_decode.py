@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: reading a long streamed generation, per-line decoding vs the incremental decoder.
+
+Replays a recorded Ollama stream of 50,000 tokens from memory, so only the
+client-side parsing is measured. "per-line" is how the stream used to be read:
+iter_lines(), decode and json.loads each line and grow the text with +=.
+"incremental" is Translator._read_stream: NDJSONDecoder over iter_content()
+collecting into a TokenBuffer, timed with the json module and, if it is
+installed, with orjson. (The progress preview is left out of both: it is
+rate-limited and no longer built per token.)
+
+--record FILE replays a stream saved from a real server instead, e.g.
+    curl -sN localhost:11434/api/chat -d '{"model": "...", "messages": [...]}' > stream.ndjson
+
+Usage:
+    python benchmarks/bench_stream_decode.py [--tokens N] [--repeat N] [--record FILE]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import transpaste.core.stream as stream
+from transpaste.core.translator import Translator
+
+WORDS = ("le", "la", "traduction", "du", "presse-papiers", "est", "terminée", "et", "réseau", "modèle",
+         "français", "serveur", "rapidement", "données", "fichier", "été", "très", ".", ",", "\n")
+
+
+def record(tokens):
+    """Return a chat-mode stream of the given number of tokens, as Ollama sends it."""
+    rng = random.Random(0)
+    lines = []
+    for _ in range(tokens):
+        word = rng.choice(WORDS)
+        token = word if word in ".,\n" else " " + word
+        message = {"model": "m", "created_at": "2026-01-01T00:00:00.000000Z",
+                   "message": {"role": "assistant", "content": token}, "done": False}
+        lines.append(json.dumps(message, ensure_ascii=False))
+    lines.append(json.dumps({"model": "m", "message": {"role": "assistant", "content": ""}, "done": True,
+                             "eval_count": tokens, "eval_duration": tokens * 20_000_000}))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def response_for(raw):
+    response = requests.Response()
+    response.raw = io.BytesIO(raw)
+    response.status_code = 200
+    return response
+
+
+def per_line(raw):
+    text = ""
+    for line in response_for(raw).iter_lines():
+        if line:
+            data = json.loads(line.decode("utf-8"))
+            text += data["message"].get("content", "") if "message" in data else data.get("response", "")
+            if data.get("done"):
+                break
+    return text
+
+
+def incremental(backend):
+    def read(raw):
+        stream.JSON_BACKEND = backend
+        return Translator({"model": "m"})._read_stream(response_for(raw))
+
+    return read
+
+
+def timed(fn, raw, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(raw)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--record", help="replay this saved NDJSON stream instead of a synthetic one")
+    args = parser.parse_args()
+
+    if args.record:
+        with open(args.record, "rb") as f:
+            raw = f.read()
+    else:
+        raw = record(args.tokens)
+    lines = raw.count(b"\n")
+    print(f"{lines} stream lines, {len(raw) / 1e6:.1f} MB, best of {args.repeat}\n")
+    print(f"{'reader':<12} {'backend':<8} {'total':>10} {'per token':>11}")
+    readers = [("per-line", per_line, "json"), ("incremental", incremental("json"), "json")]
+    if stream.orjson is not None:
+        readers.append(("incremental", incremental("orjson"), "orjson"))
+    texts = []
+    for name, fn, backend in readers:
+        ms, text = timed(fn, raw, args.repeat)
+        texts.append(text)
+        print(f"{name:<12} {backend:<8} {ms:>7.1f} ms {ms * 1000 / lines:>8.2f} us")
+    assert all(text == texts[0] for text in texts), "readers disagree"
+
+
+if __name__ == "__main__":
+    main()
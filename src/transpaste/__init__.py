@@ -1,21 +1,31 @@
-"""TransPaste - Local LLM Clipboard Translator."""
+"""TransPaste - Local LLM Clipboard Translator.
 
-from .main import (
-    LANGUAGE_MAP,
-    LENGTH_OPTIONS,
-    TRANSLATION_STYLES,
-    AboutDialog,
-    ClipboardTranslator,
-    IconGenerator,
-    TranslationEntry,
-    TranslatorWorker,
-    build_prompt,
-    main,
-    setup_logging,
-)
+Attributes are resolved lazily so that importing the package, or the
+headless ``transpaste.cli``, never loads PySide6 unless a Qt class is used.
+"""
+
+import importlib
+from typing import Any
 
 __version__ = "0.3.5"
 
+_LAZY_ATTRIBUTES = {
+    "main": "transpaste.cli",
+    "build_prompt": "transpaste.core.prompt",
+    "LANGUAGE_MAP": "transpaste.core.prompt",
+    "TRANSLATION_STYLES": "transpaste.core.prompt",
+    "LENGTH_OPTIONS": "transpaste.core.prompt",
+    "setup_logging": "transpaste.core.log",
+    "Translator": "transpaste.core.translator",
+    "TranslationError": "transpaste.core.translator",
+    "IconGenerator": "transpaste.main",
+    "TranslatorWorker": "transpaste.main",
+    "ClipboardTranslator": "transpaste.main",
+    "AboutDialog": "transpaste.main",
+    "TranslationEntry": "transpaste.core.history",
+    "HistoryStore": "transpaste.core.history",
+}
+
 __all__ = [
     "main",
     "build_prompt",
@@ -28,4 +38,16 @@ __all__ = [
     "TRANSLATION_STYLES",
     "LENGTH_OPTIONS",
     "setup_logging",
+    "Translator",
+    "TranslationError",
+    "HistoryStore",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
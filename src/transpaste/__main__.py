@@ -0,0 +1,6 @@
+"""Allow ``python -m transpaste``."""
+
+from transpaste.cli import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""Command-line entry point.
+
+``transpaste`` starts the system tray application. ``transpaste translate``
+translates files or stdin headlessly, using the same prompt, post-processing
+and translation cache as the tray app, without loading PySide6.
+``transpaste history`` searches the tray app's translation history.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, TextIO
+
+from transpaste.core.balancer import BalancedClient, parse_endpoints
+from transpaste.core.cache import TranslationCache, default_cache_path
+from transpaste.core.client import DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE
+from transpaste.core.config import API_MODES, DEFAULT_API, DEFAULT_MODEL, OLLAMA_API_URL
+from transpaste.core.history import HistoryStore, default_history_path
+from transpaste.core.log import log, setup_logging
+from transpaste.core.postprocess import cleaner_names
+from transpaste.core.prompt import LANGUAGE_MAP, LENGTH_OPTIONS, TRANSLATION_STYLES
+from transpaste.core.segment import DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_WORKERS
+from transpaste.core.translator import TranslationError, Translator
+from transpaste.core.warmup import DEFAULT_KEEP_ALIVE
+
+STDIN_NAME = "<stdin>"
+
+
+@dataclass
+class BatchItem:
+    """One text to translate in batch mode.
+
+    Attributes:
+        source: Input file path, or STDIN_NAME.
+        line: 1-based line number in --lines mode, otherwise None.
+        text: The text to translate.
+    """
+
+    source: str
+    line: Optional[int]
+    text: str
+
+
+@dataclass
+class BatchResult:
+    """Outcome of translating one BatchItem.
+
+    Attributes:
+        item: The translated item.
+        translated: The translation, or None on error.
+        error: Error message, or None on success.
+        cached: Whether the translation came from the cache.
+    """
+
+    item: BatchItem
+    translated: Optional[str] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+
+def build_translate_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the ``translate`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="transpaste translate",
+        description="Translate files or stdin with a local Ollama model, without the tray UI",
+    )
+    parser.add_argument("inputs", nargs="*", help="Files or glob patterns to translate; '-' or nothing reads stdin")
+    parser.add_argument("--lines", action="store_true", help="Translate each non-empty line separately")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text", help="Output format")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Write all output to this file")
+    parser.add_argument(
+        "--output-dir", type=str, default=None, help="Write one translated file per input file into this directory"
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of concurrent translation requests")
+    parser.add_argument("--model", type=str, default=DEFAULT_MODEL, help="Ollama model to use")
+    parser.add_argument("--source", type=str, default="Auto Detect", help="Source language")
+    parser.add_argument("--target", type=str, default="English", help="Target language")
+    parser.add_argument("--style", type=str, default="Default", help="Translation style")
+    parser.add_argument("--length", type=str, default="Unlimited", help="Length control")
+    parser.add_argument("--temperature", type=float, default=0.3, help="Model temperature")
+    parser.add_argument("--custom-prompt", type=str, default="", help="Custom prompt, as set in the tray app")
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default=OLLAMA_API_URL,
+        help="Ollama API base URL; separate several with commas to balance across them",
+    )
+    parser.add_argument("--proxy", type=str, default=None, help="HTTP proxy URL (e.g., http://127.0.0.1:7890)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_MAX_RETRIES, help="Retries for failed connections")
+    parser.add_argument(
+        "--keep-alive", type=str, default=DEFAULT_KEEP_ALIVE, help="How long Ollama keeps the model loaded"
+    )
+    parser.add_argument(
+        "--api",
+        choices=API_MODES,
+        default=DEFAULT_API,
+        help="Ollama API: chat (instructions in a cacheable system message) or generate (one prompt)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Split texts longer than this many characters"
+    )
+    parser.add_argument(
+        "--chunk-workers", type=int, default=DEFAULT_CHUNK_WORKERS, help="Chunks translated concurrently per text"
+    )
+    parser.add_argument("--keep-code", action="store_true", help="Leave fenced code blocks untranslated")
+    parser.add_argument(
+        "--cleaner",
+        dest="cleaners",
+        action="append",
+        choices=cleaner_names(optional=True),
+        default=[],
+        help="Extra post-processing step, e.g. thinking (strip <think> blocks); repeat for several",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the translation cache")
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    return parser
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """Expand glob patterns into file paths, keeping order and dropping duplicates.
+
+    Args:
+        patterns: Paths, glob patterns, or '-' for stdin.
+
+    Returns:
+        Paths to read, with '-' standing for stdin.
+
+    Raises:
+        FileNotFoundError: If a pattern matches nothing.
+    """
+    if not patterns:
+        return ["-"]
+
+    paths: List[str] = []
+    for pattern in patterns:
+        if pattern == "-":
+            matches = ["-"]
+        elif glob.has_magic(pattern):
+            matches = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+        else:
+            matches = [pattern] if os.path.isfile(pattern) else []
+        if not matches:
+            raise FileNotFoundError(f"No input files match: {pattern}")
+        paths.extend(p for p in matches if p not in paths)
+    return paths
+
+
+def iter_items(paths: List[str], lines: bool, stdin: TextIO) -> Iterator[BatchItem]:
+    """Yield the texts to translate from the given inputs.
+
+    Args:
+        paths: Paths from expand_inputs().
+        lines: If True, yield every non-empty line as its own item.
+        stdin: Stream read for the '-' path.
+
+    Yields:
+        Batch items in input order.
+    """
+    for path in paths:
+        if path == "-":
+            source, stream = STDIN_NAME, stdin
+        else:
+            source, stream = path, open(path, encoding="utf-8")
+        try:
+            if lines:
+                for number, line in enumerate(stream, start=1):
+                    text = line.rstrip("\r\n")
+                    if text.strip():
+                        yield BatchItem(source, number, text)
+            else:
+                text = stream.read()
+                if text.strip():
+                    yield BatchItem(source, None, text)
+        finally:
+            if stream is not stdin:
+                stream.close()
+
+
+def ordered_map(
+    fn: Callable[[BatchItem], BatchResult],
+    items: Iterable[BatchItem],
+    jobs: int,
+    cancel: Optional[Callable[[], None]] = None,
+) -> Iterator[BatchResult]:
+    """Apply fn to items on a thread pool, yielding results in input order as soon as they are ready.
+
+    At most ``jobs * 4`` items are in flight, so arbitrarily long inputs are
+    streamed rather than read into memory up front. If the caller stops early
+    (KeyboardInterrupt, or closing the generator), queued items are dropped
+    and cancel is called before waiting for the running ones.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    window: Deque = deque()
+    try:
+        for item in items:
+            window.append(pool.submit(fn, item))
+            if len(window) >= jobs * 4:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        if cancel is not None:
+            cancel()
+        raise
+    finally:
+        pool.shutdown(wait=True)
+
+
+def format_jsonl(result: BatchResult) -> str:
+    """Serialize a result as one JSON line."""
+    record: Dict[str, Any] = {"source": result.item.source}
+    if result.item.line is not None:
+        record["line"] = result.item.line
+    record["original"] = result.item.text
+    record["translated"] = result.translated
+    if result.error is not None:
+        record["error"] = result.error
+    record["cached"] = result.cached
+    return json.dumps(record, ensure_ascii=False)
+
+
+def _output_path(output_dir: str, source: str, target_code: str) -> str:
+    """Return the output file for an input file, e.g. 'notes.md' -> 'DIR/notes.fr.md'."""
+    name = "stdin.txt" if source == STDIN_NAME else os.path.basename(source)
+    stem, ext = os.path.splitext(name)
+    return os.path.join(output_dir, f"{stem}.{target_code}{ext}")
+
+
+def translate_command(argv: List[str], stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout) -> int:
+    """Run ``transpaste translate``.
+
+    Args:
+        argv: Arguments after the subcommand name.
+        stdin: Stream read for '-' inputs.
+        stdout: Stream written when no output file is given.
+
+    Returns:
+        Process exit code: 0 on success, 1 if any item failed, 2 on bad input.
+    """
+    parser = build_translate_parser()
+    args = parser.parse_args(argv)
+    if args.output and args.output_dir:
+        parser.error("--output and --output-dir are mutually exclusive")
+    if args.output_dir and args.format != "text":
+        parser.error("--output-dir only supports --format text")
+    for value, table, flag in [
+        (args.source, LANGUAGE_MAP, "--source"),
+        (args.target, LANGUAGE_MAP, "--target"),
+        (args.style, TRANSLATION_STYLES, "--style"),
+        (args.length, LENGTH_OPTIONS, "--length"),
+    ]:
+        if value not in table:
+            parser.error(f"{flag} must be one of: {', '.join(table)}")
+
+    setup_logging(debug=args.debug)
+
+    try:
+        paths = expand_inputs(args.inputs)
+    except FileNotFoundError as e:
+        print(f"transpaste: {e}", file=sys.stderr)
+        return 2
+
+    proxies = {"http": args.proxy, "https": args.proxy} if args.proxy else None
+    jobs = max(1, args.jobs)
+    client = BalancedClient(
+        parse_endpoints(args.base_url),
+        proxies=proxies,
+        pool_size=max(DEFAULT_POOL_SIZE, jobs * args.chunk_workers),
+        max_retries=args.retries,
+    )
+    config = {
+        "source_lang": args.source,
+        "target_lang": args.target,
+        "model": args.model,
+        "style": args.style,
+        "length": args.length,
+        "temperature": args.temperature,
+        "base_url": args.base_url,
+        "custom_prompt": args.custom_prompt,
+        "chunk_size": args.chunk_size,
+        "chunk_workers": args.chunk_workers,
+        "preserve_code": args.keep_code,
+        "keep_alive": args.keep_alive,
+        "api": args.api,
+        "cleaners": args.cleaners,
+    }
+    cache = None if args.no_cache else TranslationCache(default_cache_path())
+    # A Translator keeps per-call state (stats, timings), so each item gets its own.
+    running: Set[Translator] = set()
+    running_lock = threading.Lock()
+    interrupted = False
+
+    def cancel_running() -> None:
+        nonlocal interrupted
+        with running_lock:
+            interrupted = True
+            for translator in running:
+                translator.cancel()
+
+    def translate_item(item: BatchItem) -> BatchResult:
+        key = TranslationCache.make_key(item.text, config)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return BatchResult(item, translated=cached, cached=True)
+        translator = Translator(config, client)
+        with running_lock:
+            if interrupted:
+                return BatchResult(item, error="Cancelled")
+            running.add(translator)
+        try:
+            translated = translator.translate(item.text)
+        except TranslationError as e:
+            return BatchResult(item, error=str(e))
+        finally:
+            with running_lock:
+                running.discard(translator)
+        if translated is None:
+            return BatchResult(item, error="Cancelled")
+        if cache is not None:
+            cache.put(key, translated)
+        return BatchResult(item, translated=translated)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else stdout
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    target_code = LANGUAGE_MAP[args.target]
+    # One open file per input in --output-dir mode; inputs arrive in order, so
+    # a file is finished as soon as the next source starts.
+    current_source: Optional[str] = None
+    failures = 0
+    results = ordered_map(translate_item, iter_items(paths, args.lines, stdin), jobs, cancel_running)
+    try:
+        for result in results:
+            item = result.item
+            if result.error is not None:
+                failures += 1
+                where = f"{item.source}:{item.line}" if item.line is not None else item.source
+                print(f"transpaste: {where}: {result.error}", file=sys.stderr)
+
+            if args.output_dir and item.source != current_source:
+                if out is not stdout:
+                    out.close()
+                out = open(_output_path(args.output_dir, item.source, target_code), "w", encoding="utf-8")
+                current_source = item.source
+
+            if args.format == "jsonl":
+                out.write(format_jsonl(result) + "\n")
+            else:
+                # Failed items keep their original text so line-aligned output stays aligned.
+                out.write((result.translated if result.error is None else item.text) + "\n")
+            out.flush()
+    except KeyboardInterrupt:
+        # Drops queued items and cancels running ones, unless the interrupt hit inside ordered_map.
+        results.close()
+        print("transpaste: interrupted", file=sys.stderr)
+        return 130
+    finally:
+        if out is not stdout:
+            out.close()
+        if cache is not None:
+            cache.close()
+        client.close()
+
+    log(f"Batch finished with {failures} failure(s)")
+    return 1 if failures else 0
+
+
+def history_command(argv: List[str], stdout: TextIO = sys.stdout) -> int:
+    """Run ``transpaste history``: print history entries matching a query, newest first.
+
+    Args:
+        argv: Arguments after the subcommand name.
+        stdout: Stream to write results to.
+
+    Returns:
+        Process exit code: 0 if anything matched, 1 if nothing did, 2 if the database cannot be read.
+    """
+    parser = argparse.ArgumentParser(prog="transpaste history", description="Search the translation history")
+    parser.add_argument("query", nargs="*", help="Search terms; nothing lists the newest entries")
+    parser.add_argument("-n", "--limit", type=int, default=20, help="Maximum number of results")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text", help="Output format")
+    parser.add_argument("--db", type=str, default=None, help="History database (defaults to the tray app's)")
+    args = parser.parse_args(argv)
+
+    path = args.db or default_history_path()
+    if not os.path.exists(path):
+        print(f"transpaste: no history database at {path}", file=sys.stderr)
+        return 2
+    # Read-only, so the tray app writing to the same database is never blocked or pruned from here.
+    try:
+        store = HistoryStore(path, read_only=True)
+    except sqlite3.Error as e:
+        print(f"transpaste: cannot read history database {path}: {e}", file=sys.stderr)
+        return 2
+    try:
+        entries = store.search(" ".join(args.query), args.limit)
+    finally:
+        store.close()
+
+    for entry in entries:
+        if args.format == "jsonl":
+            stdout.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+        else:
+            stdout.write(f"[{entry.timestamp}] {entry.source_lang} -> {entry.target_lang}\n")
+            stdout.write(f"  {entry.original}\n  {entry.translated}\n\n")
+    return 0 if entries else 1
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for the ``transpaste`` command.
+
+    Args:
+        argv: Command-line arguments without the program name. Defaults to sys.argv[1:].
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["translate"]:
+        sys.exit(translate_command(argv[1:]))
+    if argv[:1] == ["history"]:
+        sys.exit(history_command(argv[1:]))
+
+    from transpaste.main import main as gui_main
+
+    gui_main()
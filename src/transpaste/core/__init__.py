@@ -0,0 +1,5 @@
+"""TransPaste core engine.
+
+GUI-free building blocks shared by the tray application and other front ends.
+Nothing in this package may import PySide6.
+"""
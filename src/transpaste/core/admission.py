@@ -0,0 +1,150 @@
+"""Admission control for large clipboard texts.
+
+Anything can end up on the clipboard, including a multi-megabyte log file
+that would keep the model busy for minutes or silently overflow its context
+window. Before a text is translated, admit() checks its size against an
+AdmissionPolicy: texts over a hard character limit are rejected, large ones
+are deferred until the user asks for them, and ones whose prompt would not
+fit the model's context are routed to chunked translation with chunks small
+enough to fit.
+
+The prompt size is estimated, not tokenized: about four ASCII characters
+per token and one token per other character, which overestimates most
+non-English text and so errs on the side of smaller chunks.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_CHARS = 200_000
+DEFAULT_CONFIRM_CHARS = 20_000
+# Context Ollama runs a model with unless the model or the server sets num_ctx.
+OLLAMA_DEFAULT_NUM_CTX = 4096
+# System prompt, style and length instructions and the chat template.
+PROMPT_OVERHEAD_TOKENS = 256
+# Room left for the translation, relative to the input's tokens.
+OUTPUT_TOKEN_RATIO = 1.5
+ASCII_CHARS_PER_TOKEN = 4
+MIN_CHUNK_CHARS = 200
+
+ACCEPT = "accept"
+CHUNK = "chunk"
+DEFER = "defer"
+REJECT = "reject"
+
+_NUM_CTX_RE = re.compile(r"^\s*num_ctx\s+(\d+)\s*$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    """Size limits for texts to translate.
+
+    Attributes:
+        max_chars: Texts longer than this are rejected; 0 for no limit.
+        confirm_chars: Texts longer than this wait until the user starts them; 0 never defers.
+        context_tokens: The model's context length, if known.
+    """
+
+    max_chars: int = DEFAULT_MAX_CHARS
+    confirm_chars: int = DEFAULT_CONFIRM_CHARS
+    context_tokens: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Admission:
+    """What to do with a text, and why.
+
+    Attributes:
+        decision: ACCEPT, CHUNK, DEFER or REJECT.
+        chars: Length of the text.
+        tokens: Estimated tokens of the text.
+        chunk_chars: Largest chunk, in characters, whose prompt fits the context;
+                     0 if the whole text fits.
+        reason: Human-readable explanation for anything but ACCEPT.
+    """
+
+    decision: str
+    chars: int
+    tokens: int
+    chunk_chars: int = 0
+    reason: str = ""
+
+    def describe(self) -> str:
+        """Return the size as shown to the user, e.g. "52,000 chars, ~13,000 tokens"."""
+        return f"{self.chars:,} chars, ~{self.tokens:,} tokens"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many tokens a text is, in one pass over it.
+
+    Args:
+        text: Text to estimate.
+
+    Returns:
+        About a token per four ASCII characters plus one per other character.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN) + len(text) - ascii_chars
+
+
+def parse_context_length(info: Dict[str, Any], default: int = OLLAMA_DEFAULT_NUM_CTX) -> Optional[int]:
+    """Return the context a model runs with, from its /api/show response.
+
+    A num_ctx set in the model's parameters wins; otherwise Ollama uses its
+    default, capped at the context length the model was trained for.
+
+    Args:
+        info: JSON body of /api/show.
+        default: Context used when the model does not set num_ctx.
+
+    Returns:
+        Context length in tokens, or None if the response has neither value.
+    """
+    match = _NUM_CTX_RE.search(info.get("parameters") or "")
+    if match:
+        return int(match.group(1))
+    trained = [
+        value
+        for key, value in (info.get("model_info") or {}).items()
+        if key.endswith(".context_length") and isinstance(value, int)
+    ]
+    if trained:
+        return min(default, max(trained))
+    return None
+
+
+def _fitting_chunk_chars(chars: int, tokens: int, context_tokens: int) -> int:
+    budget = (context_tokens - PROMPT_OVERHEAD_TOKENS) / (1 + OUTPUT_TOKEN_RATIO)
+    return max(MIN_CHUNK_CHARS, int(budget * chars / tokens))
+
+
+def admit(text: str, policy: AdmissionPolicy) -> Admission:
+    """Decide whether and how to translate a text.
+
+    Args:
+        text: The text to translate.
+        policy: Size limits to apply.
+
+    Returns:
+        REJECT if the text is over max_chars, DEFER if it is over confirm_chars,
+        CHUNK if its prompt would not fit the context in one request, ACCEPT
+        otherwise. DEFER carries the chunk size to use once it is started.
+    """
+    chars = len(text)
+    if policy.max_chars and chars > policy.max_chars:
+        tokens = math.ceil(chars / ASCII_CHARS_PER_TOKEN)  # not worth a pass over the text
+        return Admission(REJECT, chars, tokens, reason=f"longer than the {policy.max_chars:,} character limit")
+
+    tokens = estimate_tokens(text)
+    chunk_chars = 0
+    context = policy.context_tokens
+    if context and tokens and PROMPT_OVERHEAD_TOKENS + tokens * (1 + OUTPUT_TOKEN_RATIO) > context:
+        chunk_chars = _fitting_chunk_chars(chars, tokens, context)
+
+    if policy.confirm_chars and chars > policy.confirm_chars:
+        return Admission(DEFER, chars, tokens, chunk_chars, f"longer than {policy.confirm_chars:,} characters")
+    if chunk_chars:
+        return Admission(CHUNK, chars, tokens, chunk_chars, f"too long for the {context:,} token context")
+    return Admission(ACCEPT, chars, tokens)
@@ -0,0 +1,36 @@
+"""Adaptive polling intervals."""
+
+
+class Backoff:
+    """Exponential back-off for a polling interval.
+
+    The interval starts at ``initial``, is multiplied by ``factor`` after every
+    poll that found nothing new, is capped at ``maximum`` and snaps back to
+    ``initial`` as soon as something changes.
+
+    Attributes:
+        interval: Current interval in milliseconds.
+    """
+
+    def __init__(self, initial: int = 500, maximum: int = 4000, factor: float = 2.0):
+        """Initialize the back-off.
+
+        Args:
+            initial: Shortest interval in milliseconds.
+            maximum: Longest interval in milliseconds.
+            factor: Growth factor applied per idle poll.
+        """
+        self.initial = initial
+        self.maximum = max(initial, maximum)
+        self.factor = factor
+        self.interval = initial
+
+    def grow(self) -> int:
+        """Lengthen the interval after an idle poll and return it."""
+        self.interval = min(int(self.interval * self.factor), self.maximum)
+        return self.interval
+
+    def reset(self) -> int:
+        """Return to the shortest interval after activity and return it."""
+        self.interval = self.initial
+        return self.interval
@@ -0,0 +1,351 @@
+"""Client-side load balancing and failover across several Ollama servers.
+
+BalancedClient offers the same interface as OllamaClient but spreads
+generations over a list of endpoints. Each request goes to the healthy
+endpoint with the lowest (outstanding requests + 1) x latency, and a request
+that fails to connect or gets a 5xx status is retried on the next endpoint.
+Failed endpoints are skipped for a back-off period that grows with repeated
+failures; check_health() probes every endpoint to bring them back sooner.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+
+from transpaste.core.client import DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE, TAGS_TIMEOUT_SECONDS, OllamaClient
+from transpaste.core.config import OLLAMA_API_URL, TIMEOUT_SECONDS
+from transpaste.core.log import log
+
+DEFAULT_HEALTH_INTERVAL_SECONDS = 30
+MAX_DOWN_SECONDS = 60
+# Weight of the newest sample in the latency moving average.
+LATENCY_SMOOTHING = 0.3
+
+
+def parse_endpoints(value: str) -> List[str]:
+    """Split a comma-separated list of Ollama base URLs.
+
+    Args:
+        value: One URL, or several separated by commas.
+
+    Returns:
+        Normalized URLs without trailing slashes, duplicates removed; the
+        default URL if value is empty.
+    """
+    endpoints: List[str] = []
+    for part in value.split(","):
+        url = part.strip().rstrip("/")
+        if url and url not in endpoints:
+            endpoints.append(url)
+    return endpoints or [OLLAMA_API_URL]
+
+
+@dataclass
+class EndpointStatus:
+    """Health and load of one endpoint.
+
+    Attributes:
+        url: Base URL of the endpoint.
+        healthy: False after a failed request or health check, until one succeeds.
+        outstanding: Requests currently being served, including open streams.
+        latency_ms: Moving average of the time until a generation starts responding.
+        probe_ms: Round-trip time of the last successful health check.
+        requests: Number of generations sent to the endpoint.
+        failures: Consecutive failures.
+        last_error: Description of the last failure.
+        retry_at: time.monotonic() before which an unhealthy endpoint is skipped.
+    """
+
+    url: str
+    healthy: bool = True
+    outstanding: int = 0
+    latency_ms: Optional[float] = None
+    probe_ms: Optional[float] = None
+    requests: int = 0
+    failures: int = 0
+    last_error: str = ""
+    retry_at: float = 0.0
+
+    def describe(self) -> str:
+        """Return a one-line summary for display."""
+        if not self.healthy:
+            return f"{self.url}: down ({self.last_error})"
+        latency = f"{self.latency_ms:.0f} ms" if self.latency_ms is not None else "no requests yet"
+        return f"{self.url}: up, {self.outstanding} active, {latency}"
+
+
+def _is_retryable(error: requests.exceptions.RequestException) -> bool:
+    """Whether a request that failed with error can safely be sent to another endpoint."""
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return True
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.exceptions.HTTPError) and response is not None and response.status_code >= 500
+
+
+class BalancedClient:
+    """Client for a group of Ollama servers that serve the same models.
+
+    Thread-safe like OllamaClient: one instance is shared by the GUI thread
+    and all worker threads.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        proxies: Optional[Dict[str, str]] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = TIMEOUT_SECONDS,
+    ):
+        """Initialize the client.
+
+        Args:
+            endpoints: Ollama API base URLs; see parse_endpoints().
+            proxies: HTTP proxy configuration dict.
+            pool_size: Maximum number of connections kept open to each server.
+            max_retries: Connection retries per endpoint before failing over.
+            timeout: Read timeout in seconds for generate requests.
+        """
+        if not endpoints:
+            raise ValueError("at least one endpoint is required")
+        self.clients = [OllamaClient(url, proxies, pool_size, max_retries, timeout) for url in endpoints]
+        self._status = [EndpointStatus(client.base_url) for client in self.clients]
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """The endpoint URLs, comma-separated."""
+        return ",".join(status.url for status in self._status)
+
+    def url(self, path: str) -> str:
+        """Return the absolute URL for an API path on the endpoint the next request would use."""
+        with self._lock:
+            return self.clients[self._pick(set())].url(path)
+
+    def status(self) -> List[EndpointStatus]:
+        """Return a snapshot of every endpoint's health and load."""
+        with self._lock:
+            return [replace(status) for status in self._status]
+
+    def generate(self, payload: Dict[str, Any], stream: bool = True) -> requests.Response:
+        """Send a request to /api/generate on the best endpoint; see post()."""
+        return self.post("/api/generate", payload, stream)
+
+    def chat(self, payload: Dict[str, Any], stream: bool = True) -> requests.Response:
+        """Send a request to /api/chat on the best endpoint; see post()."""
+        return self.post("/api/chat", payload, stream)
+
+    def post(self, path: str, payload: Dict[str, Any], stream: bool = True) -> requests.Response:
+        """Send a JSON request to an API path on the best endpoint, failing over on errors.
+
+        Args:
+            path: API path such as "/api/generate".
+            payload: JSON request body.
+            stream: Whether to stream the response body.
+
+        Returns:
+            The HTTP response. Callers must close streamed responses; closing
+            also ends the request's share of the endpoint's load.
+
+        Raises:
+            requests.exceptions.RequestException: The error from the last
+                endpoint tried, if none could serve the request.
+        """
+        tried: set = set()
+        while True:
+            with self._lock:
+                index = self._pick(tried)
+                status = self._status[index]
+                status.outstanding += 1
+                status.requests += 1
+            tried.add(index)
+            start = time.monotonic()
+            try:
+                response = self.clients[index].post(path, payload, stream=stream)
+            except requests.exceptions.RequestException as e:
+                self._release(index)
+                if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+                    e.response.close()
+                if not _is_retryable(e):
+                    raise
+                self._mark_failed(index, e)
+                if len(tried) == len(self.clients):
+                    raise
+                log(f"Endpoint {status.url} failed, retrying on another endpoint: {e}", "WARN")
+                continue
+
+            self._mark_ok(index, latency_ms=(time.monotonic() - start) * 1000)
+            if not stream:
+                self._release(index)
+                return response
+            close = response.close
+            released = False
+
+            def close_and_release() -> None:
+                nonlocal released
+                if not released:
+                    released = True
+                    self._release(index)
+                close()
+
+            response.close = close_and_release
+            return response
+
+    def list_models(self) -> List[str]:
+        """Fetch the models installed on any reachable endpoint.
+
+        Returns:
+            Model names in the order the endpoints report them, without duplicates.
+
+        Raises:
+            requests.exceptions.RequestException: If no endpoint could be reached.
+        """
+        results = self._each_endpoint(lambda client: client.list_models())
+        models: List[str] = []
+        errors = []
+        for result in results:
+            if isinstance(result, Exception):
+                errors.append(result)
+                continue
+            models.extend(name for name in result if name not in models)
+        if len(errors) == len(results):
+            raise errors[-1]
+        return models
+
+    def context_length(self, model: str) -> Optional[int]:
+        """Fetch a model's context length from every reachable endpoint; see OllamaClient.context_length().
+
+        Returns:
+            The smallest context length reported, as any endpoint may serve a request,
+            or None if none reported one.
+
+        Raises:
+            requests.exceptions.RequestException: If no endpoint could be reached.
+        """
+        results = self._each_endpoint(lambda client: client.context_length(model))
+        lengths = [result for result in results if isinstance(result, int)]
+        if not lengths and all(isinstance(result, Exception) for result in results):
+            raise results[-1]
+        return min(lengths) if lengths else None
+
+    def warm_up(self, model: str, keep_alive: Optional[str] = None) -> float:
+        """Load a model on every endpoint concurrently; see OllamaClient.warm_up().
+
+        Returns:
+            Seconds the slowest successful endpoint took.
+
+        Raises:
+            requests.exceptions.RequestException: If no endpoint could load the model.
+        """
+        results = self._each_endpoint(lambda client: client.warm_up(model, keep_alive))
+        for index, result in enumerate(results):
+            if isinstance(result, Exception) and _is_retryable(result):
+                self._mark_failed(index, result)
+        loaded = [result for result in results if not isinstance(result, Exception)]
+        if not loaded:
+            raise results[-1]
+        return max(loaded)
+
+    def check_health(self) -> List[EndpointStatus]:
+        """Probe every endpoint with /api/version and update its health.
+
+        Returns:
+            A snapshot of every endpoint's status after the probe.
+        """
+
+        def probe(client: OllamaClient) -> float:
+            start = time.monotonic()
+            response = client.session.get(client.url("/api/version"), timeout=TAGS_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            return (time.monotonic() - start) * 1000
+
+        for index, result in enumerate(self._each_endpoint(probe)):
+            if isinstance(result, Exception):
+                self._mark_failed(index, result)
+            else:
+                self._mark_ok(index, probe_ms=result)
+        return self.status()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        for client in self.clients:
+            client.close()
+
+    def _each_endpoint(self, call) -> List[Any]:
+        """Run call(client) against every endpoint concurrently, returning results or exceptions in order."""
+
+        def guarded(client: OllamaClient) -> Any:
+            try:
+                return call(client)
+            except Exception as e:
+                return e
+
+        if len(self.clients) == 1:
+            return [guarded(self.clients[0])]
+        with ThreadPoolExecutor(max_workers=len(self.clients)) as pool:
+            return list(pool.map(guarded, self.clients))
+
+    def _pick(self, tried: set) -> int:
+        """Choose the endpoint for the next request. Caller holds the lock.
+
+        Args:
+            tried: Indexes already tried for this request.
+
+        Returns:
+            Index of the untried endpoint with the lowest expected wait; endpoints
+            still in their failure back-off are used only when nothing else is left.
+        """
+        now = time.monotonic()
+        untried = [i for i in range(len(self._status)) if i not in tried] or list(range(len(self._status)))
+        available = [i for i in untried if self._status[i].healthy or self._status[i].retry_at <= now]
+        if not available:
+            return min(untried, key=lambda i: self._status[i].retry_at)
+
+        def expected_wait(i: int) -> float:
+            status = self._status[i]
+            # Endpoints without a latency sample yet are tried first.
+            return (status.outstanding + 1) * (status.latency_ms or 0.0)
+
+        return min(available, key=lambda i: (expected_wait(i), self._status[i].outstanding, i))
+
+    def _release(self, index: int) -> None:
+        """End one outstanding request on an endpoint."""
+        with self._lock:
+            self._status[index].outstanding -= 1
+
+    def _mark_ok(self, index: int, latency_ms: Optional[float] = None, probe_ms: Optional[float] = None) -> None:
+        """Record a successful request or health check."""
+        with self._lock:
+            status = self._status[index]
+            if not status.healthy:
+                log(f"Endpoint {status.url} is back up")
+            status.healthy = True
+            status.failures = 0
+            status.retry_at = 0.0
+            if latency_ms is not None:
+                previous = status.latency_ms
+                status.latency_ms = (
+                    latency_ms if previous is None else previous + LATENCY_SMOOTHING * (latency_ms - previous)
+                )
+            if probe_ms is not None:
+                status.probe_ms = probe_ms
+
+    def _mark_failed(self, index: int, error: Exception) -> None:
+        """Take an endpoint out of rotation for a back-off period that doubles per failure."""
+        with self._lock:
+            status = self._status[index]
+            status.healthy = False
+            status.failures += 1
+            status.last_error = type(error).__name__
+            if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+                status.last_error = f"HTTP {error.response.status_code}"
+            down_seconds = min(2 ** (status.failures - 1), MAX_DOWN_SECONDS)
+            status.retry_at = time.monotonic() + down_seconds
+        log(f"Endpoint {status.url} marked down for {down_seconds}s ({status.last_error})", "WARN")
+
+
+Client = Union[OllamaClient, BalancedClient]
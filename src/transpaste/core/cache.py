@@ -0,0 +1,201 @@
+"""Content-addressed translation cache.
+
+Translations are keyed by a hash of the source text plus every setting that
+changes the prompt or the generation options, so a repeated copy of the same
+snippet under the same settings never reaches Ollama again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from transpaste.core.config import DEFAULT_API
+from transpaste.core.log import log
+from transpaste.core.paths import user_data_dir
+
+CACHE_FILENAME = "cache.sqlite3"
+
+# Config keys that influence build_prompt(), the Ollama request or chunking.
+CACHE_KEY_FIELDS = (
+    "api",
+    "model",
+    "source_lang",
+    "target_lang",
+    "style",
+    "length",
+    "temperature",
+    "custom_prompt",
+    "chunk_size",
+    "preserve_code",
+)
+
+
+def default_cache_path() -> str:
+    """Return the default on-disk location of the translation cache."""
+    return os.path.join(user_data_dir(), CACHE_FILENAME)
+
+
+class TranslationCache:
+    """Two-level translation cache: in-memory LRU in front of an SQLite store.
+
+    All public methods are thread-safe.
+
+    Attributes:
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that found nothing.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries: int = 512):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file. If None, the cache is memory-only.
+            max_memory_entries: Capacity of the in-memory LRU layer.
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, translated TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                self._db.commit()
+                log(f"Translation cache opened at {path}")
+            except sqlite3.Error as e:
+                log(f"Failed to open translation cache, using memory only: {e}", "WARN")
+                self._db = None
+
+    @staticmethod
+    def make_key(text: str, config: Dict[str, Any]) -> str:
+        """Build the cache key for a text under a translation config.
+
+        Args:
+            text: The source text.
+            config: Translation config as passed to TranslatorWorker.
+
+        Returns:
+            Hex SHA-256 digest identifying the translation.
+        """
+        material = {field: config.get(field) for field in CACHE_KEY_FIELDS}
+        # Resolved the way the Translator does, so leaving it out matches the default mode.
+        material["api"] = config.get("api", DEFAULT_API)
+        material["text"] = text
+        # Only when set, so enabling no extra cleaners keeps the keys of existing entries.
+        if config.get("cleaners"):
+            material["cleaners"] = list(config["cleaners"])
+        encoded = json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached translation and update the hit/miss counters.
+
+        Args:
+            key: Key from make_key().
+
+        Returns:
+            The cached translation, or None on a miss.
+        """
+        with self._lock:
+            translated = self._memory.get(key)
+            if translated is not None:
+                self._memory.move_to_end(key)
+            elif self._db is not None:
+                try:
+                    row = self._db.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    log(f"Translation cache read failed: {e}", "WARN")
+                    row = None
+                if row:
+                    translated = row[0]
+                    self._remember(key, translated)
+
+            if translated is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return translated
+
+    def contains(self, key: str) -> bool:
+        """Return whether a translation is cached, without counting a hit or miss.
+
+        Args:
+            key: Key from make_key().
+        """
+        with self._lock:
+            if key in self._memory:
+                return True
+            if self._db is None:
+                return False
+            try:
+                return self._db.execute("SELECT 1 FROM translations WHERE key = ?", (key,)).fetchone() is not None
+            except sqlite3.Error as e:
+                log(f"Translation cache read failed: {e}", "WARN")
+                return False
+
+    def put(self, key: str, translated: str) -> None:
+        """Store a translation.
+
+        Args:
+            key: Key from make_key().
+            translated: The final, post-processed translation.
+        """
+        with self._lock:
+            self._remember(key, translated)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO translations (key, translated, created) VALUES (?, ?, ?)",
+                        (key, translated, time.time()),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    log(f"Translation cache write failed: {e}", "WARN")
+
+    def clear(self) -> None:
+        """Remove every cached translation and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM translations")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    log(f"Translation cache clear failed: {e}", "WARN")
+
+    def close(self) -> None:
+        """Close the backing database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._db is not None:
+                try:
+                    return self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return len(self._memory)
+
+    def _remember(self, key: str, translated: str) -> None:
+        """Insert into the LRU layer, evicting the least recently used entry. Caller holds the lock."""
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
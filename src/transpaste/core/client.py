@@ -0,0 +1,148 @@
+"""Connection-pooled HTTP client for the Ollama API."""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from transpaste.core.admission import parse_context_length
+from transpaste.core.config import OLLAMA_API_URL, TIMEOUT_SECONDS
+from transpaste.core.log import log
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_RETRIES = 2
+TAGS_TIMEOUT_SECONDS = 2
+
+
+class OllamaClient:
+    """Shared client for all traffic to one Ollama server.
+
+    Wraps a single requests.Session so consecutive requests reuse kept-alive
+    TCP (and TLS) connections instead of opening a new one each time. The
+    session is configured once in the constructor and never mutated afterwards,
+    so a single instance can be used from the GUI thread and any number of
+    worker threads at the same time; the underlying urllib3 pool is thread-safe.
+
+    Only connection failures are retried: a request that reached the server is
+    never re-sent, so a generation is never started twice.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_API_URL,
+        proxies: Optional[Dict[str, str]] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = TIMEOUT_SECONDS,
+    ):
+        """Initialize the client.
+
+        Args:
+            base_url: Ollama API base URL.
+            proxies: HTTP proxy configuration dict.
+            pool_size: Maximum number of connections kept open to the server.
+            max_retries: Number of retries for failed connection attempts.
+            timeout: Read timeout in seconds for generate requests.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.proxies = proxies
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        retry = Retry(total=max_retries, connect=max_retries, read=0, status=0, backoff_factor=0.1)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if proxies:
+            self.session.proxies.update(proxies)
+
+        log(f"OllamaClient created for {self.base_url} (pool_size={pool_size}, retries={max_retries})")
+
+    def url(self, path: str) -> str:
+        """Return the absolute URL for an API path such as '/api/generate'."""
+        return f"{self.base_url}{path}"
+
+    def generate(self, payload: Dict[str, Any], stream: bool = True) -> requests.Response:
+        """Send a request to /api/generate.
+
+        Args:
+            payload: JSON request body.
+            stream: Whether to stream the response body.
+
+        Returns:
+            The HTTP response. Callers must close streamed responses so the
+            connection is returned to the pool.
+
+        Raises:
+            requests.exceptions.RequestException: On connection, timeout or HTTP errors.
+        """
+        return self.post("/api/generate", payload, stream)
+
+    def chat(self, payload: Dict[str, Any], stream: bool = True) -> requests.Response:
+        """Send a request to /api/chat; see generate()."""
+        return self.post("/api/chat", payload, stream)
+
+    def post(self, path: str, payload: Dict[str, Any], stream: bool = True) -> requests.Response:
+        """Send a JSON request to an API path and raise on HTTP errors; see generate()."""
+        response = self.session.post(self.url(path), json=payload, stream=stream, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def warm_up(self, model: str, keep_alive: Optional[str] = None) -> float:
+        """Load a model into memory with an empty generate request.
+
+        Args:
+            model: Model to load.
+            keep_alive: How long the server should keep the model loaded afterwards.
+
+        Returns:
+            Seconds the request took; close to zero if the model was already loaded.
+
+        Raises:
+            requests.exceptions.RequestException: On connection, timeout or HTTP errors.
+        """
+        payload: Dict[str, Any] = {"model": model, "stream": False}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        start = time.monotonic()
+        response = self.session.post(self.url("/api/generate"), json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return time.monotonic() - start
+
+    def list_models(self) -> List[str]:
+        """Fetch the names of the models installed on the server.
+
+        Returns:
+            Model names as reported by /api/tags.
+
+        Raises:
+            requests.exceptions.RequestException: On connection, timeout or HTTP errors.
+        """
+        response = self.session.get(self.url("/api/tags"), timeout=TAGS_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return [m["name"] for m in response.json().get("models", [])]
+
+    def context_length(self, model: str) -> Optional[int]:
+        """Fetch the context length a model runs with from /api/show.
+
+        Args:
+            model: Model to look up.
+
+        Returns:
+            Context length in tokens, or None if the server does not report one.
+
+        Raises:
+            requests.exceptions.RequestException: On connection, timeout or HTTP errors.
+        """
+        response = self.session.post(self.url("/api/show"), json={"model": model}, timeout=TAGS_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return parse_context_length(response.json())
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
@@ -0,0 +1,13 @@
+"""Ollama connection defaults."""
+
+OLLAMA_API_URL = "http://localhost:11434"
+OLLAMA_TAGS_URL = "http://localhost:11434/api/tags"
+DEFAULT_MODEL = "gemma3:1b"
+TIMEOUT_SECONDS = 120
+
+# Request modes: /api/chat sends the instructions as a system message that
+# stays byte-identical between requests, so Ollama can reuse its KV cache.
+API_CHAT = "chat"
+API_GENERATE = "generate"
+API_MODES = (API_CHAT, API_GENERATE)
+DEFAULT_API = API_CHAT
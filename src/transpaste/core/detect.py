@@ -0,0 +1,302 @@
+"""Offline language identification and untranslatable-text heuristics.
+
+Copied text that needs no translation (numbers, URLs, file paths, code,
+or text already in the target language) is recognised here in
+microseconds, before a model is asked for anything. Languages with their
+own script are identified by it; Latin-script languages by a naive Bayes
+score over character trigrams of their most common words, which suits the
+short texts people copy.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Only the start of long texts is examined.
+DETECT_SAMPLE_CHARS = 600
+# Latin-script words scored; enough to settle the language of any text.
+MAX_DETECT_WORDS = 30
+# Texts with fewer letters than this are never judged to be in the target language;
+# scripts that write a word in one or two characters need fewer.
+MIN_DETECT_LETTERS = 12
+MIN_DETECT_SYLLABLES = 4
+# Confidence above which a detection is acted on.
+MIN_CONFIDENCE = 0.9
+# Code-like lines needed before a text counts as code; one operator in a sentence is not enough.
+MIN_CODE_LINES = 2
+
+REASON_NO_LETTERS = "no letters"
+REASON_URL = "URL"
+REASON_EMAIL = "email address"
+REASON_PATH = "file path"
+REASON_CODE = "code"
+REASON_TARGET_LANGUAGE = "already in the target language"
+
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_SCRIPTS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ("Latin", re.compile(r"[A-Za-z\u00c0-\u024f\u1e00-\u1eff]")),
+    ("Han", re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")),
+    ("Kana", re.compile(r"[\u3040-\u30ff\u31f0-\u31ff]")),
+    ("Hangul", re.compile(r"[\uac00-\ud7af\u1100-\u11ff\u3130-\u318f]")),
+    ("Cyrillic", re.compile(r"[\u0400-\u04ff]")),
+    ("Arabic", re.compile(r"[\u0600-\u06ff\u0750-\u077f]")),
+    ("Devanagari", re.compile(r"[\u0900-\u097f]")),
+    ("Thai", re.compile(r"[\u0e00-\u0e7f]")),
+)
+_SCRIPT_LANGUAGES = {
+    "Hangul": "Korean",
+    "Cyrillic": "Russian",
+    "Arabic": "Arabic",
+    "Devanagari": "Hindi",
+    "Thai": "Thai",
+}
+# Common characters written differently in Simplified and Traditional Chinese, pair by pair.
+_SIMPLIFIED = set("这个们来说为国会时对学过还发后见长门问间东车书习买卖马鸟鱼电话语认识让请谢应该经开关里没么样点钱从")
+_TRADITIONAL = set("這個們來說為國會時對學過還發後見長門問間東車書習買賣馬鳥魚電話語認識讓請謝應該經開關裡沒麼樣點錢從")
+_VIETNAMESE_RE = re.compile(r"[ăđơưạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịọỏốồổỗộớờởỡợụủứừửữựỳỵỷỹ]", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-zà-öø-ÿœ]+")
+
+_URL_RE = re.compile(r"(?:[a-z][a-z0-9+.-]*://|www\.|mailto:)\S+", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# A slash-separated token only counts as a path with a leading separator, a drive
+# letter or a file extension; "he/she/they" or "input/output/error" are prose.
+_PATH_RE = re.compile(
+    r"(?:[a-z]:[\\/]|\\\\[^\\\s]+\\|~[\\/]|\.{1,2}[\\/]|/)[^\n<>\"|?*]*"
+    r"|[\w.-]+(?:[\\/][\w.-]+)+\.\w{1,8}",
+    re.IGNORECASE,
+)
+_CODE_LINE_RE = re.compile(
+    r"[;{}]\s*$|=>|==|!=|\+=|::|->|\)\s*\{|^\s*(?:def|class|import|from|return|function|const|let|var|"
+    r"public|private|package|func|fn|#include|#define|SELECT|INSERT|UPDATE)\b",
+    re.MULTILINE,
+)
+_CODE_SYMBOL_RE = re.compile(r"[{}\[\]()<>=;:+\-*/&|!$_\\]")
+
+# Frequent words per Latin-script language; their character trigrams are the language profiles.
+_COMMON_WORDS = {
+    "English": (
+        "the of and to a in is it you that he was for on are with as his they be at one have this from or "
+        "had by not word but what some we can out other were all there when up use your how said an each she "
+        "which do their time if will way about many then them write would like so these her long make thing "
+        "see him two has look more day could go come did number sound no most people my over know water than "
+        "call first who may down side been now find any new work part take get place made live where after "
+        "back little only round man year came show every good me give our under name very through just form "
+        "sentence great think say help low line differ turn cause much mean before move right boy old too "
+        "same tell does set three want air well also play small end put home read hand port large spell add "
+        "even land here must big high such follow act why ask men change went light kind off need house "
+        "picture try us again animal point mother world near build self earth father should because please "
+        "thanks which would could translation information"
+    ),
+    "French": (
+        "le de un être et à il avoir ne je son que se qui ce dans en du elle au pour pas que vous par sur "
+        "faire plus dire me on mon lui nous comme mais pouvoir avec tout y aller voir en bien où sans tu ou "
+        "leur homme si deux mari moi vouloir te femme venir quand grand celui notre devoir là jour prendre "
+        "même votre rien petit encore aussi quelque dont tout mer trouver donner temps ça peu même falloir "
+        "sous parler alors main chose ton mettre vie savoir yeux passer autre après regarder toujours puis "
+        "jamais cela aimer non heure croire cent monde donc enfant fois seul autre entre vers chez demander "
+        "jeune jusque très moment rester répondre tout tête père fille mille premier car entendre ni bon "
+        "trois cœur ainsi an quatre un la les des est sont était cette ces être avez merci bonjour s'il "
+        "vous plaît nous sommes été français aujourd'hui peut-être"
+    ),
+    "German": (
+        "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an werden "
+        "aus er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum war haben nur "
+        "oder aber vor zur bis mehr durch man sein wurde sei in prozent hatte kann gegen vom können schon "
+        "wenn habe seine mark ihre dann unter wir soll ich eines es jahr zwei jahren diese dieser wieder "
+        "keine uhr seiner worden und will zwischen immer millionen ihr was sagte gibt alle diesem seit muss "
+        "wurden beim doch jetzt waren drei jahre neue neuen damit bereits da auch ihren sehr hier ganz "
+        "wird müssen ohne heute nichts bitte danke schön guten tag straße größe möchten können übersetzung "
+        "ich bin du bist wir sind gut zeit leute stadt"
+    ),
+    "Spanish": (
+        "de la que el en y a los del se las por un para con no una su al lo como más pero sus le ya o este "
+        "sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos durante "
+        "todos uno les ni contra otros ese eso ante ellos e esto mí antes algunos qué unos yo otro otras otra "
+        "él tanto esa estos mucho quienes nada muchos cual poco ella estar estas algunas algo nosotros mi mis "
+        "tú te ti tu tus ellas nosotras vosotros vosotras os mío mía míos mías tuyo tuya tuyos tuyas suyo "
+        "suya suyos suyas nuestro nuestra vuestro está estoy estamos están gracias hola por favor señor "
+        "año años día niño mañana también información traducción usted ustedes hacer tiene puede"
+    ),
+    "Italian": (
+        "di e il la che è per un in non una a sono mi si ho lo ma ti ha le con cosa questo no se io del "
+        "della al come da bene gli più c'è era ci sei anche qui nel suo fare dei sì cosa alla mio chi tutto "
+        "so sua quando stato questa mia essere ne lei tu lui cosa niente fatto come hai dove solo può tutti "
+        "molto sta grazie signore allora prima fa sempre abbiamo voglio adesso ancora andare casa perché "
+        "qualcosa tuo dopo vuoi devo sei buona sto fuori perché cosa così dire ora tempo posso nella sul "
+        "degli delle nei dalla questo quello questi quelle buongiorno prego scusi giorno anno città"
+    ),
+    "Portuguese": (
+        "de a o que e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele das "
+        "tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso ela entre era "
+        "depois sem mesmo aos ter seus quem nas me esse eles estão você tinha foram essa num nem suas meu "
+        "às minha têm numa pelos elas havia seja qual será nós tenho lhe deles essas esses pelas este fosse "
+        "dele tu te vocês vos lhes meus minhas teu tua teus tuas nosso nossa nossos nossas obrigado obrigada "
+        "olá bom dia ação informação tradução não então também coração irmão"
+    ),
+}
+
+# Log-likelihood bonus for a word that is on a language's list itself.
+COMMON_WORD_BONUS = 3.0
+
+_Profile = Tuple[Dict[str, float], float, FrozenSet[str]]
+_profiles: Optional[Dict[str, _Profile]] = None
+
+
+@dataclass
+class Detection:
+    """Result of detect_language().
+
+    Attributes:
+        language: Display name as in LANGUAGE_MAP, or None if undetermined.
+        confidence: How sure the detection is, from 0 to 1.
+        script: Dominant writing system ("Latin", "Han", ...), or "" if the text has no letters.
+        letters: Number of letters examined.
+    """
+
+    language: Optional[str]
+    confidence: float
+    script: str
+    letters: int
+
+    @property
+    def confident(self) -> bool:
+        """Whether the detection is reliable enough to act on."""
+        if self.language is None or self.confidence < MIN_CONFIDENCE:
+            return False
+        syllabic = self.script in ("Han", "Kana", "Hangul")
+        return self.letters >= (MIN_DETECT_SYLLABLES if syllabic else MIN_DETECT_LETTERS)
+
+
+def _trigrams(words: List[str]) -> List[str]:
+    """Return the character trigrams of words, each padded with a space on both sides."""
+    padded = f" {'  '.join(words)} "
+    return [padded[i : i + 3] for i in range(len(padded) - 2)]
+
+
+def _load_profiles() -> Dict[str, _Profile]:
+    """Build the trigram log-probabilities and word sets of each Latin-script language once."""
+    global _profiles
+    if _profiles is None:
+        counts: Dict[str, Dict[str, int]] = {}
+        vocabulary = set()
+        for language, words in _COMMON_WORDS.items():
+            grams: Dict[str, int] = {}
+            for gram in _trigrams(words.split()):
+                grams[gram] = grams.get(gram, 0) + 1
+            counts[language] = grams
+            vocabulary.update(grams)
+        profiles = {}
+        for language, grams in counts.items():
+            total = sum(grams.values()) + len(vocabulary)
+            profile = {gram: math.log((count + 1) / total) for gram, count in grams.items()}
+            profiles[language] = (profile, math.log(1 / total), frozenset(_COMMON_WORDS[language].split()))
+        _profiles = profiles
+    return _profiles
+
+
+def _latin_language(sample: str) -> Tuple[Optional[str], float]:
+    """Identify a Latin-script language from character trigrams; return (language, confidence)."""
+    # Scheme and domain names would only add noise.
+    words = _WORD_RE.findall(_URL_RE.sub(" ", sample).lower())[:MAX_DETECT_WORDS]
+    if not words:
+        return None, 0.0
+    letters = sum(len(word) for word in words)
+    if len(_VIETNAMESE_RE.findall(sample)) >= max(2, letters // 20):
+        return "Vietnamese", 0.95
+    grams = _trigrams(words)
+    scores = {
+        language: sum(map(profile.get, grams, repeat(unseen, len(grams))))
+        + COMMON_WORD_BONUS * sum(map(common.__contains__, words))
+        for language, (profile, unseen, common) in _load_profiles().items()
+    }
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    # Posterior of the best language, with the log-likelihoods averaged per trigram and
+    # scaled so a handful of trigrams cannot make the detection look certain.
+    scale = min(len(grams), 40) / len(grams)
+    total = sum(math.exp((score - ranked[0][1]) * scale) for _, score in ranked)
+    return ranked[0][0], 1 / total
+
+
+def detect_language(text: str) -> Detection:
+    """Identify the language of a text from its script and character trigrams.
+
+    Args:
+        text: Text to examine; only its first DETECT_SAMPLE_CHARS characters are used.
+
+    Returns:
+        The detection; language is None if the script is unknown or mixed.
+    """
+    sample = text[:DETECT_SAMPLE_CHARS]
+    letters = len(_LETTER_RE.findall(sample))
+    if not letters:
+        return Detection(None, 0.0, "", 0)
+    counts = {script: len(pattern.findall(sample)) for script, pattern in _SCRIPTS}
+    kana = counts.pop("Kana")
+    # Japanese mixes kanji and kana, so they count as one script here.
+    counts["Han"] += kana
+    script, count = max(counts.items(), key=lambda item: item[1])
+    if count < letters / 2:
+        return Detection(None, 0.0, script if count else "", letters)
+
+    if script == "Latin":
+        language, confidence = _latin_language(sample)
+        return Detection(language, confidence, script, letters)
+    if script == "Han":
+        if kana and kana >= count / 10:
+            return Detection("Japanese", 0.95, "Kana", letters)
+        simplified = sum(ch in _SIMPLIFIED for ch in sample)
+        traditional = sum(ch in _TRADITIONAL for ch in sample)
+        language = "Chinese (Traditional)" if traditional > simplified else "Chinese (Simplified)"
+        # A single telling character could as well be a Japanese kanji or a name.
+        return Detection(language, 0.95 if abs(simplified - traditional) >= 2 else 0.6, "Han", letters)
+    return Detection(_SCRIPT_LANGUAGES.get(script), 0.95, script, letters)
+
+
+def _looks_like_code(text: str) -> bool:
+    """Whether text reads as source code rather than prose."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < MIN_CODE_LINES:
+        return False
+    dense = len(_CODE_SYMBOL_RE.findall(text)) / max(1, len(text) - text.count(" "))
+    matching = sum(1 for line in lines if _CODE_LINE_RE.search(line))
+    return matching >= max(MIN_CODE_LINES, len(lines) / 2) and dense >= 0.05
+
+
+def skip_reason(
+    text: str, target_lang: str, source_lang: str = "Auto Detect", detection: Optional[Detection] = None
+) -> Optional[str]:
+    """Return why text should not be sent for translation, or None if it should.
+
+    Numbers, URLs, email addresses, file paths and code are never translated;
+    text confidently detected to be in target_lang is skipped only when the
+    source language is "Auto Detect".
+
+    Args:
+        text: Copied text.
+        target_lang: Target language display name.
+        source_lang: Source language display name.
+        detection: detect_language(text), if the caller has it already.
+
+    Returns:
+        One of the REASON_* strings, or None.
+    """
+    sample = text[:DETECT_SAMPLE_CHARS]
+    stripped = sample.strip()
+    if not _LETTER_RE.search(stripped):
+        return REASON_NO_LETTERS
+    if "\n" not in stripped:
+        if _URL_RE.fullmatch(stripped):
+            return REASON_URL
+        if _EMAIL_RE.fullmatch(stripped):
+            return REASON_EMAIL
+        if _PATH_RE.fullmatch(stripped):
+            return REASON_PATH
+    if _looks_like_code(sample):
+        return REASON_CODE
+    if source_lang == "Auto Detect":
+        detection = detection or detect_language(sample)
+        if detection.confident and detection.language == target_lang:
+            return REASON_TARGET_LANGUAGE
+    return None
@@ -0,0 +1,452 @@
+"""Translation history records and their on-disk store.
+
+History is kept in an SQLite database in WAL mode: recording a translation
+is a single-row insert, the tray menu reads one page of recent entries at a
+time, and a retention policy (by count, age or total size) is applied every
+PRUNE_EVERY inserts instead of capping the history at a few dozen entries.
+
+Original and translated texts are indexed with an FTS5 trigram index kept
+up to date by triggers, so substring search (including CJK text) stays fast
+on large histories. Builds of SQLite without FTS5 fall back to a scan.
+"""
+
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
+
+from transpaste.core.log import log
+from transpaste.core.paths import user_data_dir
+
+if TYPE_CHECKING:
+    from transpaste.core.progress import GenerationStats
+
+HISTORY_FILENAME = "history.sqlite3"
+DEFAULT_MAX_ENTRIES = 100_000
+PRUNE_EVERY = 100
+MIN_INDEXED_TERM = 3
+SHORT_QUERY_WINDOW = 5_000
+
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+    "original, translated, content='history', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN "
+    "INSERT INTO history_fts (rowid, original, translated) VALUES (new.id, new.original, new.translated); END",
+    "CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN "
+    "INSERT INTO history_fts (history_fts, rowid, original, translated) "
+    "VALUES ('delete', old.id, old.original, old.translated); END",
+)
+# Columns added after the first release, with their SQL types; NULL in older rows.
+_STATS_COLUMNS = (
+    ("model", "TEXT NOT NULL DEFAULT ''"),
+    ("prompt_eval_count", "INTEGER"),
+    ("eval_count", "INTEGER"),
+    ("eval_duration_ms", "REAL"),
+    ("load_duration_ms", "REAL"),
+)
+_INSERT_COLUMNS = "original, translated, source_lang, target_lang, timestamp, " + ", ".join(
+    name for name, _ in _STATS_COLUMNS
+)
+_ENTRY_COLUMNS = ", ".join("h." + name for name in _INSERT_COLUMNS.split(", "))
+# What a stats column reads as in a database written before it existed; NULL if not listed.
+_MISSING_DEFAULTS = {"model": "''"}
+_PLACEHOLDERS = ", ".join("?" * (len(_INSERT_COLUMNS.split(", ")) + 2))
+
+
+@dataclass
+class TranslationEntry:
+    """Represents a single translation history entry.
+
+    Attributes:
+        original: The original source text.
+        translated: The translated result text.
+        source_lang: Source language name.
+        target_lang: Target language name.
+        timestamp: ISO format timestamp of when translation occurred.
+        model: Model that produced the translation; "" if unknown or not
+               produced by a model (cache hits, memory reuse, older entries).
+        prompt_eval_count: Prompt tokens Ollama evaluated, if reported.
+        eval_count: Output tokens Ollama generated, if reported.
+        eval_duration_ms: Time Ollama spent generating them, if reported.
+        load_duration_ms: Time Ollama spent loading the model, if reported.
+    """
+
+    original: str
+    translated: str
+    source_lang: str
+    target_lang: str
+    timestamp: str
+    model: str = ""
+    prompt_eval_count: Optional[int] = None
+    eval_count: Optional[int] = None
+    eval_duration_ms: Optional[float] = None
+    load_duration_ms: Optional[float] = None
+
+    @classmethod
+    def now(
+        cls,
+        original: str,
+        translated: str,
+        source_lang: str,
+        target_lang: str,
+        model: str = "",
+        stats: Optional["GenerationStats"] = None,
+    ) -> "TranslationEntry":
+        """Create an entry timestamped with the current local time.
+
+        Args:
+            original: The original source text.
+            translated: The translated result text.
+            source_lang: Source language name.
+            target_lang: Target language name.
+            model: Model that produced the translation.
+            stats: Ollama counters of the generation, if it was one.
+        """
+        entry = cls(original, translated, source_lang, target_lang, datetime.now().isoformat(), model)
+        if stats is not None:
+            entry.prompt_eval_count = stats.prompt_eval_count
+            entry.eval_count = stats.eval_count
+            entry.eval_duration_ms = stats.eval_duration_ms
+            entry.load_duration_ms = stats.load_duration_ms
+        return entry
+
+    def row(self) -> tuple:
+        """Return the values of the history table's entry columns, in order."""
+        return (
+            self.original,
+            self.translated,
+            self.source_lang,
+            self.target_lang,
+            self.timestamp,
+            self.model,
+            self.prompt_eval_count,
+            self.eval_count,
+            self.eval_duration_ms,
+            self.load_duration_ms,
+        )
+
+
+@dataclass
+class RetentionPolicy:
+    """Limits on how much history is kept; None disables a limit.
+
+    Attributes:
+        max_entries: Keep at most this many of the newest entries.
+        max_age_days: Drop entries older than this many days.
+        max_bytes: Keep the newest entries whose texts total at most this many bytes.
+    """
+
+    max_entries: Optional[int] = DEFAULT_MAX_ENTRIES
+    max_age_days: Optional[float] = None
+    max_bytes: Optional[int] = None
+
+
+def default_history_path() -> str:
+    """Return the default on-disk location of the history database."""
+    return os.path.join(user_data_dir(), HISTORY_FILENAME)
+
+
+def load_history(data: str) -> List[TranslationEntry]:
+    """Parse the JSON array that older versions stored in QSettings.
+
+    Args:
+        data: JSON text; empty or malformed data yields an empty history.
+
+    Returns:
+        The entries, oldest first.
+    """
+    if not data:
+        return []
+    try:
+        return [TranslationEntry(**entry) for entry in json.loads(data)]
+    except (ValueError, TypeError) as e:
+        log(f"Failed to load history: {e}", "WARN")
+        return []
+
+
+class HistoryStore:
+    """Append-only translation history backed by SQLite.
+
+    All public methods are thread-safe.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, retention: Optional[RetentionPolicy] = None, read_only: bool = False
+    ):
+        """Open (or create) the history database.
+
+        Args:
+            path: SQLite database file. If None, history is kept in memory only.
+            retention: Retention policy; defaults to RetentionPolicy().
+            read_only: Open an existing database for reading only, without creating,
+                       migrating, indexing or pruning anything, so that another process
+                       writing to it is not disturbed.
+
+        Raises:
+            sqlite3.Error: If read_only is set and the database cannot be opened.
+        """
+        self.path = path
+        self.retention = retention or RetentionPolicy()
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._inserts_since_prune = 0
+        self._entry_columns = _ENTRY_COLUMNS
+
+        if read_only:
+            self._open_read_only(path or ":memory:")
+            return
+
+        try:
+            self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+            if path:
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            log(f"Failed to open history database, using memory only: {e}", "WARN")
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, original TEXT NOT NULL, translated TEXT NOT NULL, "
+            "source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, timestamp TEXT NOT NULL, "
+            "created REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._add_stats_columns()
+        self._db.execute("CREATE INDEX IF NOT EXISTS history_created ON history (created)")
+        self.has_fts = self._create_fts()
+        self._db.commit()
+        self.prune()
+        log(f"History store opened at {path or ':memory:'}")
+
+    def _open_read_only(self, path: str) -> None:
+        """Connect without writing, reading columns the database predates as defaults."""
+        uri = pathlib.Path(path).absolute().as_uri() + "?mode=ro"
+        self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(history)")}
+        if not existing:
+            self._db.close()
+            raise sqlite3.OperationalError(f"no history table in {path}")
+        self._entry_columns = ", ".join(
+            "h." + name if name in existing else f"{_MISSING_DEFAULTS.get(name, 'NULL')} AS {name}"
+            for name in _INSERT_COLUMNS.split(", ")
+        )
+        self.has_fts = bool(self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'history_fts'").fetchone())
+        log(f"History store opened read-only at {path}")
+
+    def _add_stats_columns(self) -> None:
+        """Add the model and generation counter columns to databases written before they existed."""
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(history)")}
+        for name, sql_type in _STATS_COLUMNS:
+            if name not in existing:
+                self._db.execute(f"ALTER TABLE history ADD COLUMN {name} {sql_type}")
+
+    def _create_fts(self) -> bool:
+        """Create the full-text index, backfilling it for databases written before it existed.
+
+        Returns:
+            False if this SQLite build has no FTS5 trigram tokenizer.
+        """
+        try:
+            existed = self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'history_fts'").fetchone()
+            for statement in _FTS_SCHEMA:
+                self._db.execute(statement)
+            if not existed:
+                self._db.execute("INSERT INTO history_fts (history_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.Error as e:
+            log(f"Full-text history search unavailable, falling back to scanning: {e}", "WARN")
+            return False
+
+    def add(self, entry: TranslationEntry) -> None:
+        """Append an entry; the retention policy is enforced every PRUNE_EVERY inserts.
+
+        Args:
+            entry: The entry to record.
+        """
+        size = len(entry.original.encode("utf-8")) + len(entry.translated.encode("utf-8"))
+        with self._lock:
+            try:
+                self._db.execute(
+                    f"INSERT INTO history ({_INSERT_COLUMNS}, created, size) VALUES ({_PLACEHOLDERS})",
+                    entry.row() + (time.time(), size),
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                log(f"History write failed: {e}", "WARN")
+                return
+            self._inserts_since_prune += 1
+            due = self._inserts_since_prune >= PRUNE_EVERY
+        if due:
+            self.prune()
+
+    def add_many(self, entries: List[TranslationEntry]) -> None:
+        """Append several entries in one transaction, oldest first."""
+        rows = [
+            e.row() + (time.time(), len(e.original.encode("utf-8")) + len(e.translated.encode("utf-8")))
+            for e in entries
+        ]
+        with self._lock:
+            try:
+                self._db.executemany(
+                    f"INSERT INTO history ({_INSERT_COLUMNS}, created, size) VALUES ({_PLACEHOLDERS})", rows
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                log(f"History write failed: {e}", "WARN")
+        self.prune()
+
+    def recent(self, limit: int = 10, offset: int = 0) -> List[TranslationEntry]:
+        """Return one page of entries, newest first.
+
+        Args:
+            limit: Page size.
+            offset: Number of newer entries to skip.
+
+        Returns:
+            Up to limit entries.
+        """
+        with self._lock:
+            try:
+                rows = self._db.execute(
+                    f"SELECT {self._entry_columns} FROM history h ORDER BY h.id DESC LIMIT ? OFFSET ?",
+                    (limit, offset),
+                ).fetchall()
+            except sqlite3.Error as e:
+                log(f"History read failed: {e}", "WARN")
+                return []
+        return [TranslationEntry(*row) for row in rows]
+
+    def search(self, query: str, limit: int = 50) -> List[TranslationEntry]:
+        """Find entries whose original or translated text contains every term of query.
+
+        Matching is case-insensitive substring matching per whitespace-separated
+        term. Terms of MIN_INDEXED_TERM or more characters use the full-text
+        index; shorter terms can only be checked row by row, so they filter at
+        most the newest SHORT_QUERY_WINDOW candidates (index matches, or all
+        entries for a query of short terms only, such as the first keystrokes
+        of an as-you-type search).
+
+        Args:
+            query: Search terms; an empty query returns the newest entries.
+            limit: Maximum number of results.
+
+        Returns:
+            Matching entries, newest first.
+        """
+        terms = query.split()
+        if not terms:
+            return self.recent(limit)
+
+        indexed = [t for t in terms if len(t) >= MIN_INDEXED_TERM] if self.has_fts else []
+        scanned = [t for t in terms if t not in indexed]
+        params: List[object] = []
+        match = " AND ".join('"' + t.replace('"', '""') + '"' for t in indexed)
+        if indexed and not scanned:
+            sql = (
+                f"SELECT {self._entry_columns} FROM history_fts JOIN history h ON h.id = history_fts.rowid "
+                "WHERE history_fts MATCH ?"
+            )
+            params.append(match)
+            order = "history_fts.rowid"
+        elif indexed:
+            sql = (
+                f"SELECT {self._entry_columns} FROM history h WHERE h.id IN "
+                "(SELECT rowid FROM history_fts WHERE history_fts MATCH ? ORDER BY rowid DESC LIMIT ?)"
+            )
+            params.extend([match, SHORT_QUERY_WINDOW])
+            order = "h.id"
+        elif self.has_fts:
+            sql = f"SELECT {self._entry_columns} FROM history h WHERE h.id > (SELECT MAX(id) FROM history) - ?"
+            params.append(SHORT_QUERY_WINDOW)
+            order = "h.id"
+        else:
+            sql = f"SELECT {self._entry_columns} FROM history h WHERE 1"
+            order = "h.id"
+        for term in scanned:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            sql += " AND (h.original LIKE ? ESCAPE '\\' OR h.translated LIKE ? ESCAPE '\\')"
+            params.extend([pattern, pattern])
+        sql += f" ORDER BY {order} DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            try:
+                rows = self._db.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                log(f"History search failed: {e}", "WARN")
+                return []
+        return [TranslationEntry(*row) for row in rows]
+
+    def prune(self) -> int:
+        """Apply the retention policy now.
+
+        Returns:
+            Number of entries removed.
+        """
+        policy = self.retention
+        with self._lock:
+            self._inserts_since_prune = 0
+            removed = 0
+            try:
+                if policy.max_age_days is not None:
+                    cutoff = time.time() - policy.max_age_days * 86400
+                    removed += self._db.execute("DELETE FROM history WHERE created < ?", (cutoff,)).rowcount
+                if policy.max_entries is not None:
+                    removed += self._db.execute(
+                        "DELETE FROM history WHERE id <= " "(SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (max(0, policy.max_entries),),
+                    ).rowcount
+                if policy.max_bytes is not None:
+                    removed += self._prune_size(policy.max_bytes)
+                self._db.commit()
+            except sqlite3.Error as e:
+                log(f"History prune failed: {e}", "WARN")
+        if removed:
+            log(f"History retention removed {removed} entries")
+        return removed
+
+    def _prune_size(self, max_bytes: int) -> int:
+        """Delete the oldest entries until the rest fit in max_bytes. Caller holds the lock.
+
+        Returns:
+            Number of entries removed.
+        """
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM history").fetchone()[0]
+        excess = total - max_bytes
+        if excess <= 0:
+            return 0
+        cutoff = None
+        for row_id, size in self._db.execute("SELECT id, size FROM history ORDER BY id"):
+            cutoff = row_id
+            excess -= size
+            if excess <= 0:
+                break
+        if cutoff is None:
+            return 0
+        return self._db.execute("DELETE FROM history WHERE id <= ?", (cutoff,)).rowcount
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            try:
+                self._db.execute("DELETE FROM history")
+                self._db.commit()
+            except sqlite3.Error as e:
+                log(f"History clear failed: {e}", "WARN")
+
+    def close(self) -> None:
+        """Close the backing database."""
+        with self._lock:
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            try:
+                return self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            except sqlite3.Error:
+                return 0
@@ -0,0 +1,124 @@
+"""Deduplication of clipboard change events.
+
+One copy can reach the tray app several times: as one or more dataChanged
+signals, through clipboard polling, and, on macOS, once more for each of
+the repeated setText() calls TransPaste makes when it writes a translation
+back. ClipboardGate decides once per content whether it is new, by hash, so
+the same copy is handled exactly once however many events announce it.
+
+It remembers the content currently on the clipboard, which is never new
+again until something else is copied, plus the hashes of contents seen or
+written by TransPaste itself within the last few seconds, so that a late
+event for an older content is not taken for a fresh copy either.
+"""
+
+import hashlib
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Optional
+
+DEFAULT_DEBOUNCE_MS = 100
+DEFAULT_DEDUP_WINDOW = 2.0
+MAX_RECENT_HASHES = 32
+
+REASON_EMPTY = "empty"
+REASON_UNCHANGED = "unchanged"
+REASON_SEEN = "seen recently"
+REASON_SELF_WRITTEN = "written by TransPaste"
+
+
+def content_hash(text: str) -> bytes:
+    """Return a short digest of clipboard text."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class ClipboardGate:
+    """Admits each clipboard content once, however many change events report it.
+
+    Not thread-safe; it is used from the GUI thread only.
+
+    Attributes:
+        window: Seconds a seen or self-written content stays remembered.
+        accepted: Number of contents admitted.
+        suppressed: Number of rejected events per reason.
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_DEDUP_WINDOW,
+        max_entries: int = MAX_RECENT_HASHES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the gate.
+
+        Args:
+            window: Seconds a seen or self-written content stays remembered.
+            max_entries: Most hashes remembered; the oldest are forgotten first.
+            clock: Monotonic time source in seconds.
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self.clock = clock
+        self.accepted = 0
+        self.suppressed: Counter = Counter()
+        self._current: Optional[bytes] = None
+        # hash -> (time remembered, written by us)
+        self._recent: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+    def check(self, text: str) -> Optional[str]:
+        """Record a clipboard content and say whether it is a new copy.
+
+        Args:
+            text: The clipboard text an event reported.
+
+        Returns:
+            None if the text should be handled, otherwise why it is not
+            (REASON_EMPTY, REASON_UNCHANGED, REASON_SEEN or REASON_SELF_WRITTEN).
+        """
+        if not text or not text.strip():
+            return self._suppress(REASON_EMPTY)
+        digest = content_hash(text)
+        if digest == self._current:
+            return self._suppress(REASON_UNCHANGED)
+        self._current = digest
+        now = self.clock()
+        self._expire(now)
+        recent = self._recent.get(digest)
+        if recent is not None:
+            return self._suppress(REASON_SELF_WRITTEN if recent[1] else REASON_SEEN)
+        self._remember(digest, now, written=False)
+        self.accepted += 1
+        return None
+
+    def mark_written(self, text: str) -> None:
+        """Note that TransPaste itself is putting text on the clipboard.
+
+        Events for it are then suppressed: while it stays on the clipboard,
+        and for the window after something else was copied over it.
+        """
+        digest = content_hash(text)
+        self._current = digest
+        now = self.clock()
+        self._expire(now)
+        self._remember(digest, now, written=True)
+
+    def is_current(self, text: str) -> bool:
+        """Whether text is the content the gate last saw or wrote."""
+        return content_hash(text) == self._current
+
+    def _remember(self, digest: bytes, now: float, written: bool) -> None:
+        self._recent.pop(digest, None)
+        self._recent[digest] = (now, written)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+    def _expire(self, now: float) -> None:
+        while self._recent:
+            digest, (seen_at, _) = next(iter(self._recent.items()))
+            if now - seen_at < self.window:
+                break
+            del self._recent[digest]
+
+    def _suppress(self, reason: str) -> str:
+        self.suppressed[reason] += 1
+        return reason
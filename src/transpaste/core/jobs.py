@@ -0,0 +1,102 @@
+"""Pending translation jobs.
+
+Clipboard events that arrive while a translation is running are queued here
+instead of being dropped. The queue is bounded and, in latest-wins mode, a
+newer copy replaces any job that has not started yet.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+
+@dataclass
+class TranslationJob:
+    """A single request to translate one clipboard text.
+
+    Attributes:
+        text: The text to translate.
+        config: Translation config captured when the text was copied.
+        cache_key: Translation cache key, if caching is enabled.
+        enqueued_at: time.monotonic() timestamp of creation.
+    """
+
+    text: str
+    config: Dict[str, Any]
+    cache_key: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    def wait_time(self) -> float:
+        """Return seconds elapsed since the job was created."""
+        return time.monotonic() - self.enqueued_at
+
+
+class JobQueue:
+    """Bounded FIFO of translation jobs that have not started yet.
+
+    Attributes:
+        max_size: Maximum number of pending jobs.
+        coalesce: If True (latest-wins), a new job replaces all pending jobs.
+        superseded: Number of jobs replaced by a newer copy.
+        dropped: Number of jobs evicted because the queue was full.
+    """
+
+    def __init__(self, max_size: int = 8, coalesce: bool = True):
+        """Initialize the queue.
+
+        Args:
+            max_size: Maximum number of pending jobs (at least 1).
+            coalesce: Enable latest-wins coalescing.
+        """
+        self.max_size = max(1, max_size)
+        self.coalesce = coalesce
+        self.superseded = 0
+        self.dropped = 0
+        self._jobs: Deque[TranslationJob] = deque()
+
+    def push(self, job: TranslationJob) -> Optional[TranslationJob]:
+        """Add a job to the back of the queue.
+
+        Args:
+            job: The job to enqueue.
+
+        Returns:
+            The job that was superseded or evicted to make room, if any. A job
+            identical to one already pending is not added twice.
+        """
+        if any(pending.text == job.text and pending.config == job.config for pending in self._jobs):
+            return None
+
+        removed = None
+        if self.coalesce and self._jobs:
+            removed = self._jobs[-1]
+            self.superseded += len(self._jobs)
+            self._jobs.clear()
+        elif len(self._jobs) >= self.max_size:
+            removed = self._jobs.popleft()
+            self.dropped += 1
+
+        self._jobs.append(job)
+        return removed
+
+    def pop(self) -> Optional[TranslationJob]:
+        """Remove and return the oldest pending job, or None if the queue is empty."""
+        return self._jobs.popleft() if self._jobs else None
+
+    def clear(self) -> int:
+        """Discard all pending jobs.
+
+        Returns:
+            Number of jobs discarded.
+        """
+        count = len(self._jobs)
+        self._jobs.clear()
+        return count
+
+    def oldest_wait(self) -> float:
+        """Return how long the oldest pending job has been waiting, in seconds."""
+        return self._jobs[0].wait_time() if self._jobs else 0.0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
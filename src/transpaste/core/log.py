@@ -0,0 +1,47 @@
+"""Logging helpers shared by every TransPaste module."""
+
+import logging
+
+DEBUG = False
+
+_logger = logging.getLogger("transpaste")
+
+
+def setup_logging(debug: bool = False) -> None:
+    """Configure logging for the application.
+
+    Args:
+        debug: If True, set log level to DEBUG with verbose output.
+               If False, set log level to WARNING (errors only).
+    """
+    global DEBUG
+    DEBUG = debug
+
+    if debug:
+        logging.basicConfig(
+            level=logging.DEBUG,
+            format="%(asctime)s [%(levelname)s] %(message)s",
+            datefmt="%H:%M:%S",
+        )
+    else:
+        logging.basicConfig(
+            level=logging.WARNING,
+            format="%(asctime)s [%(levelname)s] %(message)s",
+            datefmt="%H:%M:%S",
+        )
+
+
+def log(message: str, level: str = "INFO") -> None:
+    """Print debug message with timestamp.
+
+    Args:
+        message: The log message.
+        level: Log level string (DEBUG, INFO, WARN, ERROR).
+    """
+    level_map = {
+        "DEBUG": logging.DEBUG,
+        "INFO": logging.INFO,
+        "WARN": logging.WARNING,
+        "ERROR": logging.ERROR,
+    }
+    _logger.log(level_map.get(level, logging.INFO), message)
@@ -0,0 +1,352 @@
+"""Translation memory: fuzzy reuse of earlier translations.
+
+Much of what gets copied is nearly identical to something translated before,
+such as log lines that differ only in an ID or UI strings with one changed
+word. TranslationMemory indexes past translations by character trigrams,
+picks candidates that share the rarest trigrams of a new text and scores
+them by token edit distance, counting tokens with digits as equal. A close match whose differences are all
+placeables (tokens copied verbatim into the old translation, such as
+numbers, IDs and names) is reused with those tokens substituted; other close
+matches are passed to build_prompt() as a reference example.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from transpaste.core.history import TranslationEntry
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_REUSE_THRESHOLD = 0.75
+DEFAULT_REFERENCE_THRESHOLD = 0.6
+MAX_TEXT_CHARS = 2_000
+MAX_CANDIDATES = 20
+# A candidate must share this fraction of the query's trigrams to be scored.
+CANDIDATE_OVERLAP = 0.4
+
+_CJK = "぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+# Words, single CJK characters, or single punctuation marks.
+_TOKEN_RE = re.compile(rf"[{_CJK}]|[^\W{_CJK}]+|[^\w\s]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into the tokens edit distance is measured in.
+
+    Args:
+        text: Text to split.
+
+    Returns:
+        Words, single CJK characters and punctuation marks, in order.
+    """
+    return _TOKEN_RE.findall(text)
+
+
+def score_tokens(text: str) -> List[str]:
+    """Tokenize text for similarity scoring, with every token containing a digit
+    replaced by one placeholder so that differing numbers and IDs cost nothing.
+    """
+    return ["#" if any(ch.isdigit() for ch in token) else token for token in tokenize(text)]
+
+
+def trigrams(text: str) -> set:
+    """Return the set of lower-cased character trigrams of text, whitespace collapsed."""
+    normalized = " ".join(text.lower().split())
+    return {normalized[i : i + 3] for i in range(len(normalized) - 2)}
+
+
+def edit_distance(a: List[str], b: List[str], limit: Optional[int] = None) -> int:
+    """Levenshtein distance between two token lists.
+
+    Args:
+        a: First token list.
+        b: Second token list.
+        limit: Stop early and return limit + 1 once the distance must exceed it.
+
+    Returns:
+        Minimum number of token insertions, deletions and substitutions.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, token in enumerate(a, start=1):
+        current = [i]
+        for j, other in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (token != other)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def similarity(a: List[str], b: List[str], minimum: float = 0.0) -> float:
+    """Token edit similarity: 1 - distance / length of the longer list.
+
+    Args:
+        a: First token list.
+        b: Second token list.
+        minimum: Similarities below this may be reported as 0 to save work.
+
+    Returns:
+        Similarity between 0 and 1.
+    """
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    limit = int((1 - minimum) * longest)
+    distance = edit_distance(a, b, limit)
+    return 0.0 if distance > limit else 1 - distance / longest
+
+
+def substitute_placeables(original: str, translated: str, text: str) -> Optional[str]:
+    """Adapt translated, the translation of original, into a translation of text.
+
+    Works only if every difference between original and text replaces
+    tokens one for one, and each replaced token occurs exactly once in
+    translated, where it is swapped for its replacement.
+
+    Args:
+        original: Source text of the stored translation.
+        translated: The stored translation.
+        text: New source text.
+
+    Returns:
+        The adapted translation, or None if the differences are not placeables.
+    """
+    old_tokens, new_tokens = tokenize(original), tokenize(text)
+    spans: Dict[str, List[Tuple[int, int]]] = {}
+    for match in _TOKEN_RE.finditer(translated):
+        spans.setdefault(match.group(), []).append(match.span())
+
+    replacements = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_tokens, new_tokens, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        if tag != "replace" or i2 - i1 != j2 - j1:
+            return None
+        for old, new in zip(old_tokens[i1:i2], new_tokens[j1:j2]):
+            if len(spans.get(old, ())) != 1:
+                return None
+            replacements.append((spans[old][0], new))
+
+    if len({span for span, _ in replacements}) != len(replacements):
+        return None
+    for (start, end), new in sorted(replacements, reverse=True):
+        translated = translated[:start] + new + translated[end:]
+    return translated
+
+
+@dataclass
+class MemoryMatch:
+    """Result of a translation memory lookup.
+
+    Attributes:
+        original: Source text of the matched translation.
+        translated: The matched translation.
+        score: Token edit similarity to the looked-up text (0-1), with numbers
+               and IDs counted as equal.
+        reused: The translation adapted to the looked-up text, if it can be
+                used without asking the model; otherwise None and the match
+                is only a reference example.
+    """
+
+    original: str
+    translated: str
+    score: float
+    reused: Optional[str] = None
+
+
+class TranslationMemory:
+    """In-memory fuzzy index over past translations.
+
+    All public methods are thread-safe.
+
+    Attributes:
+        reuse_threshold: Minimum similarity for reusing a stored translation.
+        reference_threshold: Minimum similarity for offering it as a reference example.
+        lookups: Number of lookup() calls.
+        reused: Number of lookups answered with a reused translation.
+        referenced: Number of lookups that returned a reference example only.
+        lookup_seconds: Total time spent in lookup().
+    """
+
+    def __init__(
+        self,
+        reuse_threshold: float = DEFAULT_REUSE_THRESHOLD,
+        reference_threshold: float = DEFAULT_REFERENCE_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Initialize an empty memory.
+
+        Args:
+            reuse_threshold: Minimum similarity for reusing a stored translation.
+            reference_threshold: Minimum similarity for offering it as a reference example.
+            max_entries: Number of translations kept; the oldest are forgotten first.
+        """
+        self.reuse_threshold = reuse_threshold
+        self.reference_threshold = reference_threshold
+        self.max_entries = max_entries
+        self.lookups = 0
+        self.reused = 0
+        self.referenced = 0
+        self.lookup_seconds = 0.0
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # id -> (original, translated, source_lang, target_lang, tokens, trigram count)
+        self._entries: Dict[int, Tuple[str, str, str, str, List[str], int]] = {}
+        self._ids_by_text: Dict[Tuple[str, str], int] = {}
+        # (target_lang, trigram) -> ids of entries containing it
+        self._postings: Dict[Tuple[str, str], List[int]] = {}
+        self._stale_postings = 0
+
+    def load(self, entries: Iterable[TranslationEntry]) -> None:
+        """Add history entries, oldest first.
+
+        Args:
+            entries: Entries in chronological order.
+        """
+        for entry in entries:
+            self.add(entry.original, entry.translated, entry.source_lang, entry.target_lang)
+
+    def add(self, original: str, translated: str, source_lang: str, target_lang: str) -> None:
+        """Remember a translation, replacing any earlier one of the same text and target.
+
+        Args:
+            original: Source text.
+            translated: Its final translation.
+            source_lang: Source language display name.
+            target_lang: Target language display name.
+        """
+        grams = trigrams(original)
+        if not grams or len(original) > MAX_TEXT_CHARS or not translated.strip():
+            return
+        with self._lock:
+            self._forget(self._ids_by_text.get((original, target_lang)))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (
+                original,
+                translated,
+                source_lang,
+                target_lang,
+                score_tokens(original),
+                len(grams),
+            )
+            self._ids_by_text[(original, target_lang)] = entry_id
+            for gram in grams:
+                self._postings.setdefault((target_lang, gram), []).append(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._forget(next(iter(self._entries)))
+            if self._stale_postings > len(self._entries) * 50:
+                self._compact()
+
+    def lookup(self, text: str, source_lang: str, target_lang: str) -> Optional[MemoryMatch]:
+        """Find the stored translation closest to text and update the counters.
+
+        Only translations into the same target language count; the source
+        language must match too unless either side was "Auto Detect".
+
+        Args:
+            text: Text about to be translated.
+            source_lang: Source language display name.
+            target_lang: Target language display name.
+
+        Returns:
+            The best match at or above reference_threshold, or None.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            try:
+                match = self._lookup(text, source_lang, target_lang)
+            finally:
+                self.lookups += 1
+                self.lookup_seconds += time.perf_counter() - start
+            if match is not None:
+                if match.reused is not None:
+                    self.reused += 1
+                else:
+                    self.referenced += 1
+            return match
+
+    def clear(self) -> None:
+        """Forget every translation and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._ids_by_text.clear()
+            self._postings.clear()
+            self._stale_postings = 0
+            self.lookups = self.reused = self.referenced = 0
+            self.lookup_seconds = 0.0
+
+    @property
+    def average_lookup_ms(self) -> float:
+        """Mean lookup() latency in milliseconds."""
+        return self.lookup_seconds * 1000 / self.lookups if self.lookups else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _lookup(self, text: str, source_lang: str, target_lang: str) -> Optional[MemoryMatch]:
+        """lookup() without locking or counters. Caller holds the lock."""
+        grams = trigrams(text)
+        if not grams or len(text) > MAX_TEXT_CHARS:
+            return None
+
+        # Any entry sharing CANDIDATE_OVERLAP of the query's trigrams shares at
+        # least one of its rarest len(grams) - needed + 1, so only their
+        # (short) posting lists are read.
+        needed = max(1, int(len(grams) * CANDIDATE_OVERLAP))
+        lists = sorted((self._postings.get((target_lang, gram), ()) for gram in grams), key=len)
+        shared = Counter()
+        for ids in lists[: len(grams) - needed + 1]:
+            shared.update(ids)
+
+        tokens = score_tokens(text)
+        best: Optional[MemoryMatch] = None
+        for entry_id, _ in shared.most_common(MAX_CANDIDATES):
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            original, translated, entry_source, _, entry_tokens, _ = entry
+            if entry_source != source_lang and "Auto Detect" not in (entry_source, source_lang):
+                continue
+            floor = best.score if best is not None else self.reference_threshold
+            score = similarity(tokens, entry_tokens, floor)
+            if score >= floor and (best is None or score > best.score):
+                best = MemoryMatch(original, translated, score)
+                if score == 1.0:
+                    break
+
+        if best is None or best.score < self.reference_threshold:
+            return None
+        if best.score >= self.reuse_threshold:
+            if best.original == text:
+                best.reused = best.translated
+            else:
+                best.reused = substitute_placeables(best.original, best.translated, text)
+        return best
+
+    def _forget(self, entry_id: Optional[int]) -> None:
+        """Drop an entry; its postings are removed lazily. Caller holds the lock."""
+        entry = self._entries.pop(entry_id, None) if entry_id is not None else None
+        if entry is None:
+            return
+        if self._ids_by_text.get((entry[0], entry[3])) == entry_id:
+            del self._ids_by_text[(entry[0], entry[3])]
+        self._stale_postings += entry[5]
+
+    def _compact(self) -> None:
+        """Remove postings of forgotten entries. Caller holds the lock."""
+        postings = {}
+        for key, ids in self._postings.items():
+            live = [entry_id for entry_id in ids if entry_id in self._entries]
+            if live:
+                postings[key] = live
+        self._postings = postings
+        self._stale_postings = 0
@@ -0,0 +1,264 @@
+"""Per-stage latency and throughput metrics.
+
+Every translation stage (clipboard read, prompt build, connect, first token,
+generation rate, post-processing, clipboard write) is observed into a
+rolling window per (stage, model, endpoint). MetricsStore summarizes the
+windows as p50/p95 and exports them as JSON or in the Prometheus text
+format; MetricsServer serves both on a local HTTP port.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from transpaste.core.log import log
+
+DEFAULT_WINDOW = 1000
+
+# Stage names, in pipeline order.
+STAGE_CLIPBOARD_READ = "clipboard_read"
+STAGE_PROMPT_BUILD = "prompt_build"
+STAGE_CONNECT = "connect"
+STAGE_FIRST_TOKEN = "first_token"
+STAGE_TOKEN_RATE = "tokens_per_second"
+STAGE_POST_PROCESS = "post_process"
+STAGE_TRANSLATE = "translate"
+STAGE_CLIPBOARD_WRITE = "clipboard_write"
+STAGES = (
+    STAGE_CLIPBOARD_READ,
+    STAGE_PROMPT_BUILD,
+    STAGE_CONNECT,
+    STAGE_FIRST_TOKEN,
+    STAGE_TOKEN_RATE,
+    STAGE_POST_PROCESS,
+    STAGE_TRANSLATE,
+    STAGE_CLIPBOARD_WRITE,
+)
+# Stages observed as rates rather than durations in seconds.
+RATE_STAGES = frozenset({STAGE_TOKEN_RATE})
+
+
+class RollingHistogram:
+    """The most recent observations of one series, plus all-time count and sum.
+
+    Attributes:
+        count: Number of observations ever made.
+        total: Sum of all observations ever made.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        """Initialize an empty histogram.
+
+        Args:
+            window: Number of recent observations quantiles are computed over.
+        """
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the nearest-rank q-quantile (0-1) of the window, or None if empty."""
+        return _nearest_rank(sorted(self.samples), q) if self.samples else None
+
+
+@dataclass
+class StageSummary:
+    """Summary of one (stage, model, endpoint) series.
+
+    Durations are in milliseconds; rate stages are in their own unit.
+
+    Attributes:
+        stage: Stage name, one of STAGES.
+        model: Model name, or "" for stages that do not involve the model.
+        endpoint: Ollama endpoint URL, or "".
+        unit: "ms" or "tokens/s".
+        count: Number of observations ever made.
+        p50: Median of the rolling window.
+        p95: 95th percentile of the rolling window.
+        mean: Mean of the rolling window.
+    """
+
+    stage: str
+    model: str
+    endpoint: str
+    unit: str
+    count: int
+    p50: float
+    p95: float
+    mean: float
+
+
+class MetricsStore:
+    """Thread-safe rolling histograms keyed by stage, model and endpoint."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        """Initialize an empty store.
+
+        Args:
+            window: Number of recent observations kept per series.
+        """
+        self.window = window
+        self._series: Dict[Tuple[str, str, str], RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, value: float, model: str = "", endpoint: str = "") -> None:
+        """Record one observation.
+
+        Args:
+            stage: Stage name, one of STAGES.
+            value: Duration in seconds, or the rate for RATE_STAGES.
+            model: Model the stage ran with, if any.
+            endpoint: Endpoint the stage ran against, if any.
+        """
+        with self._lock:
+            series = self._series.get((stage, model, endpoint))
+            if series is None:
+                series = self._series[(stage, model, endpoint)] = RollingHistogram(self.window)
+            series.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str, model: str = "", endpoint: str = "") -> Iterator[None]:
+        """Observe the duration of a with-block as stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, model, endpoint)
+
+    def summaries(self) -> List[StageSummary]:
+        """Summarize every series, in pipeline order of stages.
+
+        Returns:
+            One StageSummary per (stage, model, endpoint) with observations.
+        """
+        with self._lock:
+            items = [(key, list(series.samples), series.count) for key, series in self._series.items()]
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        result = []
+        for (stage, model, endpoint), samples, count in sorted(items, key=lambda i: (order.get(i[0][0], 99), i[0])):
+            if not samples:
+                continue
+            scale = 1.0 if stage in RATE_STAGES else 1000.0
+            ordered = sorted(sample * scale for sample in samples)
+            result.append(
+                StageSummary(
+                    stage,
+                    model,
+                    endpoint,
+                    "tokens/s" if stage in RATE_STAGES else "ms",
+                    count,
+                    _nearest_rank(ordered, 0.5),
+                    _nearest_rank(ordered, 0.95),
+                    sum(ordered) / len(ordered),
+                )
+            )
+        return result
+
+    def clear(self) -> None:
+        """Drop every observation."""
+        with self._lock:
+            self._series.clear()
+
+    def to_json(self) -> str:
+        """Export the summaries as a JSON document."""
+        return json.dumps({"window": self.window, "metrics": [asdict(s) for s in self.summaries()]}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Export every series as a Prometheus summary in the text exposition format."""
+        with self._lock:
+            snapshot = [
+                (key, sorted(series.samples), series.count, series.total)
+                for key, series in sorted(self._series.items())
+                if series.samples
+            ]
+
+        lines = []
+        for name, rate, help_text in (
+            ("transpaste_stage_seconds", False, "Duration of each translation stage."),
+            ("transpaste_tokens_per_second", True, "Generation speed of each translation."),
+        ):
+            rows = [row for row in snapshot if (row[0][0] in RATE_STAGES) == rate]
+            if not rows:
+                continue
+            lines.append(f"# HELP {name} {help_text} Quantiles cover the last {self.window} observations.")
+            lines.append(f"# TYPE {name} summary")
+            for (stage, model, endpoint), samples, count, total in rows:
+                labels = f'model="{_escape(model)}",endpoint="{_escape(endpoint)}"'
+                if not rate:
+                    labels = f'stage="{_escape(stage)}",' + labels
+                for q in (0.5, 0.95):
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {_nearest_rank(samples, q):.6g}')
+                lines.append(f"{name}_sum{{{labels}}} {total:.6g}")
+                lines.append(f"{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _nearest_rank(ordered: List[float], q: float) -> float:
+    """Return the nearest-rank q-quantile (0-1) of a sorted, non-empty list."""
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsServer:
+    """Local HTTP endpoint serving a MetricsStore.
+
+    GET /metrics returns the Prometheus text format, GET /metrics.json the
+    JSON summaries. The server runs on a daemon thread.
+    """
+
+    def __init__(self, store: MetricsStore, port: int, host: str = "127.0.0.1"):
+        """Start serving.
+
+        Args:
+            store: Metrics to export.
+            port: TCP port; 0 picks a free one.
+            host: Interface to bind; loopback by default.
+
+        Raises:
+            OSError: If the port cannot be bound.
+        """
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == "/metrics":
+                    body, content_type = store.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = store.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_address[1]}/metrics"
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        log(f"Serving metrics at {self.url}")
+
+    def close(self) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
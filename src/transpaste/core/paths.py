@@ -0,0 +1,23 @@
+"""Per-user storage locations for TransPaste data files."""
+
+import os
+import sys
+
+
+def user_data_dir() -> str:
+    """Return the per-user directory for TransPaste data files, creating it if needed.
+
+    Returns:
+        Absolute path to the data directory.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        path = os.path.join(base, "TransPaste")
+    elif sys.platform == "darwin":
+        path = os.path.expanduser("~/Library/Application Support/TransPaste")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        path = os.path.join(base, "transpaste")
+
+    os.makedirs(path, exist_ok=True)
+    return path
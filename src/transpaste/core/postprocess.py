@@ -0,0 +1,193 @@
+"""Cleanup of raw LLM translation output.
+
+Post-processing is an ordered pipeline of cleaners, each a function of
+(text, original) returning the cleaned text. The default pipeline removes
+chatty prefixes such as "Here is the translation:", a markdown code fence
+around the whole output and quotes the source text did not have. Optional
+cleaners, built in or added with register_cleaner(), are enabled by name,
+e.g. for models that think aloud in <think> tags before answering.
+
+Every pattern is compiled once at import, and the default cleaners only
+look at the start and end of the output rather than rescanning all of it.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+CleanerFunc = Callable[[str, str], str]
+
+_PREFIX_RE = re.compile(
+    r"(?:here is the translation.*?:|here's the translation.*?:|sure, here is the translation.*?:"
+    r"|translation:|translated text:)\s*",
+    re.IGNORECASE,
+)
+# A reply may stack prefixes ("Sure, here is the translation: Translation: ..."), one per phrase at most.
+_MAX_PREFIXES = 5
+_FENCE = "```"
+_FENCE_TAGS = ("text", "markdown")
+_THINKING_RE = re.compile(r"<(think|thinking|reasoning)>.*?</\1>\s*", re.DOTALL | re.IGNORECASE)
+_NOTE_RE = re.compile(r"\n\s*\(?(?:translator'?s? )?(?:notes?|translation notes?)\s*:", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Cleaner:
+    """A named post-processing step.
+
+    Attributes:
+        name: Name the cleaner is enabled by.
+        order: Position in the pipeline; lower runs first. The built-in
+               cleaners use 10 (thinking) to 50 (trailing_note).
+        clean: Function of (text, original) returning the cleaned text.
+    """
+
+    name: str
+    order: int
+    clean: CleanerFunc
+
+
+def strip_prefixes(text: str, original: str) -> str:
+    """Remove "Here is the translation:"-style prefixes, all with one pattern."""
+    for _ in range(_MAX_PREFIXES):
+        match = _PREFIX_RE.match(text)
+        if match is None:
+            break
+        text = text[match.end() :]
+    return text
+
+
+def strip_code_fence(text: str, original: str) -> str:
+    """Unwrap output that is entirely one ``` (or ```text / ```markdown) block."""
+    if len(text) < 2 * len(_FENCE) or not (text.startswith(_FENCE) and text.endswith(_FENCE)):
+        return text
+    body = text[len(_FENCE) : -len(_FENCE)]
+    for tag in _FENCE_TAGS:
+        if body.startswith(tag):
+            return body[len(tag) :]
+    return body
+
+
+def strip_quotes(text: str, original: str) -> str:
+    """Remove quotes around the whole output unless the original was quoted too."""
+    original = original.strip()
+    for quote in ('"', "'"):
+        if original.startswith(quote) and original.endswith(quote):
+            return text
+    for quote in ('"', "'"):
+        if text.startswith(quote) and text.endswith(quote):
+            return text[1:-1]
+    return text
+
+
+def strip_thinking(text: str, original: str) -> str:
+    """Remove <think>, <thinking> or <reasoning> blocks at the start of the output."""
+    match = _THINKING_RE.match(text)
+    while match is not None:
+        text = text[match.end() :]
+        match = _THINKING_RE.match(text)
+    return text
+
+
+def strip_trailing_note(text: str, original: str) -> str:
+    """Remove "Note: ..." paragraphs the model appended, unless the original has such a line itself."""
+    if _NOTE_RE.search(original):
+        return text
+    match = _NOTE_RE.search(text)
+    return text[: match.start()] if match else text
+
+
+DEFAULT_CLEANERS = ("prefixes", "code_fence", "quotes")
+
+_registry: Dict[str, Cleaner] = {}
+_pipelines: Dict[Tuple[str, ...], Tuple[Cleaner, ...]] = {}
+_lock = threading.Lock()
+
+
+def register_cleaner(name: str, clean: CleanerFunc, order: int = 60, replace: bool = False) -> Cleaner:
+    """Make a cleaner available to pipelines by name.
+
+    Args:
+        name: Name to enable it by, e.g. in the "cleaners" translation config.
+        clean: Function of (text, original) returning the cleaned text; the
+               pipeline strips surrounding whitespace from the result.
+        order: Position in the pipeline; lower runs first.
+        replace: Replace an existing cleaner of the same name.
+
+    Returns:
+        The registered cleaner.
+
+    Raises:
+        ValueError: If a cleaner of that name exists and replace is False.
+    """
+    cleaner = Cleaner(name, order, clean)
+    with _lock:
+        if name in _registry and not replace:
+            raise ValueError(f"Cleaner already registered: {name}")
+        _registry[name] = cleaner
+        _pipelines.clear()
+    return cleaner
+
+
+def cleaner_names(optional: bool = False) -> Sequence[str]:
+    """Return the names of registered cleaners, in pipeline order.
+
+    Args:
+        optional: Only those not in DEFAULT_CLEANERS, i.e. the ones that can be enabled.
+    """
+    with _lock:
+        cleaners = sorted(_registry.values(), key=lambda c: c.order)
+    return [c.name for c in cleaners if not (optional and c.name in DEFAULT_CLEANERS)]
+
+
+def pipeline(extra: Iterable[str] = ()) -> Tuple[Cleaner, ...]:
+    """Return the default cleaners plus the named extra ones, in order.
+
+    Args:
+        extra: Names of additional registered cleaners.
+
+    Raises:
+        ValueError: If a name is not registered.
+    """
+    key = tuple(extra)
+    with _lock:
+        cleaners = _pipelines.get(key)
+        if cleaners is None:
+            unknown = [name for name in key if name not in _registry]
+            if unknown:
+                raise ValueError(f"Unknown cleaner: {', '.join(unknown)}")
+            names = dict.fromkeys(DEFAULT_CLEANERS + key)
+            cleaners = tuple(sorted((_registry[name] for name in names), key=lambda c: c.order))
+            _pipelines[key] = cleaners
+    return cleaners
+
+
+def post_process(translated_text: str, original: str, cleaners: Iterable[str] = ()) -> str:
+    """Clean up the raw translation output.
+
+    Removes common LLM prefixes, markdown code blocks, and handles
+    smart quote preservation, plus whatever extra cleaners are enabled,
+    in pipeline order.
+
+    Args:
+        translated_text: Raw text from Ollama.
+        original: Source text the output was translated from.
+        cleaners: Names of extra registered cleaners to run.
+
+    Returns:
+        Cleaned translation text.
+
+    Raises:
+        ValueError: If a cleaner name is not registered.
+    """
+    text = translated_text.strip()
+    for cleaner in pipeline(cleaners):
+        text = cleaner.clean(text, original).strip()
+    return text
+
+
+register_cleaner("thinking", strip_thinking, order=10)
+register_cleaner("prefixes", strip_prefixes, order=20)
+register_cleaner("code_fence", strip_code_fence, order=30)
+register_cleaner("quotes", strip_quotes, order=40)
+register_cleaner("trailing_note", strip_trailing_note, order=50)
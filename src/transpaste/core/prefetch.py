@@ -0,0 +1,195 @@
+"""Speculative translation into secondary target languages.
+
+After a translation finishes, the same text is often copied again right
+after switching the target language. Prefetcher translates recent texts
+into a list of other target languages in the background and stores the
+results in the TranslationCache, so that such a re-copy is a cache hit.
+
+Speculative work must never delay a translation the user is waiting for:
+at most max_workers translations run at a time, and pause() cancels them
+(closing the stream makes Ollama stop generating) until resume(). Cancelled
+tasks go back to the front of the queue and start over.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from transpaste.core.balancer import Client
+from transpaste.core.cache import TranslationCache
+from transpaste.core.log import log
+from transpaste.core.translator import TranslationError, Translator
+
+DEFAULT_PREFETCH_WORKERS = 1
+MAX_PENDING = 8
+# Config entries that only make sense for the foreground target language.
+_FOREGROUND_ONLY = ("reference", "stream_partial")
+
+
+@dataclass
+class PrefetchTask:
+    """One speculative translation.
+
+    Attributes:
+        text: The text to translate.
+        config: Translation config, with the secondary target language.
+        cache_key: Key the result is stored under.
+    """
+
+    text: str
+    config: Dict[str, Any]
+    cache_key: str
+
+
+class Prefetcher:
+    """Background pool that fills the translation cache for secondary target languages.
+
+    Thread-safe; submit(), pause() and resume() are meant to be called from
+    the GUI thread and return immediately.
+
+    Attributes:
+        max_workers: Most speculative translations running at once.
+        completed: Number of translations stored in the cache.
+        preempted: Number of running translations cancelled by pause().
+        failed: Number of translations that failed.
+    """
+
+    def __init__(
+        self,
+        cache: TranslationCache,
+        client: Optional[Client] = None,
+        max_workers: int = DEFAULT_PREFETCH_WORKERS,
+        max_pending: int = MAX_PENDING,
+    ):
+        """Initialize the prefetcher; its threads start with the first task.
+
+        Args:
+            cache: Cache the translations are stored in and checked against.
+            client: Shared Ollama client; if None, each translation creates its own.
+            max_workers: Most speculative translations running at once (at least 1).
+            max_pending: Most tasks waiting; the oldest are dropped first.
+        """
+        self.cache = cache
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.completed = 0
+        self.preempted = 0
+        self.failed = 0
+        self._tasks: Deque[PrefetchTask] = deque()
+        self._running: Dict[str, Translator] = {}
+        self._paused = False
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+        self._cond = threading.Condition()
+
+    def submit(self, text: str, config: Dict[str, Any], targets: Iterable[str]) -> int:
+        """Queue translations of a text into other target languages.
+
+        Languages that are the config's own target, already cached or already
+        queued are skipped.
+
+        Args:
+            text: The text that was just translated.
+            config: The config it was translated with.
+            targets: Secondary target languages.
+
+        Returns:
+            Number of tasks queued.
+        """
+        base = {key: value for key, value in config.items() if key not in _FOREGROUND_ONLY}
+        tasks = []
+        for target in targets:
+            if target == config.get("target_lang"):
+                continue
+            task_config = dict(base, target_lang=target)
+            key = TranslationCache.make_key(text, task_config)
+            if not self.cache.contains(key):
+                tasks.append(PrefetchTask(text, task_config, key))
+        if not tasks:
+            return 0
+
+        with self._cond:
+            if self._closed:
+                return 0
+            queued = {task.cache_key for task in self._tasks} | set(self._running)
+            tasks = [task for task in tasks if task.cache_key not in queued]
+            self._tasks.extend(tasks)
+            while len(self._tasks) > self.max_pending:
+                dropped = self._tasks.popleft()
+                log(f"Prefetch queue full, dropped {dropped.config['target_lang']} for '{dropped.text[:30]}...'")
+            while len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, name=f"prefetch-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify_all()
+        return len(tasks)
+
+    def pause(self) -> None:
+        """Stop speculative work, cancelling running translations, until resume()."""
+        with self._cond:
+            self._paused = True
+            for translator in self._running.values():
+                translator.cancel()
+
+    def resume(self) -> None:
+        """Allow speculative work again after pause()."""
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        """Return the number of tasks waiting or running."""
+        with self._cond:
+            return len(self._tasks) + len(self._running)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Cancel all work and wait up to timeout seconds for each thread to exit."""
+        with self._cond:
+            self._closed = True
+            self._tasks.clear()
+            for translator in self._running.values():
+                translator.cancel()
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _next_task(self) -> Optional[Tuple[PrefetchTask, Translator]]:
+        """Wait for a task and register its translator, so that pause() can always cancel it."""
+        with self._cond:
+            while not self._closed and (self._paused or not self._tasks):
+                self._cond.wait()
+            if self._closed:
+                return None
+            task = self._tasks.popleft()
+            translator = Translator(task.config, self.client)
+            self._running[task.cache_key] = translator
+            return task, translator
+
+    def _work(self) -> None:
+        while True:
+            next_task = self._next_task()
+            if next_task is None:
+                return
+            task, translator = next_task
+            failed = False
+            try:
+                result = None if translator.cancelled else translator.translate(task.text)
+            except TranslationError as e:
+                log(f"Prefetch into {task.config['target_lang']} failed: {e}", "WARN")
+                result = None
+                failed = True
+            with self._cond:
+                del self._running[task.cache_key]
+                self.failed += failed
+                if result is None and translator.cancelled and not failed:
+                    self.preempted += 1
+                    if not self._closed:
+                        self._tasks.appendleft(task)
+                    continue
+            if result is not None:
+                self.cache.put(task.cache_key, result)
+                with self._cond:
+                    self.completed += 1
+                log(f"Prepared {task.config['target_lang']} translation of '{task.text[:30]}...'")
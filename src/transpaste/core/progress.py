@@ -0,0 +1,151 @@
+"""Ollama generation counters and calibrated translation progress.
+
+The final message of every Ollama generation reports how many prompt and
+output tokens were evaluated and how long that took. GenerationStats keeps
+those counters; ProgressEstimator predicts how long a translation will be,
+from the output-to-input length ratios of past translations with the same
+model and language pair, so the progress bar tracks the real output instead
+of a fixed guess.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from transpaste.core.history import TranslationEntry
+
+DEFAULT_LENGTH_RATIO = 1.5
+# Weight of the newest translation in a learned ratio.
+RATIO_SMOOTHING = 0.2
+# Shorter texts have too noisy a ratio to learn from.
+MIN_LEARN_CHARS = 20
+MIN_RATIO = 0.1
+MAX_RATIO = 10.0
+
+
+@dataclass
+class GenerationStats:
+    """Counters from the done message of one or more Ollama generations.
+
+    Attributes:
+        prompt_eval_count: Prompt tokens evaluated (cached prompt tokens are not counted).
+        eval_count: Output tokens generated.
+        eval_duration_ms: Time spent generating the output tokens.
+        load_duration_ms: Time spent loading the model.
+    """
+
+    prompt_eval_count: Optional[int] = None
+    eval_count: Optional[int] = None
+    eval_duration_ms: Optional[float] = None
+    load_duration_ms: Optional[float] = None
+
+    @classmethod
+    def from_done(cls, data: Dict[str, Any]) -> "GenerationStats":
+        """Read the counters of a done message; missing ones stay None."""
+
+        def ms(key: str) -> Optional[float]:
+            return data[key] / 1e6 if isinstance(data.get(key), (int, float)) else None
+
+        def count(key: str) -> Optional[int]:
+            return data[key] if isinstance(data.get(key), int) else None
+
+        return cls(count("prompt_eval_count"), count("eval_count"), ms("eval_duration"), ms("load_duration"))
+
+    def merge(self, other: "GenerationStats") -> "GenerationStats":
+        """Combine the counters of two generations of one translation (e.g. chunks).
+
+        Counts and eval time add up; the load time is the longest, as chunks load the model at most once.
+        """
+
+        def add(a, b):
+            return b if a is None else a if b is None else a + b
+
+        load = [v for v in (self.load_duration_ms, other.load_duration_ms) if v is not None]
+        return GenerationStats(
+            add(self.prompt_eval_count, other.prompt_eval_count),
+            add(self.eval_count, other.eval_count),
+            add(self.eval_duration_ms, other.eval_duration_ms),
+            max(load) if load else None,
+        )
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Output tokens per second of generation time, if reported."""
+        if not self.eval_count or not self.eval_duration_ms:
+            return None
+        return self.eval_count / (self.eval_duration_ms / 1000)
+
+    def describe(self) -> str:
+        """Return e.g. "42 tokens in 840 ms (50.0 tok/s), prompt 180 tokens" for logging."""
+        if self.eval_count is None:
+            return "no counters reported"
+        text = f"{self.eval_count} tokens"
+        if self.eval_duration_ms is not None:
+            text += f" in {self.eval_duration_ms:.0f} ms"
+        if self.tokens_per_second is not None:
+            text += f" ({self.tokens_per_second:.1f} tok/s)"
+        if self.prompt_eval_count is not None:
+            text += f", prompt {self.prompt_eval_count} tokens"
+        if self.load_duration_ms is not None:
+            text += f", load {self.load_duration_ms:.0f} ms"
+        return text
+
+
+class ProgressEstimator:
+    """Learned output-to-input length ratios per model and language pair.
+
+    A pair without history for the model falls back to the pair's ratio
+    across models, then to DEFAULT_LENGTH_RATIO. Thread-safe.
+    """
+
+    def __init__(self, default_ratio: float = DEFAULT_LENGTH_RATIO):
+        """Initialize an estimator that knows nothing yet.
+
+        Args:
+            default_ratio: Ratio used for language pairs never seen before.
+        """
+        self.default_ratio = default_ratio
+        self._ratios: Dict[Tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def ratio(self, model: str, source_lang: str, target_lang: str) -> float:
+        """Return the expected length of a translation per character of source text."""
+        with self._lock:
+            for key in ((model, source_lang, target_lang), ("", source_lang, target_lang)):
+                if key in self._ratios:
+                    return self._ratios[key]
+        return self.default_ratio
+
+    def expected_chars(self, text: str, model: str, source_lang: str, target_lang: str) -> float:
+        """Return the expected length of the translation of text, at least 20 characters."""
+        return max(len(text) * self.ratio(model, source_lang, target_lang), 20)
+
+    def learn(self, model: str, source_lang: str, target_lang: str, original: str, translated: str) -> None:
+        """Update the ratios with a finished translation.
+
+        Args:
+            model: Model that produced the translation; "" if unknown.
+            source_lang: Source language display name.
+            target_lang: Target language display name.
+            original: Source text.
+            translated: Its translation.
+        """
+        if len(original) < MIN_LEARN_CHARS or not translated:
+            return
+        sample = min(max(len(translated) / len(original), MIN_RATIO), MAX_RATIO)
+        keys = [("", source_lang, target_lang)]
+        if model:
+            keys.append((model, source_lang, target_lang))
+        with self._lock:
+            for key in keys:
+                previous = self._ratios.get(key)
+                self._ratios[key] = sample if previous is None else previous + RATIO_SMOOTHING * (sample - previous)
+
+    def load(self, entries: Iterable[TranslationEntry]) -> None:
+        """Learn from history entries, oldest first.
+
+        Args:
+            entries: Entries in chronological order.
+        """
+        for entry in entries:
+            self.learn(entry.model, entry.source_lang, entry.target_lang, entry.original, entry.translated)
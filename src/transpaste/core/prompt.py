@@ -0,0 +1,194 @@
+"""Translation prompt construction and the language, style and length tables it uses."""
+
+from typing import Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+# Language Settings
+# -----------------------------------------------------------------------------
+LANGUAGE_MAP = {
+    "Auto Detect": "auto",
+    "English": "en",
+    "Chinese (Simplified)": "zh-Hans",
+    "Chinese (Traditional)": "zh-Hant",
+    "Japanese": "ja",
+    "Korean": "ko",
+    "French": "fr",
+    "German": "de",
+    "Spanish": "es",
+    "Russian": "ru",
+    "Italian": "it",
+    "Portuguese": "pt",
+    "Arabic": "ar",
+    "Hindi": "hi",
+    "Thai": "th",
+    "Vietnamese": "vi",
+}
+
+TRANSLATION_STYLES = {
+    "Default": {"description": "Standard translation", "instruction": ""},
+    "Formal": {
+        "description": "Professional and polite",
+        "instruction": "Use formal language and professional tone.",
+    },
+    "Casual": {"description": "Relaxed and friendly", "instruction": "Use casual, relaxed, and friendly language."},
+    "Academic": {
+        "description": "Scholarly and precise",
+        "instruction": "Use academic language with precise terminology.",
+    },
+    "Literary": {"description": "Artistic and expressive", "instruction": "Use literary and artistic language."},
+    "Technical": {"description": "Technical documentation", "instruction": "Use technical terminology accurately."},
+    "Simple": {"description": "Easy to understand", "instruction": "Use simple and clear language."},
+}
+
+LENGTH_OPTIONS = {
+    "Unlimited": {"description": "No length limit", "instruction": "", "max_words": None},
+    "Brief": {"description": "~50 words max", "instruction": "Keep the translation brief.", "max_words": 50},
+    "Short": {
+        "description": "~100 words max",
+        "instruction": "Keep the translation relatively short.",
+        "max_words": 100,
+    },
+    "Medium": {
+        "description": "~200 words max",
+        "instruction": "Provide a moderate-length translation.",
+        "max_words": 200,
+    },
+    "Detailed": {
+        "description": "Detailed translation",
+        "instruction": "Provide a detailed translation.",
+        "max_words": None,
+    },
+}
+
+
+# -----------------------------------------------------------------------------
+# Prompt Builder
+# -----------------------------------------------------------------------------
+def build_system_prompt(
+    source_lang: str, source_code: str, target_lang: str, target_code: str, style: str, length: str
+) -> str:
+    """Build the fixed translation instructions, without the text to translate.
+
+    The result depends only on the settings, so consecutive requests share it
+    as a prefix that Ollama can serve from its prompt cache.
+
+    Args:
+        source_lang: Source language display name.
+        source_code: Source language code (e.g., 'en', 'auto').
+        target_lang: Target language display name.
+        target_code: Target language code (e.g., 'zh-Hans').
+        style: Translation style name (e.g., 'Formal', 'Casual').
+        length: Length control name (e.g., 'Brief', 'Unlimited').
+
+    Returns:
+        The instruction block.
+    """
+    style_info = TRANSLATION_STYLES.get(style, TRANSLATION_STYLES["Default"])
+    length_info = LENGTH_OPTIONS.get(length, LENGTH_OPTIONS["Unlimited"])
+
+    if source_code == "auto":
+        display_source = "Source Language"
+    else:
+        display_source = source_lang
+
+    base_prompt = (
+        f"You are a professional {display_source} ({source_code}) to "
+        f"{target_lang} ({target_code}) translator.\n\n"
+        f"CRITICAL RULES:\n"
+        f"1. Produce ONLY the {target_lang} translation\n"
+        f"2. Do NOT include any explanations or commentary\n"
+        f"3. Start directly with the translated text"
+    )
+
+    if style_info["instruction"]:
+        base_prompt += f"\n\nSTYLE: {style_info['instruction']}"
+
+    if length_info["instruction"]:
+        base_prompt += f"\n\nLENGTH: {length_info['instruction']}"
+
+    return base_prompt
+
+
+def _translate_request(text: str) -> str:
+    """Frame a text as a request to translate it, so a question or command in it is not answered instead."""
+    return f"Translate:\n\n{text}"
+
+
+def build_prompt(
+    source_lang: str,
+    source_code: str,
+    target_lang: str,
+    target_code: str,
+    text: str,
+    style: str,
+    length: str,
+    reference: Optional[Tuple[str, str]] = None,
+) -> str:
+    """Build the translation prompt for Ollama.
+
+    Args:
+        source_lang: Source language display name.
+        source_code: Source language code (e.g., 'en', 'auto').
+        target_lang: Target language display name.
+        target_code: Target language code (e.g., 'zh-Hans').
+        text: The text to translate.
+        style: Translation style name (e.g., 'Formal', 'Casual').
+        length: Length control name (e.g., 'Brief', 'Unlimited').
+        reference: Optional (source, translation) pair of a similar earlier
+                   translation, shown to the model as an example to stay consistent with.
+
+    Returns:
+        Complete prompt string for the LLM.
+    """
+    base_prompt = build_system_prompt(source_lang, source_code, target_lang, target_code, style, length)
+
+    if reference is not None:
+        base_prompt += (
+            f"\n\nREFERENCE: A similar text was previously translated as follows. "
+            f"Reuse its wording and terminology where the texts agree.\n"
+            f"Source: {reference[0]}\nTranslation: {reference[1]}"
+        )
+
+    base_prompt += "\n\n" + _translate_request(text)
+    return base_prompt
+
+
+def build_messages(
+    source_lang: str,
+    source_code: str,
+    target_lang: str,
+    target_code: str,
+    text: str,
+    style: str,
+    length: str,
+    reference: Optional[Tuple[str, str]] = None,
+) -> List[Dict[str, str]]:
+    """Build the /api/chat messages for a translation.
+
+    The instructions go in a system message that is identical for every
+    request with the same settings, so Ollama re-evaluates just the final
+    user message: the text, framed with the same "Translate:" line as
+    build_prompt(). A reference translation is given as an earlier
+    user/assistant exchange after the system message, keeping the system
+    prefix cacheable.
+
+    Args:
+        source_lang: Source language display name.
+        source_code: Source language code (e.g., 'en', 'auto').
+        target_lang: Target language display name.
+        target_code: Target language code (e.g., 'zh-Hans').
+        text: The text to translate.
+        style: Translation style name (e.g., 'Formal', 'Casual').
+        length: Length control name (e.g., 'Brief', 'Unlimited').
+        reference: Optional (source, translation) pair of a similar earlier translation.
+
+    Returns:
+        Chat messages, system message first.
+    """
+    system = build_system_prompt(source_lang, source_code, target_lang, target_code, style, length)
+    messages = [{"role": "system", "content": system}]
+    if reference is not None:
+        messages.append({"role": "user", "content": _translate_request(reference[0])})
+        messages.append({"role": "assistant", "content": reference[1]})
+    messages.append({"role": "user", "content": _translate_request(text)})
+    return messages
@@ -0,0 +1,164 @@
+"""Text segmentation for chunked translation.
+
+Long texts are cut into segments on paragraph boundaries, falling back to
+sentence boundaries for oversized paragraphs. Concatenating the segments
+always reproduces the input exactly, so translations can be reassembled in
+order with the original spacing between them.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+DEFAULT_CHUNK_SIZE = 1500
+DEFAULT_CHUNK_WORKERS = 2
+
+_CODE_BLOCK_RE = re.compile(r"^[ \t]*```.*?^[ \t]*```[ \t]*$\n?", re.MULTILINE | re.DOTALL)
+_PARAGRAPH_RE = re.compile(r"\n[ \t]*\n\s*")
+_SENTENCE_RE = re.compile(r"(?<=[.!?;:])\s+|(?<=[。！？；])\s*")
+
+
+@dataclass
+class Segment:
+    """A contiguous piece of the source text.
+
+    Attributes:
+        text: The exact source text of the segment, including surrounding whitespace.
+        translate: False for pieces that are passed through verbatim, such as code blocks.
+    """
+
+    text: str
+    translate: bool = True
+
+
+def _split_after(text: str, pattern: "re.Pattern[str]") -> List[str]:
+    """Split text after each separator match, keeping the separator on the left piece."""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.end() > start:
+            pieces.append(text[start : match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _hard_split(text: str, max_chars: int) -> List[str]:
+    """Split text into pieces of at most max_chars, preferring whitespace positions."""
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars) + 1 or max_chars
+        pieces.append(text[:cut])
+        text = text[cut:]
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def _prose_pieces(text: str, max_chars: int) -> List[str]:
+    """Break prose into paragraph, sentence or hard-cut pieces no longer than max_chars."""
+    pieces = []
+    for paragraph in _split_after(text, _PARAGRAPH_RE):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in _split_after(paragraph, _SENTENCE_RE):
+            if len(sentence) <= max_chars:
+                pieces.append(sentence)
+            else:
+                pieces.extend(_hard_split(sentence, max_chars))
+    return pieces
+
+
+def split_text(text: str, max_chars: int = DEFAULT_CHUNK_SIZE, preserve_code: bool = False) -> List[Segment]:
+    """Split text into segments of at most max_chars characters.
+
+    Adjacent paragraphs are packed together while they fit, so a text shorter
+    than max_chars yields a single segment.
+
+    Args:
+        text: The text to split.
+        max_chars: Maximum segment length in characters.
+        preserve_code: If True, fenced ``` code blocks become their own
+            untranslated segments and are never split.
+
+    Returns:
+        Segments whose concatenated text equals the input.
+    """
+    max_chars = max(1, max_chars)
+    units: List[Tuple[str, bool]] = []
+    if preserve_code:
+        start = 0
+        for match in _CODE_BLOCK_RE.finditer(text):
+            if match.start() > start:
+                units.append((text[start : match.start()], True))
+            units.append((match.group(0), False))
+            start = match.end()
+        if start < len(text):
+            units.append((text[start:], True))
+    else:
+        units.append((text, True))
+
+    segments: List[Segment] = []
+    for unit, translatable in units:
+        if not translatable:
+            segments.append(Segment(unit, translate=False))
+            continue
+
+        current = ""
+        for piece in _prose_pieces(unit, max_chars):
+            if current and len(current) + len(piece) > max_chars:
+                segments.append(Segment(current))
+                current = ""
+            current += piece
+        if current:
+            segments.append(Segment(current))
+
+    return segments
+
+
+def sentence_prefix_end(text: str) -> int:
+    """Return the length of the longest prefix of text that ends on a sentence boundary.
+
+    A boundary is sentence punctuation followed by whitespace, or CJK sentence
+    punctuation. Returns 0 if text contains no complete sentence yet.
+    """
+    end = 0
+    for match in _SENTENCE_RE.finditer(text):
+        end = match.start()
+    return end
+
+
+def _split_whitespace(text: str) -> Tuple[str, str, str]:
+    """Return (leading whitespace, stripped text, trailing whitespace)."""
+    core = text.strip()
+    if not core:
+        return text, "", ""
+    lead = text[: len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()) :]
+    return lead, core, trail
+
+
+def join_segments(segments: Sequence[Segment], translations: Sequence[str]) -> str:
+    """Reassemble translated segments in order.
+
+    Each translation replaces the non-whitespace body of its segment, keeping
+    the original leading and trailing whitespace so paragraph breaks survive.
+    Untranslated segments are copied verbatim.
+
+    Args:
+        segments: Segments from split_text().
+        translations: One translation per segment; ignored for untranslated segments.
+
+    Returns:
+        The reassembled text.
+    """
+    parts = []
+    for segment, translated in zip(segments, translations):
+        if not segment.translate:
+            parts.append(segment.text)
+            continue
+        lead, core, trail = _split_whitespace(segment.text)
+        parts.append(f"{lead}{translated.strip() if core else ''}{trail}")
+    return "".join(parts)
@@ -0,0 +1,150 @@
+"""Incremental decoding of Ollama's streamed responses.
+
+Ollama streams a generation as newline-delimited JSON, one object per
+token. NDJSONDecoder parses the bytes as they arrive, all complete lines of
+a read at once, and TokenBuffer collects the tokens without re-copying the
+text so far for every token. When orjson is installed it parses the lines
+straight from bytes; otherwise the standard json module parses them after a
+single UTF-8 decode per read.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+JSON_BACKENDS = ("json", "orjson")
+
+# Bytes requested per read; the same as requests' iter_lines(), so a server that
+# does not use chunked encoding still streams in small pieces.
+READ_CHUNK_BYTES = 512
+
+# Skips the encoding detection and wrapping json.loads() does on every call.
+_json_raw_decode = json.JSONDecoder().raw_decode
+
+
+class NDJSONDecoder:
+    """Splits a byte stream into JSON objects, one per line.
+
+    Chunks may end anywhere, even inside a multi-byte character; the unfinished
+    line is kept until its newline arrives. Blank lines are ignored, and lines
+    that are not a JSON object are skipped and counted.
+
+    Attributes:
+        skipped: Number of malformed lines skipped.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        """Initialize the decoder.
+
+        Args:
+            backend: "orjson" or "json"; defaults to JSON_BACKEND, orjson if installed.
+
+        Raises:
+            ValueError: If backend is unknown, or is "orjson" and orjson is not installed.
+        """
+        backend = backend or JSON_BACKEND
+        if backend not in JSON_BACKENDS or (backend == "orjson" and orjson is None):
+            raise ValueError(f"JSON backend not available: {backend}")
+        self.backend = backend
+        self.skipped = 0
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> Iterator[Dict[str, Any]]:
+        """Yield the objects completed by a chunk of the stream.
+
+        Args:
+            chunk: The next bytes received.
+        """
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            self._pending += chunk
+            return
+        data = self._pending + chunk[:end] if self._pending else chunk[:end]
+        self._pending = chunk[end + 1 :]
+        # A newline never falls inside a multi-byte character, so complete lines decode on their own.
+        lines = data.split(b"\n") if self.backend == "orjson" else data.decode("utf-8", "replace").split("\n")
+        for line in lines:
+            obj = self._parse(line)
+            if obj is not None:
+                yield obj
+
+    def close(self) -> Iterator[Dict[str, Any]]:
+        """Yield the object on a final line without a trailing newline, if any."""
+        line, self._pending = self._pending, b""
+        obj = self._parse(line if self.backend == "orjson" else line.decode("utf-8", "replace"))
+        if obj is not None:
+            yield obj
+
+    def _parse(self, line) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            if self.backend == "orjson":
+                obj = orjson.loads(line)
+            else:
+                obj, end = _json_raw_decode(line)
+                if end != len(line):
+                    obj = None
+        except ValueError:
+            obj = None
+        if not isinstance(obj, dict):
+            self.skipped += 1
+            return None
+        return obj
+
+
+def iter_ndjson(chunks: Iterable[bytes], decoder: Optional[NDJSONDecoder] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the JSON objects of a newline-delimited byte stream.
+
+    Args:
+        chunks: The stream's bytes, in pieces of any size (e.g. response.iter_content()).
+        decoder: Decoder to use, e.g. to read its skipped count afterwards.
+    """
+    decoder = decoder or NDJSONDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+class TokenBuffer:
+    """Accumulates streamed tokens in a list, joining them only when the text is needed.
+
+    Appending is O(1) per token and text() is cached until the next append,
+    so a long generation costs linear time however often it grows.
+    """
+
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self._parts: List[str] = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, token: str) -> None:
+        """Add a token at the end."""
+        if token:
+            self._parts.append(token)
+            self._length += len(token)
+
+    def text(self) -> str:
+        """Return the text so far."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def tail(self, chars: int) -> str:
+        """Return the last chars characters, without joining the whole text."""
+        parts = self._parts
+        start = len(parts)
+        collected = 0
+        while start and collected < chars:
+            start -= 1
+            collected += len(parts[start])
+        return "".join(parts[start:])[-chars:] if chars > 0 else ""
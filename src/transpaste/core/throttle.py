@@ -0,0 +1,87 @@
+"""Rate limiting for progress callbacks.
+
+A fast model streams hundreds of tokens per second. Reporting each one to
+the tray app means a queued cross-thread signal, a tooltip update and a log
+line per token, so Translator reports progress through a ProgressThrottle
+that passes at most max_hz updates per second and drops the ones in
+between, which later updates supersede anyway.
+"""
+
+import time
+from typing import Callable, Optional
+
+DEFAULT_PROGRESS_HZ = 10.0
+
+
+class ProgressThrottle:
+    """Wraps a (progress, message) callback so it runs at most max_hz times per second.
+
+    Updates arriving too soon after the last delivered one are coalesced:
+    only the newest is kept, and it is delivered by the next update that is
+    due or by flush(). The final update (progress >= 1.0) is always delivered.
+    Not thread-safe; use one per translation.
+
+    Attributes:
+        delivered: Number of updates passed to the callback.
+        dropped: Number of updates coalesced away.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[float, str], None],
+        max_hz: Optional[float] = DEFAULT_PROGRESS_HZ,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the throttle.
+
+        Args:
+            callback: Receives (progress_0_to_1, status_message).
+            max_hz: Maximum deliveries per second; None or 0 delivers every update.
+            clock: Monotonic time source in seconds.
+        """
+        self.callback = callback
+        self.interval = 1.0 / max_hz if max_hz else 0.0
+        self.clock = clock
+        self.delivered = 0
+        self.dropped = 0
+        self._last: Optional[float] = None
+        self._pending: Optional[tuple] = None
+
+    def ready(self) -> bool:
+        """Whether an update sent now would be delivered rather than coalesced.
+
+        Lets callers skip building a status message that would be dropped.
+        """
+        return self._last is None or self.clock() - self._last >= self.interval
+
+    def __call__(self, progress: float, message: str, force: bool = False) -> None:
+        """Report an update, delivering it now or keeping it as the pending one.
+
+        Args:
+            progress: Progress from 0 to 1.
+            message: Status message.
+            force: Deliver regardless of the rate, for milestones there are only
+                   a few of, such as finished chunks.
+        """
+        if self._pending is not None:
+            self.dropped += 1
+            self._pending = None
+        if force or progress >= 1.0 or self.ready():
+            self._deliver(progress, message)
+        else:
+            self._pending = (progress, message)
+
+    def skip(self) -> None:
+        """Count an update the caller did not send because ready() was False."""
+        self.dropped += 1
+
+    def flush(self) -> None:
+        """Deliver the pending update, if any."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self._deliver(*pending)
+
+    def _deliver(self, progress: float, message: str) -> None:
+        self._last = self.clock()
+        self.delivered += 1
+        self.callback(progress, message)
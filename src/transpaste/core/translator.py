@@ -0,0 +1,478 @@
+"""GUI-free translation engine.
+
+Translator turns one text into its final translation: it builds the prompt,
+streams the generation from Ollama (in parallel chunks for long texts) and
+post-processes the result. The tray app runs it inside a QThread; the
+headless CLI calls it directly.
+"""
+
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from transpaste.core.balancer import BalancedClient, Client, parse_endpoints
+from transpaste.core.config import API_CHAT, DEFAULT_API, OLLAMA_API_URL, TIMEOUT_SECONDS
+from transpaste.core.log import log
+from transpaste.core.metrics import (
+    STAGE_CONNECT,
+    STAGE_FIRST_TOKEN,
+    STAGE_POST_PROCESS,
+    STAGE_PROMPT_BUILD,
+    STAGE_TOKEN_RATE,
+    STAGE_TRANSLATE,
+    MetricsStore,
+)
+from transpaste.core.postprocess import post_process
+from transpaste.core.progress import GenerationStats, ProgressEstimator
+from transpaste.core.prompt import LANGUAGE_MAP, build_messages, build_prompt
+from transpaste.core.segment import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_CHUNK_WORKERS,
+    Segment,
+    join_segments,
+    sentence_prefix_end,
+    split_text,
+)
+from transpaste.core.stream import READ_CHUNK_BYTES, NDJSONDecoder, TokenBuffer, iter_ndjson
+from transpaste.core.throttle import DEFAULT_PROGRESS_HZ, ProgressThrottle
+
+ProgressCallback = Callable[[float, str], None]
+PartialCallback = Callable[[str], None]
+
+
+class TranslationError(Exception):
+    """A translation failed; the message is suitable for showing to the user."""
+
+
+class Translator:
+    """Translates texts with one configuration.
+
+    A Translator may be used from any thread. Call cancel() from another
+    thread to stop a running translate() call.
+
+    Attributes:
+        first_token_ms: Milliseconds from sending the (first) request of the
+                        last translate() call to its first token, if any arrived.
+        load_ms: Longest model load time Ollama reported for that call, if any.
+        stats: Ollama's counters for that call, summed over its chunks, if any
+               generation finished.
+        estimator: Predicts the translation length that progress is measured against;
+                   learns from every finished translation.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        client: Optional[Client] = None,
+        metrics: Optional[MetricsStore] = None,
+        estimator: Optional[ProgressEstimator] = None,
+    ):
+        """Initialize the translator.
+
+        Args:
+            config: Dictionary containing translation configuration
+                    (source_lang, target_lang, model, style, length, temperature, base_url,
+                    chunk_size, max_chunk_chars (a cap on chunk_size that applies even
+                    when chunk_size is 0), chunk_workers, preserve_code, keep_alive, api ("chat"
+                    or "generate"), cleaners (names of extra post-processing cleaners),
+                    detected_lang (language named in the prompt when source_lang is
+                    "Auto Detect"), and an optional reference (source, translation)
+                    pair for the prompt).
+            client: Shared Ollama client. If None, a private client is created
+                    for each translation from the base_url (one URL or several,
+                    comma-separated) and proxies in config.
+            metrics: Store that receives the timing of every stage, if any.
+            estimator: Shared progress estimator; if None, the translator learns on its own.
+        """
+        self.config = config
+        self.client = client
+        self.metrics = metrics
+        self.estimator = estimator or ProgressEstimator()
+        self.first_token_ms: Optional[float] = None
+        self.load_ms: Optional[float] = None
+        self.stats: Optional[GenerationStats] = None
+        self._stats_lock = threading.Lock()
+        self._is_cancelled = False
+        self._started_at = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called."""
+        return self._is_cancelled
+
+    def cancel(self) -> None:
+        """Cancel the ongoing translation."""
+        self._is_cancelled = True
+
+    def translate(
+        self, text: str, progress: Optional[ProgressCallback] = None, partial: Optional[PartialCallback] = None
+    ) -> Optional[str]:
+        """Translate a text.
+
+        Args:
+            text: The text to translate.
+            progress: Called with (progress_0_to_1, status_message) as work advances,
+                      at most config["progress_hz"] times per second (default
+                      DEFAULT_PROGRESS_HZ; 0 for every update). The final update is
+                      always delivered.
+            partial: Called with the post-processed translation so far each time
+                     it grows by one or more complete sentences (or, for chunked
+                     texts, by the next chunk in order).
+
+        Returns:
+            The post-processed translation, or None if cancelled.
+
+        Raises:
+            TranslationError: If the translation failed.
+        """
+        report = ProgressThrottle(
+            progress or (lambda value, message: None), self.config.get("progress_hz", DEFAULT_PROGRESS_HZ)
+        )
+        self.first_token_ms = None
+        self.load_ms = None
+        self.stats = None
+        self._started_at = time.monotonic()
+        client = self.client
+        if client is None:
+            client = BalancedClient(
+                parse_endpoints(self.config.get("base_url", OLLAMA_API_URL)),
+                proxies=self.config.get("proxies"),
+                max_retries=0,
+            )
+        try:
+            chunk_size = self.config.get("chunk_size", DEFAULT_CHUNK_SIZE) or len(text)
+            max_chunk_chars = self.config.get("max_chunk_chars")
+            if max_chunk_chars:
+                chunk_size = min(chunk_size, max_chunk_chars)
+            segments = split_text(text, chunk_size, preserve_code=self.config.get("preserve_code", False))
+            if len(segments) > 1:
+                result = self._translate_chunked(client, segments, report, partial)
+            else:
+                result = self._translate_single(client, text, report, partial)
+            if result is not None:
+                self._observe(STAGE_TRANSLATE, time.monotonic() - self._started_at)
+                self.estimator.learn(
+                    self.config.get("model", ""), self.config["source_lang"], self.config["target_lang"], text, result
+                )
+                if self.stats is not None:
+                    log(f"Generation stats: {self.stats.describe()}")
+            return result
+
+        except requests.exceptions.ReadTimeout:
+            log(f"Timeout after {TIMEOUT_SECONDS}s", "ERROR")
+            raise TranslationError(f"Timeout after {TIMEOUT_SECONDS}s")
+        except requests.exceptions.ConnectionError as e:
+            log(f"Connection error: {e}", "ERROR")
+            raise TranslationError("Cannot connect to Ollama. Is it running?")
+        except requests.exceptions.HTTPError as e:
+            log(f"HTTP error: {e}", "ERROR")
+            raise TranslationError(f"HTTP error: {e.response.status_code}")
+        except TranslationError:
+            raise
+        except Exception as e:
+            log(f"Unexpected error: {e}", "ERROR")
+            log(traceback.format_exc(), "ERROR")
+            raise TranslationError(str(e))
+        finally:
+            # An update held back by the rate limit is still the latest status, cancelled or not.
+            report.flush()
+            if report.dropped:
+                log(f"Progress updates: {report.delivered} delivered, {report.dropped} coalesced")
+            if client is not self.client:
+                client.close()
+
+    def _translate_single(
+        self, client: Client, text: str, report: ProgressThrottle, partial: Optional[PartialCallback] = None
+    ) -> Optional[str]:
+        """Translate a text with a single streamed generation."""
+        log(f"Connecting to Ollama at {client.url(self._api_path)}...")
+        report(0.05, "Connecting to Ollama...")
+
+        response = self._open_stream(client, text, self.config.get("reference"))
+        log("Connected to Ollama successfully")
+
+        total_chars = 0
+        estimated_chars = self.estimator.expected_chars(
+            text, self.config.get("model", ""), self.config["source_lang"], self.config["target_lang"]
+        )
+        partial_end = 0
+        # Text after the last published sentence boundary, plus the punctuation before
+        # it (which the boundary pattern looks behind for), starting at tail_start.
+        tail = ""
+        tail_start = 0
+
+        report(0.1, "Translating...")
+
+        def on_token(token: str, buffer: TokenBuffer) -> None:
+            nonlocal total_chars, partial_end, tail, tail_start
+            total_chars += len(token)
+            if report.ready():
+                progress = min(0.1 + (total_chars / estimated_chars) * 0.85, 0.95)
+                report(progress, f"Translating: {buffer.tail(30)}...")
+            else:
+                report.skip()
+
+            if partial is not None:
+                tail += token
+                end = tail_start + sentence_prefix_end(tail)
+                if end > partial_end:
+                    translated_so_far = buffer.text()
+                    if translated_so_far[:end].strip():
+                        partial_end = end
+                        partial(post_process(translated_so_far[:end], text, self.config.get("cleaners", ())))
+                        tail = tail[end - 1 - tail_start :]
+                        tail_start = end - 1
+
+        translated_text = self._read_stream(response, on_token)
+        if translated_text is None or self._is_cancelled:
+            log("Translation cancelled by user")
+            return None
+
+        translated_text = translated_text.strip()
+        log(f"Raw translation length: {len(translated_text)}")
+
+        if not translated_text:
+            log("Empty response from Ollama", "ERROR")
+            raise TranslationError("Empty response from Ollama")
+
+        report(0.98, "Processing result...")
+        translated_text = self._post_process(translated_text, text)
+        rate = self.stats.tokens_per_second if self.stats is not None else None
+        report(1.0, f"Done! {rate:.0f} tokens/s" if rate is not None else "Done!")
+        log(f"Translation complete: {translated_text[:50]}...")
+        return translated_text
+
+    def _translate_chunked(
+        self,
+        client: Client,
+        segments: List[Segment],
+        report: ProgressThrottle,
+        partial: Optional[PartialCallback] = None,
+    ) -> Optional[str]:
+        """Translate segments concurrently and reassemble them in order.
+
+        Each segment is translated and post-processed on its own; progress is
+        the share of source characters whose chunk has finished.
+
+        Args:
+            client: Ollama client shared by all chunk requests.
+            segments: Segments from split_text(); untranslated ones pass through.
+            report: Progress callback.
+            partial: Called with the reassembled translation of the leading
+                     run of finished chunks whenever it grows.
+
+        Returns:
+            The reassembled translation, or None if cancelled.
+        """
+        pending = [i for i, segment in enumerate(segments) if segment.translate and segment.text.strip()]
+        total_chars = sum(len(segments[i].text) for i in pending) or 1
+        workers = max(1, self.config.get("chunk_workers", DEFAULT_CHUNK_WORKERS))
+        results = [segment.text for segment in segments]
+        finished = [not (segment.translate and segment.text.strip()) for segment in segments]
+        prefix = 0
+        failed = False
+        log(f"Translating {len(pending)} chunks with {workers} workers at {client.url(self._api_path)}")
+        report(0.05, f"Translating {len(pending)} chunks...")
+
+        def translate_chunk(index: int) -> Optional[str]:
+            if failed or self._is_cancelled:
+                return None
+            source = segments[index].text
+            response = self._open_stream(client, source)
+            raw = self._read_stream(response, should_stop=lambda: failed)
+            if raw is None:
+                return None
+            if not raw.strip():
+                raise TranslationError("Empty response from Ollama")
+            return self._post_process(raw.strip(), source)
+
+        def stop_pending() -> None:
+            nonlocal failed
+            failed = True
+            for pending_future in futures:
+                pending_future.cancel()
+
+        done_chars = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(translate_chunk, i): i for i in pending}
+            try:
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    index = futures[future]
+                    translated = future.result()
+                    if translated is None:
+                        log("Translation cancelled by user")
+                        # Chunks not started yet must not send their requests, or the pool waits for them.
+                        stop_pending()
+                        return None
+                    results[index] = translated
+                    finished[index] = True
+                    if partial is not None and finished[prefix]:
+                        while prefix < len(segments) and finished[prefix]:
+                            prefix += 1
+                        partial(join_segments(segments[:prefix], results[:prefix]).strip())
+                    done_chars += len(segments[index].text)
+                    progress = min(0.1 + (done_chars / total_chars) * 0.85, 0.95)
+                    report(progress, f"Translated {completed}/{len(pending)} chunks", force=True)
+            except BaseException:
+                stop_pending()
+                raise
+
+        if self._is_cancelled:
+            log("Translation cancelled by user")
+            return None
+
+        translated_text = join_segments(segments, results).strip()
+        report(1.0, "Done!")
+        log(f"Chunked translation complete: {translated_text[:50]}...")
+        return translated_text
+
+    def _open_stream(self, client: Client, text: str, reference: Optional[Tuple[str, str]] = None) -> requests.Response:
+        """Build the prompt (or chat messages) for text and start a streamed generation.
+
+        Args:
+            client: Ollama client to send the request with.
+            text: The text to translate.
+            reference: Similar earlier (source, translation) pair to include in the prompt.
+
+        Returns:
+            The streamed HTTP response.
+        """
+        source_name = self.config["source_lang"]
+        source_code = LANGUAGE_MAP.get(source_name, "auto")
+        target_name = self.config["target_lang"]
+        target_code = LANGUAGE_MAP.get(target_name, "en")
+
+        detected = self.config.get("detected_lang")
+        if source_code == "auto" and detected in LANGUAGE_MAP and detected != "Auto Detect":
+            source_name, source_code = detected, LANGUAGE_MAP[detected]
+        elif source_code == "auto":
+            source_name = "Source Language"
+
+        build_start = time.perf_counter()
+        args = (
+            source_name,
+            source_code,
+            target_name,
+            target_code,
+            text,
+            self.config.get("style", "Default"),
+            self.config.get("length", "Unlimited"),
+            reference,
+        )
+        payload: Dict[str, Any] = {"model": self.config["model"]}
+        if self._api_path == "/api/chat":
+            payload["messages"] = build_messages(*args)
+            length = sum(len(message["content"]) for message in payload["messages"])
+        else:
+            payload["prompt"] = build_prompt(*args)
+            length = len(payload["prompt"])
+        self._observe(STAGE_PROMPT_BUILD, time.perf_counter() - build_start)
+        log(f"Prompt built, length: {length} chars")
+
+        payload["stream"] = True
+        payload["options"] = {"temperature": self.config.get("temperature", 0.3)}
+        if self.config.get("keep_alive"):
+            payload["keep_alive"] = self.config["keep_alive"]
+        response = client.post(self._api_path, payload)
+        self._observe(STAGE_CONNECT, response.elapsed.total_seconds(), _endpoint_of(response))
+        return response
+
+    def _read_stream(
+        self,
+        response: requests.Response,
+        on_token: Optional[Callable[[str, TokenBuffer], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Optional[str]:
+        """Collect the tokens of a streamed generation and close the response.
+
+        Args:
+            response: Streamed response from _open_stream().
+            on_token: Called with (token, buffer) for each token; buffer holds the text so far.
+            should_stop: Extra stop condition checked alongside cancellation.
+
+        Returns:
+            The raw generated text, or None if reading was stopped early.
+        """
+        buffer = TokenBuffer()
+        decoder = NDJSONDecoder()
+        # requests measures elapsed from sending the request to receiving the headers.
+        read_start = time.monotonic()
+        first_token_at: Optional[float] = None
+        tokens = 0
+        try:
+            for data in iter_ndjson(response.iter_content(READ_CHUNK_BYTES), decoder):
+                if self._is_cancelled or (should_stop and should_stop()):
+                    return None
+
+                message = data.get("message")
+                token = message.get("content", "") if isinstance(message, dict) else data.get("response")
+                if isinstance(token, str):
+                    if token:
+                        tokens += 1
+                        if first_token_at is None:
+                            first_token_at = time.monotonic()
+                            self._observe(
+                                STAGE_FIRST_TOKEN,
+                                response.elapsed.total_seconds() + first_token_at - read_start,
+                                _endpoint_of(response),
+                            )
+                            if self.first_token_ms is None:
+                                self.first_token_ms = (first_token_at - self._started_at) * 1000
+                        buffer.append(token)
+                    if on_token:
+                        on_token(token, buffer)
+
+                if data.get("done", False):
+                    stats = self._record_stats(GenerationStats.from_done(data))
+                    rate = stats.tokens_per_second
+                    if rate is None and first_token_at is not None and tokens > 1:
+                        # Older servers without eval counters: time the stream instead.
+                        generating = time.monotonic() - first_token_at
+                        rate = (tokens - 1) / generating if generating > 0 else None
+                    if rate is not None:
+                        self._observe(STAGE_TOKEN_RATE, rate, _endpoint_of(response))
+                    log(f"Ollama signaled done, total chars: {len(buffer)}")
+                    break
+        finally:
+            response.close()
+        if decoder.skipped:
+            log(f"Skipped {decoder.skipped} malformed stream lines", "WARN")
+        return buffer.text()
+
+    @property
+    def _api_path(self) -> str:
+        """The API path generations are requested from, per config["api"]."""
+        return "/api/chat" if self.config.get("api", DEFAULT_API) == API_CHAT else "/api/generate"
+
+    def _record_stats(self, stats: GenerationStats) -> GenerationStats:
+        """Add one generation's counters to the current translate() call's."""
+        with self._stats_lock:
+            self.stats = stats if self.stats is None else self.stats.merge(stats)
+            if stats.load_duration_ms is not None:
+                self.load_ms = max(self.load_ms or 0.0, stats.load_duration_ms)
+        return stats
+
+    def _post_process(self, translated: str, original: str) -> str:
+        """Run post_process() and record how long it took."""
+        start = time.perf_counter()
+        result = post_process(translated, original, self.config.get("cleaners", ()))
+        self._observe(STAGE_POST_PROCESS, time.perf_counter() - start)
+        return result
+
+    def _observe(self, stage: str, value: float, endpoint: str = "") -> None:
+        """Record a stage timing for the configured model, if metrics are enabled."""
+        if self.metrics is not None:
+            self.metrics.observe(stage, value, self.config.get("model", ""), endpoint)
+
+
+def _endpoint_of(response: requests.Response) -> str:
+    """Return the Ollama base URL a generate or chat response came from."""
+    url = response.url or ""
+    for path in ("/api/generate", "/api/chat"):
+        if url.endswith(path):
+            return url[: -len(path)]
+    return url
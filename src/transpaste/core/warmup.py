@@ -0,0 +1,117 @@
+"""Model residency: keep_alive handling and cold/warm first-token latency.
+
+Ollama unloads a model after it has been idle for its keep_alive period, and
+the next request then waits for the model to be loaded again. TransPaste
+sends its own keep_alive with every request, pre-loads the model with an
+empty generate call, and records first-token latency separately for cold
+(the model had to be loaded) and warm requests.
+"""
+
+import re
+import threading
+from typing import Dict, Optional
+
+DEFAULT_KEEP_ALIVE = "30m"
+# A generation whose load_duration exceeds this had to load the model first.
+COLD_LOAD_MS = 250.0
+MIN_KEEP_WARM_SECONDS = 30
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(h|ms|m|s)")
+_UNIT_SECONDS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def keep_alive_seconds(value: str) -> Optional[float]:
+    """Convert an Ollama keep_alive value to seconds.
+
+    Args:
+        value: A number of seconds ("300") or a Go duration ("30m", "1h30m").
+
+    Returns:
+        The duration in seconds, or None if the model is kept loaded forever
+        (negative values) or value cannot be parsed.
+    """
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        parts = _DURATION_RE.findall(value)
+        if not parts or "".join(number + unit for number, unit in parts) != value.lstrip("-"):
+            return None
+        seconds = sum(float(number) * _UNIT_SECONDS[unit] for number, unit in parts)
+        if value.startswith("-"):
+            seconds = -seconds
+    return seconds if seconds >= 0 else None
+
+
+def keep_warm_interval(keep_alive: str) -> Optional[float]:
+    """Return how often, in seconds, to ping a model so keep_alive never expires.
+
+    Args:
+        keep_alive: The keep_alive sent with every request.
+
+    Returns:
+        Four fifths of the keep_alive period (at least MIN_KEEP_WARM_SECONDS),
+        or None if the model never expires or is unloaded immediately.
+    """
+    seconds = keep_alive_seconds(keep_alive)
+    if not seconds:
+        return None
+    return max(seconds * 0.8, MIN_KEEP_WARM_SECONDS)
+
+
+class FirstTokenStats:
+    """Running first-token latency of cold and warm generations.
+
+    Thread-safe.
+
+    Attributes:
+        counts: Number of generations per kind ("cold", "warm").
+        totals_ms: Sum of first-token latencies per kind.
+        last_ms: Latest first-token latency per kind.
+    """
+
+    KINDS = ("cold", "warm")
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.counts: Dict[str, int] = {kind: 0 for kind in self.KINDS}
+        self.totals_ms: Dict[str, float] = {kind: 0.0 for kind in self.KINDS}
+        self.last_ms: Dict[str, Optional[float]] = {kind: None for kind in self.KINDS}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def classify(load_ms: Optional[float]) -> str:
+        """Return "cold" if a generation with this load_duration had to load the model."""
+        return "cold" if load_ms is not None and load_ms > COLD_LOAD_MS else "warm"
+
+    def record(self, first_token_ms: float, load_ms: Optional[float]) -> str:
+        """Add one generation.
+
+        Args:
+            first_token_ms: Time from sending the request to the first token.
+            load_ms: The load_duration Ollama reported, if any.
+
+        Returns:
+            The kind the generation was counted as.
+        """
+        kind = self.classify(load_ms)
+        with self._lock:
+            self.counts[kind] += 1
+            self.totals_ms[kind] += first_token_ms
+            self.last_ms[kind] = first_token_ms
+        return kind
+
+    def average_ms(self, kind: str) -> Optional[float]:
+        """Mean first-token latency of one kind, or None if there were none."""
+        with self._lock:
+            count = self.counts[kind]
+            return self.totals_ms[kind] / count if count else None
+
+    def summary(self) -> str:
+        """Return e.g. "warm 180 ms (12), cold 4210 ms (2)" for display."""
+        parts = []
+        for kind in ("warm", "cold"):
+            average = self.average_ms(kind)
+            if average is not None:
+                parts.append(f"{kind} {average:.0f} ms ({self.counts[kind]})")
+        return ", ".join(parts) or "no translations yet"
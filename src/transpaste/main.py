@@ -6,168 +6,87 @@ and replaces it with translations using Ollama's local LLMs.
 
 import argparse
 import json
-import logging
 import math
 import os
-import re
 import sys
-import traceback
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import requests
 from PySide6.QtCore import QObject, QSettings, Qt, QThread, QTimer, Signal
 from PySide6.QtGui import QAction, QColor, QFont, QIcon, QKeySequence, QPainter, QPen, QPixmap, QShortcut
 from PySide6.QtWidgets import (
     QApplication,
     QDialog,
+    QHBoxLayout,
     QLabel,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
     QMenu,
+    QPlainTextEdit,
     QPushButton,
     QSystemTrayIcon,
+    QTableWidget,
+    QTableWidgetItem,
     QVBoxLayout,
 )
 
-# -----------------------------------------------------------------------------
-# Debug Logger
-# -----------------------------------------------------------------------------
-DEBUG = False
-
-_logger = logging.getLogger("transpaste")
-
-
-def setup_logging(debug: bool = False) -> None:
-    """Configure logging for the application.
-
-    Args:
-        debug: If True, set log level to DEBUG with verbose output.
-               If False, set log level to WARNING (errors only).
-    """
-    global DEBUG
-    DEBUG = debug
-
-    if debug:
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format="%(asctime)s [%(levelname)s] %(message)s",
-            datefmt="%H:%M:%S",
-        )
-    else:
-        logging.basicConfig(
-            level=logging.WARNING,
-            format="%(asctime)s [%(levelname)s] %(message)s",
-            datefmt="%H:%M:%S",
-        )
-
-
-def log(message: str, level: str = "INFO") -> None:
-    """Print debug message with timestamp.
-
-    Args:
-        message: The log message.
-        level: Log level string (DEBUG, INFO, WARN, ERROR).
-    """
-    level_map = {
-        "DEBUG": logging.DEBUG,
-        "INFO": logging.INFO,
-        "WARN": logging.WARNING,
-        "ERROR": logging.ERROR,
-    }
-    _logger.log(level_map.get(level, logging.INFO), message)
-
+from transpaste.core.admission import (
+    DEFAULT_CONFIRM_CHARS,
+    DEFAULT_MAX_CHARS,
+    DEFER,
+    REJECT,
+    Admission,
+    AdmissionPolicy,
+    admit,
+)
+from transpaste.core.backoff import Backoff
+from transpaste.core.balancer import (
+    DEFAULT_HEALTH_INTERVAL_SECONDS,
+    BalancedClient,
+    Client,
+    EndpointStatus,
+    parse_endpoints,
+)
+from transpaste.core.cache import TranslationCache, default_cache_path
+from transpaste.core.client import DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE
+from transpaste.core.config import API_MODES, DEFAULT_API, DEFAULT_MODEL, OLLAMA_API_URL
+from transpaste.core.detect import detect_language, skip_reason
+from transpaste.core.history import (
+    DEFAULT_MAX_ENTRIES,
+    HistoryStore,
+    RetentionPolicy,
+    TranslationEntry,
+    default_history_path,
+    load_history,
+)
+from transpaste.core.ingest import DEFAULT_DEBOUNCE_MS, ClipboardGate
+from transpaste.core.jobs import JobQueue, TranslationJob
+from transpaste.core.log import log, setup_logging
+from transpaste.core.memory import DEFAULT_REFERENCE_THRESHOLD, DEFAULT_REUSE_THRESHOLD, TranslationMemory
+from transpaste.core.metrics import (
+    STAGE_CLIPBOARD_READ,
+    STAGE_CLIPBOARD_WRITE,
+    MetricsServer,
+    MetricsStore,
+)
+from transpaste.core.postprocess import cleaner_names, post_process
+from transpaste.core.prefetch import DEFAULT_PREFETCH_WORKERS, Prefetcher
+from transpaste.core.progress import GenerationStats, ProgressEstimator
+from transpaste.core.prompt import LANGUAGE_MAP, LENGTH_OPTIONS, TRANSLATION_STYLES
+from transpaste.core.segment import DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_WORKERS
+from transpaste.core.throttle import DEFAULT_PROGRESS_HZ
+from transpaste.core.translator import TranslationError, Translator
+from transpaste.core.warmup import DEFAULT_KEEP_ALIVE, FirstTokenStats, keep_warm_interval
 
 # -----------------------------------------------------------------------------
 # Configuration
 # -----------------------------------------------------------------------------
-OLLAMA_API_URL = "http://localhost:11434"
-OLLAMA_TAGS_URL = "http://localhost:11434/api/tags"
-DEFAULT_MODEL = "gemma3:1b"
-TIMEOUT_SECONDS = 120
-
 if sys.platform.startswith("linux"):
     os.environ["QT_QPA_PLATFORM"] = "xcb"
 
-# -----------------------------------------------------------------------------
-# Language Settings
-# -----------------------------------------------------------------------------
-LANGUAGE_MAP = {
-    "Auto Detect": "auto",
-    "English": "en",
-    "Chinese (Simplified)": "zh-Hans",
-    "Chinese (Traditional)": "zh-Hant",
-    "Japanese": "ja",
-    "Korean": "ko",
-    "French": "fr",
-    "German": "de",
-    "Spanish": "es",
-    "Russian": "ru",
-    "Italian": "it",
-    "Portuguese": "pt",
-    "Arabic": "ar",
-    "Hindi": "hi",
-    "Thai": "th",
-    "Vietnamese": "vi",
-}
-
-TRANSLATION_STYLES = {
-    "Default": {"description": "Standard translation", "instruction": ""},
-    "Formal": {
-        "description": "Professional and polite",
-        "instruction": "Use formal language and professional tone.",
-    },
-    "Casual": {"description": "Relaxed and friendly", "instruction": "Use casual, relaxed, and friendly language."},
-    "Academic": {
-        "description": "Scholarly and precise",
-        "instruction": "Use academic language with precise terminology.",
-    },
-    "Literary": {"description": "Artistic and expressive", "instruction": "Use literary and artistic language."},
-    "Technical": {"description": "Technical documentation", "instruction": "Use technical terminology accurately."},
-    "Simple": {"description": "Easy to understand", "instruction": "Use simple and clear language."},
-}
-
-LENGTH_OPTIONS = {
-    "Unlimited": {"description": "No length limit", "instruction": "", "max_words": None},
-    "Brief": {"description": "~50 words max", "instruction": "Keep the translation brief.", "max_words": 50},
-    "Short": {
-        "description": "~100 words max",
-        "instruction": "Keep the translation relatively short.",
-        "max_words": 100,
-    },
-    "Medium": {
-        "description": "~200 words max",
-        "instruction": "Provide a moderate-length translation.",
-        "max_words": 200,
-    },
-    "Detailed": {
-        "description": "Detailed translation",
-        "instruction": "Provide a detailed translation.",
-        "max_words": None,
-    },
-}
-
-
-# -----------------------------------------------------------------------------
-# Translation History Entry
-# -----------------------------------------------------------------------------
-@dataclass
-class TranslationEntry:
-    """Represents a single translation history entry.
-
-    Attributes:
-        original: The original source text.
-        translated: The translated result text.
-        source_lang: Source language name.
-        target_lang: Target language name.
-        timestamp: ISO format timestamp of when translation occurred.
-    """
-
-    original: str
-    translated: str
-    source_lang: str
-    target_lang: str
-    timestamp: str
-
 
 # -----------------------------------------------------------------------------
 # Icon Generator
@@ -177,6 +96,11 @@ class IconGenerator:
 
     Creates QPixmap-based icons for different translation states:
     idle, translating (with progress animation), success, and error.
+
+    Rendered icons are memoized. Translating frames are quantized to
+    ROTATION_STEP degrees and PROGRESS_BUCKETS progress levels and filled in
+    lazily, so the animation timer reuses at most 21 x 24 pre-rendered frames
+    instead of painting a new pixmap on every tick.
     """
 
     STATUS_IDLE = "idle"
@@ -184,8 +108,41 @@ class IconGenerator:
     STATUS_SUCCESS = "success"
     STATUS_ERROR = "error"
 
+    ROTATION_STEP = 15
+    PROGRESS_BUCKETS = 20
+
+    def __init__(self):
+        """Initialize an empty icon cache."""
+        self._static_icons: Dict[str, QIcon] = {}
+        self._frames: Dict[Tuple[int, int], QIcon] = {}
+
     def create_icon(self, status: str = STATUS_IDLE, progress: float = 0, rotation: float = 0) -> QIcon:
-        """Create an icon for the given status.
+        """Return the icon for the given status, rendering it on first use.
+
+        Args:
+            status: One of STATUS_IDLE, STATUS_TRANSLATING, STATUS_SUCCESS, STATUS_ERROR.
+            progress: Progress value from 0.0 to 1.0 (used for translating status).
+            rotation: Rotation angle in degrees (used for translating animation).
+
+        Returns:
+            QIcon object for the system tray.
+        """
+        if status != self.STATUS_TRANSLATING:
+            icon = self._static_icons.get(status)
+            if icon is None:
+                icon = self._static_icons[status] = self.render_icon(status)
+            return icon
+
+        bucket = int(min(max(progress, 0.0), 1.0) * self.PROGRESS_BUCKETS)
+        step = int(rotation // self.ROTATION_STEP) % (360 // self.ROTATION_STEP)
+        icon = self._frames.get((bucket, step))
+        if icon is None:
+            icon = self.render_icon(status, bucket / self.PROGRESS_BUCKETS, step * self.ROTATION_STEP)
+            self._frames[(bucket, step)] = icon
+        return icon
+
+    def render_icon(self, status: str = STATUS_IDLE, progress: float = 0, rotation: float = 0) -> QIcon:
+        """Paint a new icon without consulting the cache.
 
         Args:
             status: One of STATUS_IDLE, STATUS_TRANSLATING, STATUS_SUCCESS, STATUS_ERROR.
@@ -282,53 +239,6 @@ class IconGenerator:
         painter.drawLine(42, 22, 22, 42)
 
 
-# -----------------------------------------------------------------------------
-# Prompt Builder
-# -----------------------------------------------------------------------------
-def build_prompt(
-    source_lang: str, source_code: str, target_lang: str, target_code: str, text: str, style: str, length: str
-) -> str:
-    """Build the translation prompt for Ollama.
-
-    Args:
-        source_lang: Source language display name.
-        source_code: Source language code (e.g., 'en', 'auto').
-        target_lang: Target language display name.
-        target_code: Target language code (e.g., 'zh-Hans').
-        text: The text to translate.
-        style: Translation style name (e.g., 'Formal', 'Casual').
-        length: Length control name (e.g., 'Brief', 'Unlimited').
-
-    Returns:
-        Complete prompt string for the LLM.
-    """
-    style_info = TRANSLATION_STYLES.get(style, TRANSLATION_STYLES["Default"])
-    length_info = LENGTH_OPTIONS.get(length, LENGTH_OPTIONS["Unlimited"])
-
-    if source_code == "auto":
-        display_source = "Source Language"
-    else:
-        display_source = source_lang
-
-    base_prompt = (
-        f"You are a professional {display_source} ({source_code}) to "
-        f"{target_lang} ({target_code}) translator.\n\n"
-        f"CRITICAL RULES:\n"
-        f"1. Produce ONLY the {target_lang} translation\n"
-        f"2. Do NOT include any explanations or commentary\n"
-        f"3. Start directly with the translated text"
-    )
-
-    if style_info["instruction"]:
-        base_prompt += f"\n\nSTYLE: {style_info['instruction']}"
-
-    if length_info["instruction"]:
-        base_prompt += f"\n\nLENGTH: {length_info['instruction']}"
-
-    base_prompt += f"\n\nTranslate:\n\n{text}"
-    return base_prompt
-
-
 # -----------------------------------------------------------------------------
 # Translator Worker
 # -----------------------------------------------------------------------------
@@ -338,169 +248,200 @@ class TranslatorWorker(QThread):
     Signals:
         finished: Emitted when translation completes (original_text, translated_text).
         error: Emitted when an error occurs (error_message).
-        progress: Emitted during translation (progress_0_to_1, status_message).
+        progress: Emitted during translation (progress_0_to_1, status_message), at most
+                  config["progress_hz"] times per second; the final update always arrives.
+        partial: Emitted with the sentence-complete translation so far, if
+                 config["stream_partial"] is set (partial_text).
+        timing: Emitted before finished if a token arrived
+                (first_token_ms, model_load_ms or 0 if not reported).
+        generated: Emitted before finished with Ollama's counters for the
+                   translation (GenerationStats; fields are None if not reported).
     """
 
     finished = Signal(str, str)
     error = Signal(str)
     progress = Signal(float, str)
+    partial = Signal(str)
+    timing = Signal(float, float)
+    generated = Signal(object)
 
-    def __init__(self, text: str, config: Dict[str, Any]):
+    def __init__(
+        self,
+        text: str,
+        config: Dict[str, Any],
+        client: Optional[Client] = None,
+        metrics: Optional[MetricsStore] = None,
+        estimator: Optional[ProgressEstimator] = None,
+    ):
         """Initialize the translator worker.
 
         Args:
             text: The text to translate.
             config: Dictionary containing translation configuration
-                    (source_lang, target_lang, model, style, length, temperature, base_url).
+                    (source_lang, target_lang, model, style, length, temperature, base_url,
+                    stream_partial, progress_hz, cleaners).
+            client: Shared Ollama client. If None, a private client is created
+                    from the base_url and proxies in config.
+            metrics: Store that receives per-stage timings, if any.
+            estimator: Shared progress estimator that learns from every translation.
         """
         super().__init__()
         self.text = text
         self.config = config
-        self._is_cancelled = False
+        self.client = client
+        self.translator = Translator(config, client, metrics, estimator)
         log(f"TranslatorWorker created with text length: {len(text)}")
 
     def cancel(self) -> None:
         """Cancel the ongoing translation."""
-        self._is_cancelled = True
+        self.translator.cancel()
         log("Translation cancelled", "WARN")
 
     def run(self) -> None:
         """Execute the translation process in a background thread."""
         log("TranslatorWorker started")
         try:
-            source_name = self.config["source_lang"]
-            source_code = LANGUAGE_MAP.get(source_name, "auto")
-            target_name = self.config["target_lang"]
-            target_code = LANGUAGE_MAP.get(target_name, "en")
-
-            if source_code == "auto":
-                source_name = "Source Language"
-
-            prompt = build_prompt(
-                source_name,
-                source_code,
-                target_name,
-                target_code,
-                self.text,
-                self.config.get("style", "Default"),
-                self.config.get("length", "Unlimited"),
-            )
-            log(f"Prompt built, length: {len(prompt)} chars")
-
-            payload = {
-                "model": self.config["model"],
-                "prompt": prompt,
-                "stream": True,
-                "options": {"temperature": self.config.get("temperature", 0.3)},
-            }
-
-            base_url = self.config.get("base_url", OLLAMA_API_URL).rstrip("/")
-            api_url = f"{base_url}/api/generate"
-            log(f"Connecting to Ollama at {api_url}...")
-            self.progress.emit(0.05, "Connecting to Ollama...")
-
-            proxies = self.config.get("proxies")
-            response = requests.post(
-                api_url,
-                json=payload,
-                stream=True,
-                timeout=TIMEOUT_SECONDS,
-                proxies=proxies,
-            )
-            response.raise_for_status()
-            log("Connected to Ollama successfully")
-
-            translated_text = ""
-            total_chars = 0
-            estimated_chars = max(len(self.text) * 1.5, 20)
-
-            self.progress.emit(0.1, "Translating...")
-
-            for line in response.iter_lines():
-                if self._is_cancelled:
-                    log("Translation cancelled by user")
-                    return
-
-                if line:
-                    try:
-                        data = json.loads(line.decode("utf-8"))
-                        if "response" in data:
-                            translated_text += data["response"]
-                            total_chars += len(data["response"])
-
-                            progress = min(0.1 + (total_chars / estimated_chars) * 0.85, 0.95)
-                            preview = translated_text[-30:] if len(translated_text) > 30 else translated_text
-                            self.progress.emit(progress, f"Translating: {preview}...")
-
-                        if data.get("done", False):
-                            log(f"Ollama signaled done, total chars: {total_chars}")
-                            break
-                    except json.JSONDecodeError:
-                        continue
-
-            translated_text = translated_text.strip()
-            log(f"Raw translation length: {len(translated_text)}")
-
-            if translated_text:
-                self.progress.emit(0.98, "Processing result...")
-                translated_text = self._post_process(translated_text)
-                self.progress.emit(1.0, "Done!")
-                log(f"Translation complete: {translated_text[:50]}...")
-                self.finished.emit(self.text, translated_text)
-            else:
-                log("Empty response from Ollama", "ERROR")
-                self.error.emit("Empty response from Ollama")
-
-        except requests.exceptions.ReadTimeout:
-            log(f"Timeout after {TIMEOUT_SECONDS}s", "ERROR")
-            self.error.emit(f"Timeout after {TIMEOUT_SECONDS}s")
-        except requests.exceptions.ConnectionError as e:
-            log(f"Connection error: {e}", "ERROR")
-            self.error.emit("Cannot connect to Ollama. Is it running?")
-        except requests.exceptions.HTTPError as e:
-            log(f"HTTP error: {e}", "ERROR")
-            self.error.emit(f"HTTP error: {e.response.status_code}")
-        except Exception as e:
-            log(f"Unexpected error: {e}", "ERROR")
-            log(traceback.format_exc(), "ERROR")
+            partial = self.partial.emit if self.config.get("stream_partial") else None
+            translated_text = self.translator.translate(self.text, self.progress.emit, partial)
+        except TranslationError as e:
             self.error.emit(str(e))
+            return
+
+        if translated_text is not None:
+            if self.translator.first_token_ms is not None:
+                self.timing.emit(self.translator.first_token_ms, self.translator.load_ms or 0.0)
+            self.generated.emit(self.translator.stats or GenerationStats())
+            self.finished.emit(self.text, translated_text)
 
     def _post_process(self, translated_text: str) -> str:
-        """Clean up the raw translation output.
+        """Clean up the raw translation output; see transpaste.core.postprocess.post_process()."""
+        return post_process(translated_text, self.text, self.config.get("cleaners", ()))
+
+
+# -----------------------------------------------------------------------------
+# Model Fetcher
+# -----------------------------------------------------------------------------
+class ModelFetcher(QThread):
+    """Background thread that lists the models installed on the Ollama server.
 
-        Removes common LLM prefixes, markdown code blocks, and handles
-        smart quote preservation.
+    Signals:
+        finished: Emitted with the list of model names.
+        error: Emitted when the server cannot be reached (error_message).
+    """
+
+    finished = Signal(list)
+    error = Signal(str)
+
+    def __init__(self, client: Client):
+        """Initialize the model fetcher.
 
         Args:
-            translated_text: Raw text from Ollama.
+            client: Ollama client for the configured endpoints.
+        """
+        super().__init__()
+        self.client = client
 
-        Returns:
-            Cleaned translation text.
+    def run(self) -> None:
+        """Query /api/tags and emit the result."""
+        try:
+            self.finished.emit(self.client.list_models())
+        except Exception as e:
+            log(f"Failed to fetch models: {e}", "WARN")
+            self.error.emit(str(e))
+
+
+# -----------------------------------------------------------------------------
+# Model Warmer
+# -----------------------------------------------------------------------------
+class ModelWarmer(QThread):
+    """Background thread that loads a model with an empty generate request.
+
+    Signals:
+        finished: Emitted when the model is loaded (model, seconds_taken).
+        error: Emitted when loading failed (error_message).
+    """
+
+    finished = Signal(str, float)
+    error = Signal(str)
+
+    def __init__(self, client: Client, model: str, keep_alive: str):
+        """Initialize the model warmer.
+
+        Args:
+            client: Ollama client for the configured endpoints.
+            model: Model to load.
+            keep_alive: How long the server should keep the model loaded.
         """
-        prefixes = [
-            r"^Here is the translation.*?:",
-            r"^Here's the translation.*?:",
-            r"^Sure, here is the translation.*?:",
-            r"^Translation:",
-            r"^Translated text:",
-        ]
-        for p in prefixes:
-            translated_text = re.sub(p, "", translated_text, flags=re.IGNORECASE).strip()
-
-        markdown_pattern = r"^```(?:text|markdown)?\s*\n?(.*?)\n?```$"
-        translated_text = re.sub(markdown_pattern, r"\1", translated_text, flags=re.DOTALL).strip()
-
-        original_has_quotes = (self.text.strip().startswith('"') and self.text.strip().endswith('"')) or (
-            self.text.strip().startswith("'") and self.text.strip().endswith("'")
-        )
+        super().__init__()
+        self.client = client
+        self.model = model
+        self.keep_alive = keep_alive
 
-        if not original_has_quotes:
-            if translated_text.startswith('"') and translated_text.endswith('"'):
-                translated_text = translated_text[1:-1].strip()
-            elif translated_text.startswith("'") and translated_text.endswith("'"):
-                translated_text = translated_text[1:-1].strip()
+    def run(self) -> None:
+        """Load the model and emit how long it took."""
+        try:
+            self.finished.emit(self.model, self.client.warm_up(self.model, self.keep_alive))
+        except Exception as e:
+            log(f"Failed to warm up {self.model}: {e}", "WARN")
+            self.error.emit(str(e))
 
-        return translated_text
+
+# -----------------------------------------------------------------------------
+# Context Length Fetcher
+# -----------------------------------------------------------------------------
+class ContextLengthFetcher(QThread):
+    """Background thread that asks Ollama for a model's context length via /api/show.
+
+    Signals:
+        finished: Emitted with (model, context_length); context_length is None if unknown.
+    """
+
+    finished = Signal(str, object)
+
+    def __init__(self, client: Client, model: str):
+        """Initialize the fetcher.
+
+        Args:
+            client: Ollama client for the configured endpoints.
+            model: Model to look up.
+        """
+        super().__init__()
+        self.client = client
+        self.model = model
+
+    def run(self) -> None:
+        """Query /api/show and emit the context length."""
+        try:
+            self.finished.emit(self.model, self.client.context_length(self.model))
+        except Exception as e:
+            log(f"Failed to fetch the context length of {self.model}: {e}", "WARN")
+            self.finished.emit(self.model, None)
+
+
+# -----------------------------------------------------------------------------
+# Health Checker
+# -----------------------------------------------------------------------------
+class HealthChecker(QThread):
+    """Background thread that probes every Ollama endpoint.
+
+    Signals:
+        finished: Emitted with the list of EndpointStatus after the probe.
+    """
+
+    finished = Signal(list)
+
+    def __init__(self, client: BalancedClient):
+        """Initialize the health checker.
+
+        Args:
+            client: Balanced client whose endpoints are probed.
+        """
+        super().__init__()
+        self.client = client
+
+    def run(self) -> None:
+        """Probe the endpoints and emit their status."""
+        self.finished.emit(self.client.check_health())
 
 
 # -----------------------------------------------------------------------------
@@ -542,6 +483,178 @@ class AboutDialog(QDialog):
         layout.addWidget(close_btn)
 
 
+# -----------------------------------------------------------------------------
+# History Search Dialog
+# -----------------------------------------------------------------------------
+class HistorySearchDialog(QDialog):
+    """As-you-type search over the translation history.
+
+    Signals:
+        copy_requested: Emitted when the user asks to copy a translation (translated_text).
+    """
+
+    RESULT_LIMIT = 100
+
+    copy_requested = Signal(str)
+
+    def __init__(self, history: HistoryStore, parent=None):
+        """Initialize the search dialog.
+
+        Args:
+            history: The history store to search.
+            parent: Parent widget.
+        """
+        super().__init__(parent)
+        self.history = history
+        self.entries: List[TranslationEntry] = []
+        self.setWindowTitle("Search Translation History")
+        self.resize(640, 520)
+
+        layout = QVBoxLayout(self)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search original or translated text...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.run_search)
+        layout.addWidget(self.search_edit)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.results = QListWidget()
+        self.results.currentRowChanged.connect(self._show_entry)
+        self.results.itemDoubleClicked.connect(lambda item: self._copy_current())
+        layout.addWidget(self.results, 2)
+
+        self.detail = QPlainTextEdit()
+        self.detail.setReadOnly(True)
+        layout.addWidget(self.detail, 1)
+
+        buttons = QHBoxLayout()
+        copy_btn = QPushButton("Copy Translation")
+        copy_btn.clicked.connect(self._copy_current)
+        buttons.addWidget(copy_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self.run_search("")
+
+    def run_search(self, query: str) -> None:
+        """Replace the result list with the entries matching query.
+
+        Args:
+            query: Search terms; empty shows the newest entries.
+        """
+        self.entries = self.history.search(query, self.RESULT_LIMIT)
+        self.results.clear()
+        for entry in self.entries:
+            original = entry.original.replace("\n", " ")
+            translated = entry.translated.replace("\n", " ")
+            item = QListWidgetItem(f"{original[:50]}  →  {translated[:50]}")
+            item.setToolTip(f"{entry.original}\n\n{entry.translated}")
+            self.results.addItem(item)
+
+        total = len(self.history)
+        shown = len(self.entries)
+        if query.strip():
+            more = "+" if shown == self.RESULT_LIMIT else ""
+            self.status_label.setText(f"{shown}{more} matches in {total} entries")
+        else:
+            self.status_label.setText(f"Latest {shown} of {total} entries")
+        if self.entries:
+            self.results.setCurrentRow(0)
+        else:
+            self.detail.clear()
+
+    def _show_entry(self, row: int) -> None:
+        """Show the full texts of the selected result."""
+        if not 0 <= row < len(self.entries):
+            self.detail.clear()
+            return
+        entry = self.entries[row]
+        self.detail.setPlainText(
+            f"[{entry.timestamp}] {entry.source_lang} -> {entry.target_lang}\n\n"
+            f"{entry.original}\n\n{entry.translated}"
+        )
+
+    def _copy_current(self) -> None:
+        """Request a copy of the selected translation."""
+        row = self.results.currentRow()
+        if 0 <= row < len(self.entries):
+            self.copy_requested.emit(self.entries[row].translated)
+
+
+class MetricsDialog(QDialog):
+    """Table of p50/p95 latency per translation stage, model and endpoint."""
+
+    COLUMNS = ("Stage", "Model", "Endpoint", "Count", "p50", "p95")
+
+    def __init__(self, metrics: MetricsStore, export_url: Optional[str] = None, parent=None):
+        """Initialize the stats dialog.
+
+        Args:
+            metrics: The metrics store to show.
+            export_url: URL of the metrics HTTP endpoint, if it is running.
+            parent: Parent widget.
+        """
+        super().__init__(parent)
+        self.metrics = metrics
+        self.setWindowTitle("Latency Stats")
+        self.resize(720, 360)
+
+        layout = QVBoxLayout(self)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        if export_url:
+            export_label = QLabel(f"Exported at {export_url} (Prometheus) and {export_url}.json")
+            export_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            layout.addWidget(export_label)
+
+        buttons = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        buttons.addWidget(refresh_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Reload the table from the metrics store."""
+        summaries = self.metrics.summaries()
+        self.table.setRowCount(len(summaries))
+        for row, summary in enumerate(summaries):
+            unit = "" if summary.unit == "ms" else f" {summary.unit}"
+            cells = (
+                summary.stage,
+                summary.model,
+                summary.endpoint,
+                str(summary.count),
+                f"{summary.p50:.1f}{unit}",
+                f"{summary.p95:.1f}{unit}",
+            )
+            for column, value in enumerate(cells):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        self.table.resizeColumnsToContents()
+        self.status_label.setText(
+            f"{len(summaries)} series, times in ms over the last {self.metrics.window} observations each"
+            if summaries
+            else "No translations yet"
+        )
+
+
 # -----------------------------------------------------------------------------
 # Main Application
 # -----------------------------------------------------------------------------
@@ -552,7 +665,17 @@ class ClipboardTranslator(QObject):
     settings persistence, and translation history.
     """
 
-    MAX_HISTORY = 50
+    HISTORY_MENU_ENTRIES = 10
+    MODEL_REFRESH_INTERVAL_MS = 10 * 60 * 1000
+    HEALTH_CHECK_INTERVAL_MS = DEFAULT_HEALTH_INTERVAL_SECONDS * 1000
+    ANIMATION_INTERVAL_MS = 80
+    POLL_MIN_INTERVAL_MS = 500
+    POLL_MAX_INTERVAL_MS = 4000
+    SIGNAL_GRACE_MS = 300
+
+    POLL_AUTO = "auto"
+    POLL_ALWAYS = "always"
+    POLL_NEVER = "never"
 
     def __init__(
         self,
@@ -561,6 +684,24 @@ class ClipboardTranslator(QObject):
         initial_target: str = "English",
         base_url: str = OLLAMA_API_URL,
         proxies: Optional[Dict[str, str]] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        queue_size: int = 8,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_workers: int = DEFAULT_CHUNK_WORKERS,
+        poll_mode: str = POLL_AUTO,
+        history_retention: Optional[RetentionPolicy] = None,
+        memory: Optional[TranslationMemory] = None,
+        keep_alive: str = DEFAULT_KEEP_ALIVE,
+        metrics_port: Optional[int] = None,
+        api: str = DEFAULT_API,
+        progress_hz: float = DEFAULT_PROGRESS_HZ,
+        cleaners: Sequence[str] = (),
+        debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+        max_chars: int = DEFAULT_MAX_CHARS,
+        confirm_chars: int = DEFAULT_CONFIRM_CHARS,
+        context_length: int = 0,
+        prefetch_workers: int = DEFAULT_PREFETCH_WORKERS,
     ):
         """Initialize the clipboard translator.
 
@@ -568,8 +709,39 @@ class ClipboardTranslator(QObject):
             initial_model: Ollama model to use.
             initial_source: Source language name.
             initial_target: Target language name.
-            base_url: Ollama API base URL.
+            base_url: Ollama API base URL; several comma-separated URLs are load balanced
+                      with failover.
             proxies: HTTP proxy configuration dict.
+            pool_size: Maximum number of pooled connections to Ollama.
+            max_retries: Number of retries for failed connection attempts.
+            queue_size: Maximum number of translations waiting behind the running one.
+            chunk_size: Texts longer than this many characters are split into chunks.
+            chunk_workers: Number of chunks translated concurrently.
+            poll_mode: Clipboard polling: POLL_AUTO polls only until dataChanged is
+                       seen to work (or always on platforms where it is not), POLL_ALWAYS
+                       and POLL_NEVER force it on or off.
+            history_retention: Limits on kept translation history; defaults to RetentionPolicy().
+            memory: Translation memory consulted before starting a worker; defaults to
+                    TranslationMemory(). It is filled from the history in the background.
+            keep_alive: How long Ollama keeps the model loaded after each request
+                        (e.g. "30m"; "-1" for forever), sent with every request.
+            metrics_port: Serve per-stage metrics on this local port (Prometheus text at
+                          /metrics, JSON at /metrics.json); None disables the endpoint.
+            api: Ollama request mode, API_CHAT (instructions in a system message that
+                 Ollama can cache between requests) or API_GENERATE (one prompt).
+            progress_hz: Maximum progress updates per second sent from a worker to the
+                         GUI thread; 0 sends one per token.
+            cleaners: Names of post-processing cleaners to run on top of the default ones
+                      (see transpaste.core.postprocess).
+            debounce_ms: Clipboard change signals are collected for this many milliseconds
+                         and the clipboard read once after the last of them.
+            max_chars: Copies longer than this many characters are not translated; 0 for no limit.
+            confirm_chars: Copies longer than this wait in the tray menu until the user starts
+                           them; 0 translates them right away.
+            context_length: Model context length in tokens used to decide whether a text must be
+                            chunked; 0 asks Ollama's /api/show for each model.
+            prefetch_workers: Most background translations into the "Also Prepare"
+                              languages running at once.
         """
         super().__init__()
 
@@ -585,29 +757,83 @@ class ClipboardTranslator(QObject):
 
         self.settings = QSettings("TransPaste", "TransPaste")
         self.icon_generator = IconGenerator()
+        self.cache = TranslationCache(default_cache_path())
 
         self.base_url = base_url
         self.proxies = proxies
+        self.chunk_size = chunk_size
+        self.chunk_workers = chunk_workers
+        self.keep_alive = keep_alive
+        self.api = api
+        self.progress_hz = progress_hz
+        self.cleaners = list(cleaners)
+        self.first_token_stats = FirstTokenStats()
+        self.metrics = MetricsStore()
+        self.metrics_server: Optional[MetricsServer] = None
+        if metrics_port is not None:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, metrics_port)
+            except OSError as e:
+                log(f"Cannot serve metrics on port {metrics_port}: {e}", "WARN")
+        self.client = BalancedClient(
+            parse_endpoints(base_url),
+            proxies=proxies,
+            pool_size=max(pool_size, chunk_workers),
+            max_retries=max_retries,
+        )
 
         self._load_settings(initial_model, initial_source, initial_target)
-        self._load_history()
-
-        self.last_clipboard_text = ""
-        self.ignore_next_change = False
+        self.history = HistoryStore(default_history_path(), history_retention)
+        self._migrate_settings_history()
+        self.memory = memory if memory is not None else TranslationMemory()
+        self.progress_estimator = ProgressEstimator()
+        self._load_memory()
+
+        self.clipboard_gate = ClipboardGate()
+        self.debounce_ms = debounce_ms
         self.translator_thread = None
+        self.retired_workers: List[TranslatorWorker] = []
+        self.active_job: Optional[TranslationJob] = None
+        self.job_queue = JobQueue(max_size=queue_size, coalesce=self.coalesce_jobs)
+        self.cancel_action: Optional[QAction] = None
         self.translation_count = 0
+        self.skipped_texts: Counter = Counter()
+        self.max_chars = max_chars
+        self.confirm_chars = confirm_chars
+        self.context_length = context_length
+        self.context_lengths: Dict[str, Optional[int]] = {}
+        self.context_fetcher: Optional[ContextLengthFetcher] = None
+        self.deferred_text: Optional[str] = None
+        self.deferred_admission: Optional[Admission] = None
+        self.prefetcher = Prefetcher(self.cache, self.client, prefetch_workers)
         self.current_progress = 0.0
+        self.partial_preview = ""
+        self.generation_stats: Optional[GenerationStats] = None
         self.rotation_angle = 0
         self.clipboard_change_count = 0
+        self.clipboard_signal_at: Optional[float] = None
+        self.poll_mode = poll_mode
+        self.poll_backoff = Backoff(self.POLL_MIN_INTERVAL_MS, self.POLL_MAX_INTERVAL_MS)
+        self.signal_reliable: Optional[bool] = None
+        self.wakeups: Counter = Counter()
 
-        self.translation_history: List[TranslationEntry] = []
-
-        log("Fetching available models...")
-        self.fetch_available_models()
+        self.model_fetcher: Optional[ModelFetcher] = None
+        self.health_checker: Optional[HealthChecker] = None
+        self.model_warmer: Optional[ModelWarmer] = None
 
         log("Setting up tray icon...")
         self._setup_tray_icon()
 
+        log("Fetching available models in the background...")
+        self._setup_model_refresh()
+
+        log("Setting up endpoint health checks...")
+        self._setup_health_checks()
+
+        log("Warming up the model...")
+        self._setup_keep_warm()
+        self.fetch_context_length()
+
         log("Setting up clipboard monitor...")
         self._setup_clipboard_monitor()
 
@@ -622,53 +848,50 @@ class ClipboardTranslator(QObject):
 
         log("ClipboardTranslator initialized successfully!")
 
-    def _load_history(self) -> None:
-        """Load translation history from settings."""
-        try:
-            history_json = self.settings.value("translation_history", "")
-            if history_json:
-                history_data = json.loads(history_json)
-                self.translation_history = [TranslationEntry(**entry) for entry in history_data[-self.MAX_HISTORY :]]
-                log(f"Loaded {len(self.translation_history)} history entries")
-        except Exception as e:
-            log(f"Failed to load history: {e}", "WARN")
-            self.translation_history = []
+    def _migrate_settings_history(self) -> None:
+        """Move history saved in QSettings by older versions into the history store."""
+        legacy = self.settings.value("translation_history", "")
+        if not legacy:
+            return
+        entries = load_history(legacy)
+        self.history.add_many(entries)
+        self.settings.remove("translation_history")
+        log(f"Migrated {len(entries)} history entries from settings")
 
-    def _save_history(self) -> None:
-        """Save translation history to settings."""
-        try:
-            history_data = [
-                {
-                    "original": e.original,
-                    "translated": e.translated,
-                    "source_lang": e.source_lang,
-                    "target_lang": e.target_lang,
-                    "timestamp": e.timestamp,
-                }
-                for e in self.translation_history[-self.MAX_HISTORY :]
-            ]
-            self.settings.setValue("translation_history", json.dumps(history_data))
-        except Exception as e:
-            log(f"Failed to save history: {e}", "WARN")
+    def _load_memory(self) -> None:
+        """Feed the newest history entries to the translation memory and progress estimator on a background thread."""
 
-    def _add_to_history(self, original: str, translated: str) -> None:
-        """Add a translation to history.
+        def load() -> None:
+            entries = self.history.recent(self.memory.max_entries)
+            entries.reverse()
+            self.progress_estimator.load(entries)
+            self.memory.load(entries)
+            log(f"Loaded {len(entries)} history entries into the translation memory")
+
+        threading.Thread(target=load, name="memory-loader", daemon=True).start()
+
+    def _add_to_history(
+        self,
+        original: str,
+        translated: str,
+        source_lang: str,
+        target_lang: str,
+        model: str = "",
+        stats: Optional[GenerationStats] = None,
+    ) -> None:
+        """Add a translation to history and the translation memory.
 
         Args:
             original: Original source text.
             translated: Translated result text.
+            source_lang: Source language the job was translated from.
+            target_lang: Target language the job was translated into.
+            model: Model that generated the translation; "" for cache hits and memory reuse.
+            stats: Ollama's counters for the generation, if any.
         """
-        entry = TranslationEntry(
-            original=original,
-            translated=translated,
-            source_lang=self.current_source_lang,
-            target_lang=self.current_target_lang,
-            timestamp=datetime.now().isoformat(),
-        )
-        self.translation_history.append(entry)
-        if len(self.translation_history) > self.MAX_HISTORY:
-            self.translation_history = self.translation_history[-self.MAX_HISTORY :]
-        self._save_history()
+        entry = TranslationEntry.now(original, translated, source_lang, target_lang, model, stats)
+        self.history.add(entry)
+        self.memory.add(original, translated, source_lang, target_lang)
 
     def _load_settings(self, default_model: str, default_source: str, default_target: str) -> None:
         """Load persisted settings from QSettings.
@@ -688,7 +911,16 @@ class ClipboardTranslator(QObject):
         self.show_notifications = self.settings.value("show_notifications", True, type=bool)
         self.auto_copy = self.settings.value("auto_copy", True, type=bool)
         self.custom_prompt = self.settings.value("custom_prompt", "")
-        self.available_models = [self.current_model]
+        self.use_cache = self.settings.value("use_cache", True, type=bool)
+        self.use_memory = self.settings.value("use_memory", True, type=bool)
+        self.coalesce_jobs = self.settings.value("coalesce_jobs", True, type=bool)
+        self.split_long_texts = self.settings.value("split_long_texts", True, type=bool)
+        self.preserve_code = self.settings.value("preserve_code", True, type=bool)
+        self.stream_partial = self.settings.value("stream_partial", False, type=bool)
+        self.skip_untranslatable = self.settings.value("skip_untranslatable", True, type=bool)
+        self.keep_warm = self.settings.value("keep_warm", False, type=bool)
+        self.prefetch_targets = self._load_prefetch_targets()
+        self.available_models = self._with_current_model(self._load_cached_models())
 
         log(f"Settings loaded: enabled={self.is_enabled}, model={self.current_model}")
         log(f"  source={self.current_source_lang}, target={self.current_target_lang}")
@@ -705,6 +937,15 @@ class ClipboardTranslator(QObject):
         self.settings.setValue("show_notifications", self.show_notifications)
         self.settings.setValue("auto_copy", self.auto_copy)
         self.settings.setValue("custom_prompt", self.custom_prompt)
+        self.settings.setValue("use_cache", self.use_cache)
+        self.settings.setValue("use_memory", self.use_memory)
+        self.settings.setValue("coalesce_jobs", self.coalesce_jobs)
+        self.settings.setValue("split_long_texts", self.split_long_texts)
+        self.settings.setValue("preserve_code", self.preserve_code)
+        self.settings.setValue("stream_partial", self.stream_partial)
+        self.settings.setValue("skip_untranslatable", self.skip_untranslatable)
+        self.settings.setValue("keep_warm", self.keep_warm)
+        self.settings.setValue("prefetch_targets", json.dumps(self.prefetch_targets))
         log("Settings saved")
 
     def _setup_tray_icon(self) -> None:
@@ -722,11 +963,10 @@ class ClipboardTranslator(QObject):
         log(f"Tray icon created and shown: {self.tray_icon.isVisible()}")
 
     def _setup_animation_timer(self) -> None:
-        """Start the animation timer for translating icon."""
+        """Create the animation timer for the translating icon; it only runs while a worker is active."""
         self.animation_timer = QTimer(self)
+        self.animation_timer.setInterval(self.ANIMATION_INTERVAL_MS)
         self.animation_timer.timeout.connect(self._update_animation)
-        self.animation_timer.start(80)
-        log("Animation timer started")
 
     def _setup_shortcuts(self) -> None:
         """Set up global keyboard shortcuts."""
@@ -735,45 +975,97 @@ class ClipboardTranslator(QObject):
         log("Keyboard shortcut registered: Ctrl+Shift+T")
 
     def _update_animation(self) -> None:
-        """Update the translating icon animation frame."""
-        if self.translator_thread and self.translator_thread.isRunning():
-            self.rotation_angle = (self.rotation_angle + 15) % 360
-            icon = self.icon_generator.create_icon(
-                IconGenerator.STATUS_TRANSLATING, self.current_progress, self.rotation_angle
-            )
-            self.tray_icon.setIcon(icon)
+        """Update the translating icon animation frame, stopping the timer once no worker is running."""
+        self.wakeups["animation"] += 1
+        if not (self.translator_thread and self.translator_thread.isRunning()):
+            self.animation_timer.stop()
+            return
+        self.rotation_angle = (self.rotation_angle + 15) % 360
+        icon = self.icon_generator.create_icon(
+            IconGenerator.STATUS_TRANSLATING, self.current_progress, self.rotation_angle
+        )
+        self.tray_icon.setIcon(icon)
 
     def _update_tooltip(self) -> None:
-        """Update the system tray tooltip with current status."""
+        """Update the system tray tooltip with current status and queue depth."""
         status = "ON" if self.is_enabled else "OFF"
         if self.translator_thread and self.translator_thread.isRunning():
-            self.tray_icon.setToolTip(f"TransPaste - Translating... {int(self.current_progress * 100)}%")
+            tooltip = f"TransPaste - Translating... {int(self.current_progress * 100)}%"
+            if self.partial_preview:
+                tooltip += f"\n{self.partial_preview}"
         else:
-            self.tray_icon.setToolTip(f"TransPaste [{status}] - {self.current_model}")
+            tooltip = f"TransPaste [{status}] - {self.current_model}"
+
+        if self.job_queue:
+            tooltip += f"\nQueued: {len(self.job_queue)} (oldest waiting {self.job_queue.oldest_wait():.1f}s)"
+        if self.job_queue.dropped:
+            tooltip += f"\nDropped (queue full): {self.job_queue.dropped}"
+        if self.deferred_admission is not None:
+            tooltip += f"\nLarge text waiting: {self.deferred_admission.describe()}"
+        self.tray_icon.setToolTip(tooltip)
+
+        if self.cancel_action is not None:
+            self.cancel_action.setEnabled(self.active_job is not None or bool(self.job_queue))
 
     def _setup_clipboard_monitor(self) -> None:
-        """Connect clipboard change signal and set up cross-platform polling fallback."""
+        """Connect the clipboard change signal and, where it is unreliable, an adaptive polling fallback."""
         log("Connecting clipboard.dataChanged signal...")
         result = self.clipboard.dataChanged.connect(self._on_clipboard_changed)
         log(f"Signal connected: {result}")
 
-        log(f"Starting polling timer for {sys.platform}...")
+        self.ingest_timer = QTimer(self)
+        self.ingest_timer.setSingleShot(True)
+        self.ingest_timer.timeout.connect(self._get_clipboard_text)
+
         self.poll_timer = QTimer(self)
+        self.poll_timer.setSingleShot(True)
         self.poll_timer.timeout.connect(self._poll_clipboard)
-        self.poll_timer.start(500)
+
+        if self.poll_mode == self.POLL_AUTO and self._signal_known_unreliable():
+            self.signal_reliable = False
+        if self._polling_wanted():
+            log(f"Starting clipboard polling for {sys.platform} ({self.app.platformName()}, mode={self.poll_mode})")
+            self.poll_timer.start(self.poll_backoff.reset())
 
         current_text = self.clipboard.text()
         log(f"Current clipboard text on startup: '{current_text[:50]}...' (len={len(current_text)})")
+        self.clipboard_gate.check(current_text)
+
+    def _signal_known_unreliable(self) -> bool:
+        """Return True on platforms where dataChanged is not delivered while the app is in the background."""
+        return sys.platform == "darwin" or self.app.platformName().startswith("wayland")
+
+    def _polling_wanted(self) -> bool:
+        """Return True if the clipboard should currently be polled."""
+        if self.poll_mode == self.POLL_ALWAYS:
+            return True
+        if self.poll_mode == self.POLL_NEVER:
+            return False
+        return self.signal_reliable is not True
 
     def _poll_clipboard(self) -> None:
-        """Polling-based clipboard change detection (cross-platform fallback)."""
-        if not self.is_enabled:
-            return
+        """Polling-based clipboard change detection with exponential back-off while nothing changes."""
+        self.wakeups["poll"] += 1
+        if self.is_enabled and self._ingest(self.clipboard.text(), "poll"):
+            self.poll_backoff.reset()
+            if self.signal_reliable is None:
+                seen = self.clipboard_change_count
+                QTimer.singleShot(self.SIGNAL_GRACE_MS, lambda: self._check_signal_missed(seen))
+        else:
+            self.poll_backoff.grow()
 
-        text = self.clipboard.text()
-        if text and text.strip() and text != self.last_clipboard_text:
-            log(f"[POLL] Detected clipboard change: '{text[:30]}...'")
-            self._process_text(text)
+        if self._polling_wanted():
+            self.poll_timer.start(self.poll_backoff.interval)
+
+    def _check_signal_missed(self, seen_change_count: int) -> None:
+        """Mark dataChanged unreliable if a change found by polling was never signalled.
+
+        Args:
+            seen_change_count: clipboard_change_count when polling found the change.
+        """
+        if self.signal_reliable is None and self.clipboard_change_count == seen_change_count:
+            log("Clipboard change was not signalled; keeping polling enabled", "WARN")
+            self.signal_reliable = False
 
     def _show_startup_notification(self) -> None:
         """Show notification on application startup."""
@@ -796,6 +1088,7 @@ class ClipboardTranslator(QObject):
         self._add_length_menu()
         self.menu.addSeparator()
         self._add_model_menu()
+        self._add_endpoints_menu()
         self.menu.addSeparator()
         self._add_settings_menu()
         self.menu.addSeparator()
@@ -808,7 +1101,7 @@ class ClipboardTranslator(QObject):
         self._add_quit_action()
 
     def _add_status_action(self) -> None:
-        """Add the enable/disable toggle action to the menu."""
+        """Add the enable/disable toggle and cancel actions to the menu."""
         status_text = "Status: ON" if self.is_enabled else "Status: OFF"
         status_action = QAction(status_text, self.menu)
         status_action.setCheckable(True)
@@ -817,6 +1110,19 @@ class ClipboardTranslator(QObject):
         status_action.triggered.connect(self._toggle_enabled)
         self.menu.addAction(status_action)
 
+        self.cancel_action = QAction("Cancel Translation", self.menu)
+        self.cancel_action.setEnabled(self.active_job is not None or bool(self.job_queue))
+        self.cancel_action.triggered.connect(self.cancel_translation)
+        self.menu.addAction(self.cancel_action)
+
+        if self.deferred_admission is not None:
+            deferred_action = QAction(f"Translate Large Text ({self.deferred_admission.describe()})", self.menu)
+            deferred_action.triggered.connect(self._translate_deferred)
+            self.menu.addAction(deferred_action)
+            discard_action = QAction("Discard Large Text", self.menu)
+            discard_action.triggered.connect(self._discard_deferred)
+            self.menu.addAction(discard_action)
+
     def _add_language_menus(self) -> None:
         """Add source and target language submenus."""
         source_menu = self.menu.addMenu("Source Language")
@@ -837,6 +1143,21 @@ class ClipboardTranslator(QObject):
             action.triggered.connect(lambda checked, lang=lang: self._set_target_lang(lang))
             target_menu.addAction(action)
 
+        prepare_menu = self.menu.addMenu("Also Prepare")
+        prepare_menu.setToolTip(
+            "Also translate into these languages in the background, so switching to one of them\n"
+            "and copying the same text again is answered from the cache (needs the cache enabled)"
+        )
+        for lang in LANGUAGE_MAP.keys():
+            if lang == "Auto Detect":
+                continue
+            action = QAction(lang, self.menu)
+            action.setCheckable(True)
+            action.setChecked(lang in self.prefetch_targets)
+            action.setEnabled(self.use_cache)
+            action.triggered.connect(lambda checked, lang=lang: self._toggle_prefetch_target(lang))
+            prepare_menu.addAction(action)
+
     def _add_style_menu(self) -> None:
         """Add translation style submenu."""
         style_menu = self.menu.addMenu("Translation Style")
@@ -872,8 +1193,23 @@ class ClipboardTranslator(QObject):
         model_menu.addSeparator()
         model_menu.addAction(refresh_action)
 
+    def _add_endpoints_menu(self) -> None:
+        """Add the Ollama endpoints submenu with each endpoint's health, load and latency."""
+        statuses = self.client.status()
+        up = sum(status.healthy for status in statuses)
+        endpoints_menu = self.menu.addMenu(f"Endpoints ({up}/{len(statuses)} up)")
+        for status in statuses:
+            action = QAction(status.describe(), self.menu)
+            action.setEnabled(False)
+            endpoints_menu.addAction(action)
+
+        check_action = QAction("Check Now", self.menu)
+        check_action.triggered.connect(self.check_endpoints)
+        endpoints_menu.addSeparator()
+        endpoints_menu.addAction(check_action)
+
     def _add_settings_menu(self) -> None:
-        """Add settings submenu with notifications, auto-copy, temperature, and custom prompt."""
+        """Add settings submenu with notifications, auto-copy, cache, queueing, temperature, and custom prompt."""
         settings_menu = self.menu.addMenu("Settings")
 
         notifications_action = QAction("Show Notifications", self.menu)
@@ -888,6 +1224,68 @@ class ClipboardTranslator(QObject):
         auto_copy_action.triggered.connect(self._toggle_auto_copy)
         settings_menu.addAction(auto_copy_action)
 
+        cache_action = QAction("Use Translation Cache", self.menu)
+        cache_action.setCheckable(True)
+        cache_action.setChecked(self.use_cache)
+        cache_action.triggered.connect(self._toggle_cache)
+        settings_menu.addAction(cache_action)
+
+        clear_cache_action = QAction("Clear Translation Cache", self.menu)
+        clear_cache_action.triggered.connect(self._clear_cache)
+        settings_menu.addAction(clear_cache_action)
+
+        memory_action = QAction("Use Translation Memory", self.menu)
+        memory_action.setCheckable(True)
+        memory_action.setChecked(self.use_memory)
+        memory_action.setToolTip("Reuse or learn from earlier translations of similar text")
+        memory_action.triggered.connect(self._toggle_memory)
+        settings_menu.addAction(memory_action)
+
+        coalesce_action = QAction("Latest Copy Wins", self.menu)
+        coalesce_action.setCheckable(True)
+        coalesce_action.setChecked(self.coalesce_jobs)
+        coalesce_action.setToolTip("A new copy replaces translations that are still waiting in the queue")
+        coalesce_action.triggered.connect(self._toggle_coalesce)
+        settings_menu.addAction(coalesce_action)
+
+        split_action = QAction("Split Long Texts", self.menu)
+        split_action.setCheckable(True)
+        split_action.setChecked(self.split_long_texts)
+        split_action.setToolTip(f"Translate texts over {self.chunk_size} characters as parallel chunks")
+        split_action.triggered.connect(self._toggle_split_long_texts)
+        settings_menu.addAction(split_action)
+
+        code_action = QAction("Keep Code Blocks Untranslated", self.menu)
+        code_action.setCheckable(True)
+        code_action.setChecked(self.preserve_code)
+        code_action.triggered.connect(self._toggle_preserve_code)
+        settings_menu.addAction(code_action)
+
+        stream_action = QAction("Stream Partial Results", self.menu)
+        stream_action.setCheckable(True)
+        stream_action.setChecked(self.stream_partial)
+        stream_action.triggered.connect(self._toggle_stream_partial)
+        settings_menu.addAction(stream_action)
+
+        detect_action = QAction("Skip Untranslatable Text", self.menu)
+        detect_action.setCheckable(True)
+        detect_action.setChecked(self.skip_untranslatable)
+        detect_action.setToolTip(
+            "Detect the language locally: skip numbers, URLs, paths, code and text already in the "
+            "target language, and name the detected source language in the prompt"
+        )
+        detect_action.triggered.connect(self._toggle_skip_untranslatable)
+        settings_menu.addAction(detect_action)
+
+        keep_warm_action = QAction("Keep Model Warm", self.menu)
+        keep_warm_action.setCheckable(True)
+        keep_warm_action.setChecked(self.keep_warm)
+        keep_warm_action.setToolTip(
+            f"Ping the model while enabled so it is never unloaded (keep_alive {self.keep_alive})"
+        )
+        keep_warm_action.triggered.connect(self._toggle_keep_warm)
+        settings_menu.addAction(keep_warm_action)
+
         settings_menu.addSeparator()
 
         temp_menu = settings_menu.addMenu("Temperature")
@@ -913,25 +1311,24 @@ class ClipboardTranslator(QObject):
         """Add translation history submenu."""
         history_menu = self.menu.addMenu("Translation History")
 
-        if not self.translation_history:
+        recent = self.history.recent(self.HISTORY_MENU_ENTRIES)
+        if not recent:
             empty_action = QAction("No history yet", self.menu)
             empty_action.setEnabled(False)
             history_menu.addAction(empty_action)
             return
 
-        recent = self.translation_history[-10:]
-        for entry in reversed(recent):
+        for entry in recent:
             preview = entry.original[:30] + "..." if len(entry.original) > 30 else entry.original
             action = QAction(f"{preview}", self.menu)
             action.setToolTip(f"{entry.original}\n\n{entry.translated}")
             action.triggered.connect(lambda checked, e=entry: self._show_history_entry(e))
             history_menu.addAction(action)
 
-        if len(self.translation_history) > 10:
-            history_menu.addSeparator()
-            show_all = QAction(f"Show all ({len(self.translation_history)} entries)...", self.menu)
-            show_all.triggered.connect(self._show_full_history)
-            history_menu.addAction(show_all)
+        history_menu.addSeparator()
+        search_action = QAction(f"Search History ({len(self.history)} entries)...", self.menu)
+        search_action.triggered.connect(self._show_full_history)
+        history_menu.addAction(search_action)
 
         history_menu.addSeparator()
         clear_action = QAction("Clear History", self.menu)
@@ -978,46 +1375,80 @@ class ClipboardTranslator(QObject):
         dialog.exec()
 
     def _show_full_history(self) -> None:
-        """Show a dialog with the full translation history."""
-        dialog = QDialog(self.app.activeWindow())
-        dialog.setWindowTitle("Full Translation History")
-        dialog.setFixedSize(600, 500)
-
-        layout = QVBoxLayout(dialog)
-
-        history_text = ""
-        for entry in reversed(self.translation_history):
-            history_text += f"[{entry.timestamp}] {entry.source_lang} -> {entry.target_lang}\n"
-            history_text += f"  Original: {entry.original[:80]}\n"
-            history_text += f"  Translation: {entry.translated[:80]}\n\n"
-
-        text_label = QLabel(history_text.strip())
-        text_label.setWordWrap(True)
-        from PySide6.QtWidgets import QScrollArea
-
-        scroll = QScrollArea()
-        scroll.setWidget(text_label)
-        scroll.setWidgetResizable(True)
-        layout.addWidget(scroll)
-
-        close_btn = QPushButton("Close")
-        close_btn.clicked.connect(dialog.accept)
-        layout.addWidget(close_btn)
+        """Show the history search dialog."""
+        dialog = HistorySearchDialog(self.history, self.app.activeWindow())
+        dialog.copy_requested.connect(self._copy_to_clipboard)
+        dialog.exec()
 
+    def _show_metrics(self) -> None:
+        """Show the per-stage latency stats dialog."""
+        export_url = self.metrics_server.url if self.metrics_server is not None else None
+        dialog = MetricsDialog(self.metrics, export_url, self.app.activeWindow())
         dialog.exec()
 
     def _clear_history(self) -> None:
         """Clear all translation history."""
-        self.translation_history = []
-        self._save_history()
+        self.history.clear()
+        self.memory.clear()
+        self.setup_menu()
         log("Translation history cleared")
 
     def _add_stats_action(self) -> None:
-        """Add the translation count stats action."""
+        """Add the translation count and cache hit/miss stats actions."""
         stats_action = QAction(f"Translations: {self.translation_count}", self.menu)
         stats_action.setEnabled(False)
         self.menu.addAction(stats_action)
 
+        if self.skipped_texts:
+            reasons = ", ".join(f"{reason} {count}" for reason, count in self.skipped_texts.most_common())
+            skipped_action = QAction(f"Skipped: {sum(self.skipped_texts.values())} ({reasons})", self.menu)
+            skipped_action.setEnabled(False)
+            self.menu.addAction(skipped_action)
+
+        latency_action = QAction("Latency Stats...", self.menu)
+        latency_action.triggered.connect(self._show_metrics)
+        self.menu.addAction(latency_action)
+
+        cache_action = QAction(f"Cache: {self.cache.hits} hits / {self.cache.misses} misses", self.menu)
+        cache_action.setEnabled(False)
+        self.menu.addAction(cache_action)
+
+        memory = self.memory
+        memory_action = QAction(
+            f"Memory: {memory.reused} reused / {memory.referenced} referenced of {memory.lookups} lookups "
+            f"(avg {memory.average_lookup_ms:.1f} ms)",
+            self.menu,
+        )
+        memory_action.setEnabled(False)
+        self.menu.addAction(memory_action)
+
+        if self.prefetch_targets or self.prefetcher.completed:
+            prefetcher = self.prefetcher
+            prepared_action = QAction(
+                f"Prepared: {prefetcher.completed} translations ({prefetcher.pending()} pending, "
+                f"{prefetcher.preempted} paused for foreground)",
+                self.menu,
+            )
+            prepared_action.setEnabled(False)
+            self.menu.addAction(prepared_action)
+
+        first_token_action = QAction(f"First token: {self.first_token_stats.summary()}", self.menu)
+        first_token_action.setEnabled(False)
+        self.menu.addAction(first_token_action)
+
+        gate = self.clipboard_gate
+        duplicates = ", ".join(f"{reason} {count}" for reason, count in gate.suppressed.most_common()) or "none"
+        clipboard_action = QAction(
+            f"Clipboard: {gate.accepted} copies / {sum(gate.suppressed.values())} ignored ({duplicates})", self.menu
+        )
+        clipboard_action.setEnabled(False)
+        self.menu.addAction(clipboard_action)
+
+        wakeups = ", ".join(f"{name} {count}" for name, count in sorted(self.wakeups.items())) or "none"
+        wakeup_action = QAction(f"Timer wake-ups: {sum(self.wakeups.values())} ({wakeups})", self.menu)
+        wakeup_action.setEnabled(False)
+        self.menu.addAction(wakeup_action)
+
     def _add_about_action(self) -> None:
         """Add the About dialog action."""
         about_action = QAction("About TransPaste", self.menu)
@@ -1033,6 +1464,11 @@ class ClipboardTranslator(QObject):
     def _toggle_enabled(self) -> None:
         """Toggle translation enabled/disabled state."""
         self.is_enabled = not self.is_enabled
+        if not self.is_enabled:
+            self.cancel_translation()
+        else:
+            self.warm_up_model()
+        self._update_keep_warm_timer()
         self._save_settings()
         self._update_tooltip()
         self.setup_menu()
@@ -1095,6 +1531,8 @@ class ClipboardTranslator(QObject):
         self._update_tooltip()
         self.setup_menu()
         log(f"Model set to: {model}")
+        self.warm_up_model()
+        self.fetch_context_length()
 
     def _set_temperature(self, temp: float) -> None:
         """Set the model temperature.
@@ -1157,89 +1595,405 @@ class ClipboardTranslator(QObject):
         self._save_settings()
         self.setup_menu()
 
-    def fetch_available_models(self) -> None:
-        """Fetch available models from Ollama and update the model list."""
+    def _toggle_cache(self) -> None:
+        """Toggle lookup and storage of translations in the translation cache."""
+        self.use_cache = not self.use_cache
+        self._save_settings()
+        self.setup_menu()
+        log(f"Translation cache enabled: {self.use_cache}")
+
+    def _toggle_memory(self) -> None:
+        """Toggle fuzzy reuse of earlier translations from the translation memory."""
+        self.use_memory = not self.use_memory
+        self._save_settings()
+        self.setup_menu()
+        log(f"Translation memory enabled: {self.use_memory}")
+
+    def _toggle_coalesce(self) -> None:
+        """Toggle latest-wins coalescing of queued translations."""
+        self.coalesce_jobs = not self.coalesce_jobs
+        self.job_queue.coalesce = self.coalesce_jobs
+        self._save_settings()
+        self.setup_menu()
+        log(f"Latest-wins coalescing: {self.coalesce_jobs}")
+
+    def _toggle_split_long_texts(self) -> None:
+        """Toggle chunked, parallel translation of long texts."""
+        self.split_long_texts = not self.split_long_texts
+        self._save_settings()
+        self.setup_menu()
+        log(f"Split long texts: {self.split_long_texts}")
+
+    def _toggle_preserve_code(self) -> None:
+        """Toggle passing fenced code blocks through untranslated."""
+        self.preserve_code = not self.preserve_code
+        self._save_settings()
+        self.setup_menu()
+        log(f"Keep code blocks untranslated: {self.preserve_code}")
+
+    def _toggle_stream_partial(self) -> None:
+        """Toggle copying sentence-complete partial translations while tokens arrive."""
+        self.stream_partial = not self.stream_partial
+        self._save_settings()
+        self.setup_menu()
+        log(f"Stream partial results: {self.stream_partial}")
+
+    def _toggle_skip_untranslatable(self) -> None:
+        """Toggle the local language detection pre-filter."""
+        self.skip_untranslatable = not self.skip_untranslatable
+        self._save_settings()
+        self.setup_menu()
+        log(f"Skip untranslatable text: {self.skip_untranslatable}")
+
+    def _toggle_keep_warm(self) -> None:
+        """Toggle periodic keep-warm pings for the current model."""
+        self.keep_warm = not self.keep_warm
+        self._update_keep_warm_timer()
+        self._save_settings()
+        self.setup_menu()
+        log(f"Keep model warm: {self.keep_warm}")
+
+    def _toggle_prefetch_target(self, lang: str) -> None:
+        """Add or remove a language the last translation is also prepared in.
+
+        Args:
+            lang: Language name from LANGUAGE_MAP keys.
+        """
+        if lang in self.prefetch_targets:
+            self.prefetch_targets.remove(lang)
+        else:
+            self.prefetch_targets.append(lang)
+        self._save_settings()
+        self.setup_menu()
+        log(f"Also preparing: {', '.join(self.prefetch_targets) or 'none'}")
+
+    def _load_prefetch_targets(self) -> List[str]:
+        """Return the saved "Also Prepare" languages that are still known."""
         try:
-            proxies = self.proxies
-            response = requests.get(OLLAMA_TAGS_URL, timeout=2, proxies=proxies)
-            if response.status_code == 200:
-                data = response.json()
-                models = [m["name"] for m in data.get("models", [])]
-                if models:
-                    self.available_models = sorted(list(set(models)))
-                    log(f"Available models: {self.available_models}")
-                    if self.current_model not in self.available_models:
-                        self.available_models.append(self.current_model)
-                    self.available_models.sort()
-        except Exception as e:
-            log(f"Failed to fetch models: {e}", "WARN")
+            targets = json.loads(self.settings.value("prefetch_targets", "[]"))
+        except (TypeError, ValueError) as e:
+            log(f"Failed to load prefetch languages: {e}", "WARN")
+            return []
+        return [lang for lang in targets if lang in LANGUAGE_MAP and lang != "Auto Detect"]
+
+    def _clear_cache(self) -> None:
+        """Remove all cached translations."""
+        self.cache.clear()
+        self.setup_menu()
+        log("Translation cache cleared")
 
-    def _refresh_models(self) -> None:
-        """Refresh the available models list and rebuild menu."""
+    def _load_cached_models(self) -> List[str]:
+        """Return the model list saved by the last successful discovery."""
+        try:
+            return json.loads(self.settings.value("available_models", "[]"))
+        except (TypeError, ValueError) as e:
+            log(f"Failed to load cached model list: {e}", "WARN")
+            return []
+
+    def _with_current_model(self, models: List[str]) -> List[str]:
+        """Return models sorted and deduplicated, always including the current model."""
+        return sorted(set(models) | {self.current_model})
+
+    def _setup_model_refresh(self) -> None:
+        """Start model discovery now and refresh it periodically."""
+        self.model_refresh_timer = QTimer(self)
+        self.model_refresh_timer.timeout.connect(self._on_model_refresh_timer)
+        self.model_refresh_timer.start(self.MODEL_REFRESH_INTERVAL_MS)
         self.fetch_available_models()
+
+    def _on_model_refresh_timer(self) -> None:
+        """Periodic model list refresh."""
+        self.wakeups["models"] += 1
+        self.fetch_available_models()
+
+    def fetch_available_models(self) -> None:
+        """Start fetching the installed models in the background.
+
+        The model menu is rebuilt when the list arrives. Does nothing if a
+        fetch is already running.
+        """
+        if self.model_fetcher is not None and self.model_fetcher.isRunning():
+            return
+        self.model_fetcher = ModelFetcher(self.client)
+        self.model_fetcher.finished.connect(self._on_models_fetched)
+        self.model_fetcher.start()
+
+    def _on_models_fetched(self, models: List[str]) -> None:
+        """Store a freshly fetched model list and rebuild the menu if it changed.
+
+        Args:
+            models: Model names reported by the server.
+        """
+        if not models:
+            return
+        self.settings.setValue("available_models", json.dumps(sorted(set(models))))
+        available = self._with_current_model(models)
+        log(f"Available models: {available}")
+        if available != self.available_models:
+            self.available_models = available
+            self.setup_menu()
+
+    def _setup_keep_warm(self) -> None:
+        """Pre-load the current model and set up the keep-warm timer."""
+        self.keep_warm_timer = QTimer(self)
+        self.keep_warm_timer.timeout.connect(self._on_keep_warm_timer)
+        self._update_keep_warm_timer()
+        if self.is_enabled:
+            self.warm_up_model()
+
+    def _update_keep_warm_timer(self) -> None:
+        """Run keep-warm pings only while enabled, requested, and keep_alive would otherwise expire."""
+        interval = keep_warm_interval(self.keep_alive)
+        if self.is_enabled and self.keep_warm and interval is not None:
+            self.keep_warm_timer.start(int(interval * 1000))
+        else:
+            self.keep_warm_timer.stop()
+
+    def _on_keep_warm_timer(self) -> None:
+        """Periodic keep-warm ping."""
+        self.wakeups["keep-warm"] += 1
+        self.warm_up_model()
+
+    def warm_up_model(self) -> None:
+        """Load the current model in the background so the next translation starts warm.
+
+        Does nothing if a warm-up is already running; a model change during it
+        is picked up when it finishes.
+        """
+        if self.model_warmer is not None and self.model_warmer.isRunning():
+            return
+        self.model_warmer = ModelWarmer(self.client, self.current_model, self.keep_alive)
+        self.model_warmer.finished.connect(self._on_model_warmed)
+        self.model_warmer.start()
+
+    def fetch_context_length(self) -> None:
+        """Look up the current model's context length in the background, once per model."""
+        model = self.current_model
+        if self.context_length or model in self.context_lengths:
+            return
+        if self.context_fetcher is not None and self.context_fetcher.isRunning():
+            return
+        self.context_fetcher = ContextLengthFetcher(self.client, model)
+        self.context_fetcher.finished.connect(self._on_context_length)
+        self.context_fetcher.start()
+
+    def _on_context_length(self, model: str, context_length: Optional[int]) -> None:
+        """Remember a model's context length and look up the current model if it changed meanwhile.
+
+        Args:
+            model: The model that was looked up.
+            context_length: Its context length in tokens, or None if unknown.
+        """
+        log(f"Context length of {model}: {context_length or 'unknown'}")
+        if context_length is not None:
+            self.context_lengths[model] = context_length
+        if model != self.current_model:
+            QTimer.singleShot(0, self.fetch_context_length)
+
+    def _admission_policy(self) -> AdmissionPolicy:
+        """Return the size limits for the current model."""
+        return AdmissionPolicy(
+            max_chars=self.max_chars,
+            confirm_chars=self.confirm_chars,
+            context_tokens=self.context_length or self.context_lengths.get(self.current_model),
+        )
+
+    def _on_model_warmed(self, model: str, seconds: float) -> None:
+        """Log a finished warm-up and warm the current model if it changed meanwhile.
+
+        Args:
+            model: The model that was loaded.
+            seconds: How long loading took.
+        """
+        log(f"Model {model} ready after {seconds:.2f}s (keep_alive {self.keep_alive})")
+        if model != self.current_model and self.is_enabled:
+            QTimer.singleShot(0, self.warm_up_model)
+
+    def _on_translation_timing(self, first_token_ms: float, load_ms: float) -> None:
+        """Record the first-token latency of a finished translation.
+
+        Args:
+            first_token_ms: Time from sending the request to the first token.
+            load_ms: Model load time reported by Ollama, 0 if none.
+        """
+        if self._is_stale_signal():
+            return
+        kind = self.first_token_stats.record(first_token_ms, load_ms)
+        log(f"First token after {first_token_ms:.0f} ms ({kind}, model load {load_ms:.0f} ms)")
+
+    def _on_translation_generated(self, stats: GenerationStats) -> None:
+        """Keep Ollama's counters of the running translation for its history entry.
+
+        Args:
+            stats: Counters reported by the worker just before it finishes.
+        """
+        if self._is_stale_signal():
+            return
+        self.generation_stats = stats
+
+    def _setup_health_checks(self) -> None:
+        """Probe the endpoints periodically when there is more than one to choose from.
+
+        With a single endpoint its health is only tracked from translation requests.
+        """
+        self.health_timer = QTimer(self)
+        self.health_timer.timeout.connect(self._on_health_timer)
+        if len(self.client.clients) > 1:
+            self.health_timer.start(self.HEALTH_CHECK_INTERVAL_MS)
+            self.check_endpoints()
+
+    def _on_health_timer(self) -> None:
+        """Periodic endpoint health check."""
+        self.wakeups["health"] += 1
+        self.check_endpoints()
+
+    def check_endpoints(self) -> None:
+        """Start probing the endpoints in the background; the menu is rebuilt with the results.
+
+        Does nothing if a check is already running.
+        """
+        if self.health_checker is not None and self.health_checker.isRunning():
+            return
+        self.health_checker = HealthChecker(self.client)
+        self.health_checker.finished.connect(self._on_health_checked)
+        self.health_checker.start()
+
+    def _on_health_checked(self, statuses: List[EndpointStatus]) -> None:
+        """Log endpoint health and rebuild the menu.
+
+        Args:
+            statuses: Status of every endpoint after the probe.
+        """
+        for status in statuses:
+            log(f"Endpoint {status.describe()}")
         self.setup_menu()
 
+    def _refresh_models(self) -> None:
+        """Refresh the available models list; the menu is rebuilt when results arrive."""
+        self.fetch_available_models()
+
     def _on_clipboard_changed(self) -> None:
         """Handle clipboard data change signal."""
         self.clipboard_change_count += 1
         log(f"[SIGNAL] Clipboard changed (count: {self.clipboard_change_count})")
 
+        if self.signal_reliable is None:
+            self.signal_reliable = True
+            if not self._polling_wanted():
+                log("Clipboard signal works; stopping polling")
+                self.poll_timer.stop()
+
         if not self.is_enabled:
             log("Translation is disabled, ignoring")
             return
 
-        QTimer.singleShot(100, self._get_clipboard_text)
+        if self.clipboard_signal_at is None:
+            self.clipboard_signal_at = time.perf_counter()
+        # Restarting the timer collapses a burst of signals into a single read after the last one.
+        self.ingest_timer.start(self.debounce_ms)
 
     def _get_clipboard_text(self) -> None:
-        """Read text from clipboard and process it."""
+        """Read text from clipboard once the change signals have settled and process it."""
         log("Getting clipboard text...")
         text = self.clipboard.text()
         log(f"Clipboard text: '{text[:50]}...' (len={len(text)})")
+        if self.clipboard_signal_at is not None:
+            self.metrics.observe(STAGE_CLIPBOARD_READ, time.perf_counter() - self.clipboard_signal_at)
+            self.clipboard_signal_at = None
+        self._ingest(text, "signal")
+
+    def _ingest(self, text: str, source: str) -> bool:
+        """Process clipboard text reported by a signal or a poll, unless it was already handled.
+
+        Args:
+            text: The clipboard text.
+            source: What reported it, "signal" or "poll", for the log.
+
+        Returns:
+            True if the text was a new copy and was processed.
+        """
+        reason = self.clipboard_gate.check(text)
+        if reason is not None:
+            log(f"[{source.upper()}] Ignoring clipboard change: {reason}")
+            return False
+        log(f"[{source.upper()}] New clipboard text: '{text[:30]}...'")
         self._process_text(text)
+        return True
 
-    def _process_text(self, text: str) -> None:
+    def _process_text(self, text: str, confirmed: bool = False) -> None:
         """Validate and start translation for clipboard text.
 
         Args:
             text: The clipboard text to potentially translate.
+            confirmed: The user asked for this text from the tray menu, so it is
+                       not deferred again for its size.
         """
         log(f"Processing text: '{text[:50]}...' (len={len(text)})")
 
-        if self.ignore_next_change:
-            self.ignore_next_change = False
-            log("Ignoring this change (was set by ourselves)")
-            return
-
-        if not text or text.strip() == "":
-            log("Empty or whitespace text, ignoring")
+        admission = admit(text, self._admission_policy())
+        if admission.decision == REJECT:
+            self.skipped_texts["too large"] += 1
+            log(f"Not translating {admission.describe()}: {admission.reason}", "WARN")
+            self._notify_size("Text Too Large", f"Not translated: {admission.describe()}, {admission.reason}")
+            self.setup_menu()
             return
-
-        if text == self.last_clipboard_text:
-            log("Same as last clipboard text, ignoring")
-            return
-
-        if self.translator_thread and self.translator_thread.isRunning():
-            log("Translation already in progress, skipping")
+        if admission.decision == DEFER and not confirmed:
+            self.deferred_text = text
+            self.deferred_admission = admission
+            log(f"Deferring {admission.describe()}: {admission.reason}")
+            self._notify_size(
+                "Large Text Waiting",
+                f"{admission.describe()}. Choose 'Translate Large Text' in the tray menu to translate it.",
+            )
+            self.setup_menu()
+            self._update_tooltip()
             return
+        if admission.chunk_chars:
+            log(f"Chunking {admission.describe()} into pieces of at most {admission.chunk_chars} chars")
+
+        detection = None
+        if self.skip_untranslatable:
+            if self.current_source_lang == "Auto Detect":
+                detection = detect_language(text)
+            reason = skip_reason(text, self.current_target_lang, self.current_source_lang, detection)
+            if reason is not None:
+                self.skipped_texts[reason] += 1
+                log(f"Not translating: {reason}")
+                self.setup_menu()
+                return
+
+        detected_lang = detection.language if detection is not None and detection.confident else None
+        self._start_translation(text, detected_lang, admission.chunk_chars)
+
+    def _notify_size(self, title: str, message: str) -> None:
+        """Show a tray notification about a text rejected or deferred for its size."""
+        if self.show_notifications:
+            self.tray_icon.showMessage(title, message, QSystemTrayIcon.Warning, 4000)
+
+    def _translate_deferred(self) -> None:
+        """Translate the large text waiting in the tray menu."""
+        text = self.deferred_text
+        self._discard_deferred()
+        if text is not None:
+            self._process_text(text, confirmed=True)
+
+    def _discard_deferred(self) -> None:
+        """Forget the large text waiting in the tray menu."""
+        self.deferred_text = None
+        self.deferred_admission = None
+        self.setup_menu()
+        self._update_tooltip()
 
-        log(f"Starting translation for: '{text[:50]}...'")
-        self._start_translation(text)
-
-    def _start_translation(self, text: str) -> None:
-        """Start translation of the given text.
+    def _start_translation(self, text: str, detected_lang: Optional[str] = None, chunk_chars: int = 0) -> None:
+        """Start translation of the given text, or queue it behind the running one.
 
         Args:
             text: The text to translate.
+            detected_lang: Language the text was detected to be in, named in the prompt
+                           instead of a generic source language.
+            chunk_chars: Chunk size that keeps each request within the model's context,
+                         applied even if splitting long texts is turned off; 0 if not needed.
         """
-        if self.translator_thread and self.translator_thread.isRunning():
-            self.translator_thread.cancel()
-            self.translator_thread.wait(1000)
-
-        self.current_progress = 0.0
-        icon = self.icon_generator.create_icon(IconGenerator.STATUS_TRANSLATING, 0, 0)
-        self.tray_icon.setIcon(icon)
-        self._update_tooltip()
-
         config = {
             "source_lang": self.current_source_lang,
             "target_lang": self.current_target_lang,
@@ -1248,17 +2002,149 @@ class ClipboardTranslator(QObject):
             "length": self.current_length,
             "temperature": self.temperature,
             "base_url": self.base_url,
-            "proxies": self.proxies,
             "custom_prompt": self.custom_prompt,
+            "chunk_size": self.chunk_size if self.split_long_texts else 0,
+            "chunk_workers": self.chunk_workers,
+            "preserve_code": self.preserve_code,
+            "stream_partial": self.stream_partial,
+            "keep_alive": self.keep_alive,
+            "api": self.api,
+            "progress_hz": self.progress_hz,
+            "cleaners": self.cleaners,
+            "detected_lang": detected_lang,
         }
+        if chunk_chars:
+            # Kept out of chunk_size, and so out of cache keys: the same text is split this way
+            # whenever it is translated with this model, into any target language.
+            config["max_chunk_chars"] = chunk_chars
+        job = TranslationJob(text, config)
+        if self.use_cache:
+            job.cache_key = TranslationCache.make_key(text, config)
+
+        if self.active_job is not None:
+            removed = self.job_queue.push(job)
+            if removed is not None:
+                if self.job_queue.coalesce:
+                    log(f"Queued job superseded by newer copy: '{removed.text[:30]}...'")
+                else:
+                    log(f"Queue full, dropped oldest job: '{removed.text[:30]}...'", "WARN")
+                    if self.show_notifications:
+                        self.tray_icon.showMessage(
+                            "Translation Dropped",
+                            f"Queue full ({self.job_queue.max_size}), skipped: {removed.text[:50]}",
+                            QSystemTrayIcon.Warning,
+                            2000,
+                        )
+            log(f"Translation in progress, queued (depth={len(self.job_queue)})")
+            self._update_tooltip()
+            return
+
+        log(f"Starting translation for: '{text[:50]}...'")
+        self._run_job(job)
+
+    def _run_job(self, job: TranslationJob) -> None:
+        """Answer a job from the cache or translation memory, or start a worker thread for it.
+
+        A close but not reusable translation memory match is added to the
+        job's config as a reference example for the prompt.
 
-        self.translator_thread = TranslatorWorker(text, config)
+        Args:
+            job: The job to run.
+        """
+        self.active_job = job
+        log(f"Running job after waiting {job.wait_time():.2f}s")
+
+        if job.cache_key and self.use_cache:
+            cached = self.cache.get(job.cache_key)
+            if cached is not None:
+                log("Cache hit, skipping translation worker")
+                job.cache_key = None
+                self._on_translation_finished(job.text, cached)
+                return
+
+        if self.use_memory:
+            match = self.memory.lookup(job.text, job.config["source_lang"], job.config["target_lang"])
+            if match is not None and match.reused is not None:
+                log(f"Translation memory match ({match.score:.2f}) reused, skipping translation worker")
+                # An adapted near match is not an exact translation of this text; keep it out of the cache.
+                job.cache_key = None
+                self._on_translation_finished(job.text, match.reused)
+                return
+            if match is not None:
+                log(f"Translation memory match ({match.score:.2f}) added to the prompt as a reference")
+                job.config = dict(job.config, reference=(match.original, match.translated))
+
+        self._retire_worker()
+
+        self.current_progress = 0.0
+        self.partial_preview = ""
+        icon = self.icon_generator.create_icon(IconGenerator.STATUS_TRANSLATING, 0, 0)
+        self.tray_icon.setIcon(icon)
+
+        # Speculative translations would compete with this one for the model.
+        self.prefetcher.pause()
+        self.generation_stats = None
+        self.translator_thread = TranslatorWorker(
+            job.text, job.config, client=self.client, metrics=self.metrics, estimator=self.progress_estimator
+        )
         self.translator_thread.finished.connect(self._on_translation_finished)
         self.translator_thread.error.connect(self._on_translation_error)
         self.translator_thread.progress.connect(self._on_translation_progress)
+        self.translator_thread.partial.connect(self._on_translation_partial)
+        self.translator_thread.timing.connect(self._on_translation_timing)
+        self.translator_thread.generated.connect(self._on_translation_generated)
         self.translator_thread.start()
+        self.animation_timer.start()
+        self._update_tooltip()
         log("Translation thread started")
 
+    def _start_next_job(self) -> None:
+        """Run the next queued job, if any and no job is active."""
+        if self.active_job is not None:
+            return
+        job = self.job_queue.pop()
+        if job is not None:
+            self._run_job(job)
+        else:
+            self.prefetcher.resume()
+            self._update_tooltip()
+
+    def _finish_active_job(self) -> None:
+        """Mark the active job done and schedule the next queued job."""
+        self.active_job = None
+        QTimer.singleShot(0, self._start_next_job)
+
+    def _retire_worker(self) -> None:
+        """Detach the current worker so a new one can start, without waiting for it to exit."""
+        self.retired_workers = [w for w in self.retired_workers if w.isRunning()]
+        if self.translator_thread is not None:
+            if self.translator_thread.isRunning():
+                self.retired_workers.append(self.translator_thread)
+            self.translator_thread = None
+
+    def _is_stale_signal(self) -> bool:
+        """Return True if the signal being handled came from a cancelled or replaced worker."""
+        sender = self.sender()
+        return isinstance(sender, TranslatorWorker) and sender is not self.translator_thread
+
+    def cancel_translation(self) -> None:
+        """Cancel the running translation and discard queued jobs.
+
+        The in-flight stream is told to stop and its signals are muted; the
+        GUI thread never waits for the worker to exit.
+        """
+        discarded = self.job_queue.clear()
+        worker = self.translator_thread
+        if worker is not None and worker.isRunning():
+            worker.blockSignals(True)
+            worker.cancel()
+        self._retire_worker()
+        self.active_job = None
+        # Nothing is left for speculative translations to make way for.
+        self.prefetcher.resume()
+        log(f"Translation cancelled, {discarded} queued job(s) discarded")
+        self._reset_to_idle()
+
     def _on_translation_progress(self, progress: float, message: str) -> None:
         """Handle translation progress update.
 
@@ -1266,10 +2152,26 @@ class ClipboardTranslator(QObject):
             progress: Progress value from 0.0 to 1.0.
             message: Status message describing current progress.
         """
+        if self._is_stale_signal():
+            return
         self.current_progress = progress
         self._update_tooltip()
         log(f"Progress: {int(progress * 100)}% - {message}")
 
+    def _on_translation_partial(self, partial_text: str) -> None:
+        """Copy a sentence-complete partial translation so it can be pasted before the generation ends.
+
+        Args:
+            partial_text: The post-processed translation so far.
+        """
+        if self._is_stale_signal():
+            return
+        log(f"Partial translation: {len(partial_text)} chars")
+        if self.auto_copy:
+            self._copy_to_clipboard(partial_text)
+        self.partial_preview = "..." + partial_text[-60:] if len(partial_text) > 60 else partial_text
+        self._update_tooltip()
+
     def _on_translation_finished(self, original_text: str, translated_text: str) -> None:
         """Handle successful translation completion.
 
@@ -1277,6 +2179,8 @@ class ClipboardTranslator(QObject):
             original_text: The original source text.
             translated_text: The translated result.
         """
+        if self._is_stale_signal():
+            return
         log("Translation finished!")
         log(f"  Original: '{original_text[:50]}...'")
         log(f"  Translated: '{translated_text[:50]}...'")
@@ -1284,14 +2188,29 @@ class ClipboardTranslator(QObject):
         icon = self.icon_generator.create_icon(IconGenerator.STATUS_SUCCESS)
         self.tray_icon.setIcon(icon)
 
+        job = self.active_job
+        if job is not None and job.cache_key and job.text == original_text:
+            self.cache.put(job.cache_key, translated_text)
+        if job is not None and self.use_cache and self.prefetch_targets and job.text == original_text:
+            queued = self.prefetcher.submit(original_text, job.config, self.prefetch_targets)
+            if queued:
+                log(f"Preparing {queued} more translation(s) in the background")
+
         self.translation_count += 1
         self.setup_menu()
 
-        self._add_to_history(original_text, translated_text)
+        stats, self.generation_stats = self.generation_stats, None
+        model = job.config.get("model", "") if stats is not None and job is not None else ""
+        # The languages may have been changed in the menu while the job ran.
+        config = job.config if job is not None else {}
+        source_lang = config.get("source_lang", self.current_source_lang)
+        target_lang = config.get("target_lang", self.current_target_lang)
+        self._add_to_history(original_text, translated_text, source_lang, target_lang, model, stats)
 
         if self.auto_copy:
             self._copy_to_clipboard(translated_text)
 
+        self._finish_active_job()
         QTimer.singleShot(1500, self._reset_to_idle)
 
         if self.show_notifications:
@@ -1300,7 +2219,7 @@ class ClipboardTranslator(QObject):
 
     def _reset_to_idle(self) -> None:
         """Reset the tray icon to idle state if no translation is running."""
-        if not (self.translator_thread and self.translator_thread.isRunning()):
+        if self.active_job is None:
             icon = self.icon_generator.create_icon(IconGenerator.STATUS_IDLE)
             self.tray_icon.setIcon(icon)
             self._update_tooltip()
@@ -1311,26 +2230,38 @@ class ClipboardTranslator(QObject):
         Args:
             text: The text to copy.
         """
-        self.ignore_next_change = True
-        self.last_clipboard_text = text
+        self.clipboard_gate.mark_written(text)
 
         log(f"Copying to clipboard: '{text[:50]}...'")
-        self.clipboard.setText(text)
+        with self.metrics.timer(STAGE_CLIPBOARD_WRITE):
+            self.clipboard.setText(text)
 
         if sys.platform == "darwin":
             log("macOS: doing extra clipboard sync")
-            QTimer.singleShot(50, lambda: self.clipboard.setText(text))
-            QTimer.singleShot(150, lambda: self.clipboard.setText(text))
+            QTimer.singleShot(50, lambda: self._resync_clipboard(text))
+            QTimer.singleShot(150, lambda: self._resync_clipboard(text))
 
         log("Text copied to clipboard")
 
+    def _resync_clipboard(self, text: str) -> None:
+        """Write text to the clipboard again, unless something else was copied since.
+
+        Args:
+            text: The text _copy_to_clipboard wrote.
+        """
+        if self.clipboard_gate.is_current(text):
+            self.clipboard.setText(text)
+
     def _on_translation_error(self, error_msg: str) -> None:
         """Handle translation error.
 
         Args:
             error_msg: Error message describing what went wrong.
         """
+        if self._is_stale_signal():
+            return
         log(f"Translation error: {error_msg}", "ERROR")
+        self._finish_active_job()
 
         icon = self.icon_generator.create_icon(IconGenerator.STATUS_ERROR)
         self.tray_icon.setIcon(icon)
@@ -1348,11 +2279,28 @@ class ClipboardTranslator(QObject):
     def _quit_app(self) -> None:
         """Quit the application, saving all settings."""
         log("Quitting application...")
-        if self.translator_thread and self.translator_thread.isRunning():
-            self.translator_thread.cancel()
-            self.translator_thread.wait(2000)
+        self.cancel_translation()
+        for worker in self.retired_workers:
+            worker.wait(2000)
+        self.model_refresh_timer.stop()
+        self.health_timer.stop()
+        self.keep_warm_timer.stop()
+        self.poll_timer.stop()
+        self.animation_timer.stop()
+        log(f"Timer wake-ups: {dict(self.wakeups)}")
+        if self.model_fetcher is not None:
+            self.model_fetcher.wait(2000)
+        if self.health_checker is not None:
+            self.health_checker.wait(3000)
+        if self.model_warmer is not None:
+            self.model_warmer.wait(2000)
         self._save_settings()
-        self._save_history()
+        self.history.close()
+        self.prefetcher.close()
+        self.cache.close()
+        self.client.close()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
         self.app.quit()
 
 
@@ -1366,8 +2314,115 @@ def main() -> None:
     parser.add_argument("--length", type=str, default="Unlimited", help="Length control")
     parser.add_argument("--temperature", type=float, default=0.3, help="Model temperature")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
-    parser.add_argument("--base-url", type=str, default=OLLAMA_API_URL, help="Ollama API base URL")
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default=OLLAMA_API_URL,
+        help="Ollama API base URL; separate several with commas to balance across them",
+    )
     parser.add_argument("--proxy", type=str, default=None, help="HTTP proxy URL (e.g., http://127.0.0.1:7890)")
+    parser.add_argument(
+        "--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="Maximum pooled HTTP connections to Ollama"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=DEFAULT_MAX_RETRIES, help="Retries for failed connections to Ollama"
+    )
+    parser.add_argument("--queue-size", type=int, default=8, help="Maximum translations waiting in the queue")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Split texts longer than this many characters"
+    )
+    parser.add_argument(
+        "--chunk-workers", type=int, default=DEFAULT_CHUNK_WORKERS, help="Chunks translated concurrently"
+    )
+    parser.add_argument(
+        "--poll-clipboard",
+        choices=[ClipboardTranslator.POLL_AUTO, ClipboardTranslator.POLL_ALWAYS, ClipboardTranslator.POLL_NEVER],
+        default=ClipboardTranslator.POLL_AUTO,
+        help="Poll the clipboard: auto (only where change signals are unreliable), always or never",
+    )
+    parser.add_argument(
+        "--clipboard-debounce-ms",
+        type=int,
+        default=DEFAULT_DEBOUNCE_MS,
+        help="Wait this long after the last clipboard change signal before reading the clipboard",
+    )
+    parser.add_argument(
+        "--max-chars",
+        type=int,
+        default=DEFAULT_MAX_CHARS,
+        help="Do not translate copies longer than this many characters (0 = no limit)",
+    )
+    parser.add_argument(
+        "--confirm-chars",
+        type=int,
+        default=DEFAULT_CONFIRM_CHARS,
+        help="Hold copies longer than this in the tray menu until started by hand (0 = translate right away)",
+    )
+    parser.add_argument(
+        "--context-length",
+        type=int,
+        default=0,
+        help="Model context length in tokens for chunking decisions (0 = ask Ollama's /api/show)",
+    )
+    parser.add_argument(
+        "--prefetch-workers",
+        type=int,
+        default=DEFAULT_PREFETCH_WORKERS,
+        help='Most background translations into the "Also Prepare" languages running at once',
+    )
+    parser.add_argument(
+        "--history-max-entries", type=int, default=DEFAULT_MAX_ENTRIES, help="Keep at most this many history entries"
+    )
+    parser.add_argument(
+        "--history-max-age-days", type=float, default=None, help="Drop history entries older than this many days"
+    )
+    parser.add_argument(
+        "--history-max-mb", type=float, default=None, help="Keep at most this many megabytes of history text"
+    )
+    parser.add_argument(
+        "--keep-alive",
+        type=str,
+        default=DEFAULT_KEEP_ALIVE,
+        help='How long Ollama keeps the model loaded after a request (e.g. "30m", "-1" for forever)',
+    )
+    parser.add_argument(
+        "--memory-reuse-threshold",
+        type=float,
+        default=DEFAULT_REUSE_THRESHOLD,
+        help="Similarity (0-1) above which a past translation differing only in numbers/names is reused",
+    )
+    parser.add_argument(
+        "--memory-reference-threshold",
+        type=float,
+        default=DEFAULT_REFERENCE_THRESHOLD,
+        help="Similarity (0-1) above which a past translation is shown to the model as an example",
+    )
+    parser.add_argument(
+        "--api",
+        choices=API_MODES,
+        default=DEFAULT_API,
+        help="Ollama API: chat (instructions in a cacheable system message) or generate (one prompt)",
+    )
+    parser.add_argument(
+        "--progress-hz",
+        type=float,
+        default=DEFAULT_PROGRESS_HZ,
+        help="Maximum progress updates per second from the translation thread (0 = every token)",
+    )
+    parser.add_argument(
+        "--cleaner",
+        dest="cleaners",
+        action="append",
+        choices=cleaner_names(optional=True),
+        default=[],
+        help="Extra post-processing step, e.g. thinking (strip <think> blocks); repeat for several",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve per-stage latency metrics on this local port (/metrics for Prometheus, /metrics.json)",
+    )
 
     args = parser.parse_args()
 
@@ -1393,6 +2448,28 @@ def main() -> None:
         initial_target=args.target,
         base_url=args.base_url,
         proxies=proxies,
+        pool_size=args.pool_size,
+        max_retries=args.retries,
+        queue_size=args.queue_size,
+        chunk_size=args.chunk_size,
+        chunk_workers=args.chunk_workers,
+        poll_mode=args.poll_clipboard,
+        history_retention=RetentionPolicy(
+            max_entries=args.history_max_entries,
+            max_age_days=args.history_max_age_days,
+            max_bytes=int(args.history_max_mb * 1024 * 1024) if args.history_max_mb is not None else None,
+        ),
+        memory=TranslationMemory(args.memory_reuse_threshold, args.memory_reference_threshold),
+        keep_alive=args.keep_alive,
+        metrics_port=args.metrics_port,
+        api=args.api,
+        progress_hz=args.progress_hz,
+        cleaners=args.cleaners,
+        debounce_ms=args.clipboard_debounce_ms,
+        max_chars=args.max_chars,
+        confirm_chars=args.confirm_chars,
+        context_length=args.context_length,
+        prefetch_workers=args.prefetch_workers,
     )
 
     log("Starting event loop...")
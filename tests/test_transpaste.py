@@ -11,8 +11,9 @@ import time
 import threading
 import unittest
 import socket
+import tempfile
 from unittest.mock import Mock, patch, MagicMock
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import HTTPServer, BaseHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
@@ -33,11 +34,69 @@ IconGenerator = transpaste_main.IconGenerator
 TranslatorWorker = transpaste_main.TranslatorWorker
 ClipboardTranslator = transpaste_main.ClipboardTranslator
 AboutDialog = transpaste_main.AboutDialog
+ModelFetcher = transpaste_main.ModelFetcher
+ContextLengthFetcher = transpaste_main.ContextLengthFetcher
 TranslationEntry = transpaste_main.TranslationEntry
 LANGUAGE_MAP = transpaste_main.LANGUAGE_MAP
 TRANSLATION_STYLES = transpaste_main.TRANSLATION_STYLES
 LENGTH_OPTIONS = transpaste_main.LENGTH_OPTIONS
-build_prompt = transpaste_main.build_prompt
+
+import requests
+
+import transpaste.core.log as core_log
+from transpaste.core.admission import (
+    ACCEPT,
+    CHUNK,
+    DEFER,
+    REJECT,
+    AdmissionPolicy,
+    admit,
+    estimate_tokens,
+    parse_context_length,
+)
+from transpaste.core.balancer import BalancedClient, parse_endpoints
+from transpaste.core.backoff import Backoff
+from transpaste.core.cache import TranslationCache
+from transpaste.core.client import OllamaClient
+from transpaste.core.config import API_GENERATE, DEFAULT_API
+from transpaste.core.detect import (
+    REASON_CODE,
+    REASON_EMAIL,
+    REASON_NO_LETTERS,
+    REASON_PATH,
+    REASON_TARGET_LANGUAGE,
+    REASON_URL,
+    detect_language,
+    skip_reason,
+)
+from transpaste.core.ingest import (
+    REASON_EMPTY,
+    REASON_SEEN,
+    REASON_SELF_WRITTEN,
+    REASON_UNCHANGED,
+    ClipboardGate,
+)
+from transpaste.core.history import HistoryStore, RetentionPolicy, default_history_path, load_history
+from transpaste.core.jobs import JobQueue, TranslationJob
+from transpaste.core.memory import TranslationMemory, edit_distance, substitute_placeables, tokenize
+from transpaste.core.metrics import MetricsServer, MetricsStore, RollingHistogram
+from transpaste.cli import BatchItem, BatchResult, history_command, ordered_map, translate_command
+from transpaste.core.postprocess import (
+    DEFAULT_CLEANERS,
+    cleaner_names,
+    pipeline,
+    post_process,
+    register_cleaner,
+)
+from transpaste.core.prefetch import Prefetcher
+from transpaste.core.progress import GenerationStats, ProgressEstimator
+from transpaste.core.prompt import build_messages, build_prompt, build_system_prompt
+import transpaste.core.stream as core_stream
+from transpaste.core.stream import NDJSONDecoder, TokenBuffer, iter_ndjson
+from transpaste.core.throttle import ProgressThrottle
+from transpaste.core.segment import Segment, join_segments, sentence_prefix_end, split_text
+from transpaste.core.translator import TranslationError, Translator
+from transpaste.core.warmup import FirstTokenStats, keep_alive_seconds, keep_warm_interval
 
 
 def find_free_port():
@@ -58,6 +117,11 @@ class MockOllamaHandler(BaseHTTPRequestHandler):
     response_text = "This is a test translation."
     should_fail = False
     delay = 0.0
+    last_prompt = None
+    last_request = None
+    served_ports = []
+    load_duration_ns = 0
+    num_ctx = 0
 
     def log_message(self, format, *args):
         pass
@@ -74,6 +138,11 @@ class MockOllamaHandler(BaseHTTPRequestHandler):
                 ]
             }
             self.wfile.write(json.dumps(response).encode())
+        elif self.path == "/api/version":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps({"version": "0.0.0"}).encode())
         else:
             self.send_response(404)
             self.end_headers()
@@ -84,10 +153,18 @@ class MockOllamaHandler(BaseHTTPRequestHandler):
             self.end_headers()
             return
 
-        if self.path == "/api/generate":
+        if self.path in ("/api/generate", "/api/chat"):
             content_length = int(self.headers.get('Content-Length', 0))
             body = self.rfile.read(content_length).decode()
             data = json.loads(body)
+            chat = self.path == "/api/chat"
+            if chat:
+                prompt = "".join(message["content"] for message in data.get("messages", []))
+            else:
+                prompt = data.get("prompt", "")
+            MockOllamaHandler.last_prompt = prompt
+            MockOllamaHandler.last_request = data
+            MockOllamaHandler.served_ports.append(self.server.server_address[1])
 
             if data.get("stream"):
                 self.send_response(200)
@@ -97,11 +174,22 @@ class MockOllamaHandler(BaseHTTPRequestHandler):
                 translation = MockOllamaHandler.response_text
                 for i, char in enumerate(translation):
                     time.sleep(MockOllamaHandler.delay)
-                    chunk = json.dumps({"response": char, "done": False}) + "\n"
+                    if chat:
+                        message = {"message": {"role": "assistant", "content": char}, "done": False}
+                    else:
+                        message = {"response": char, "done": False}
+                    chunk = json.dumps(message) + "\n"
                     self.wfile.write(chunk.encode())
                     self.wfile.flush()
 
-                final = json.dumps({"response": "", "done": True}) + "\n"
+                final = json.dumps({
+                    **({"message": {"role": "assistant", "content": ""}} if chat else {"response": ""}),
+                    "done": True,
+                    "load_duration": MockOllamaHandler.load_duration_ns,
+                    "prompt_eval_count": len(prompt) // 4,
+                    "eval_count": len(translation),
+                    "eval_duration": len(translation) * 20_000_000,
+                }) + "\n"
                 self.wfile.write(final.encode())
                 self.wfile.flush()
             else:
@@ -110,6 +198,17 @@ class MockOllamaHandler(BaseHTTPRequestHandler):
                 self.end_headers()
                 response = {"response": MockOllamaHandler.response_text}
                 self.wfile.write(json.dumps(response).encode())
+        elif self.path == "/api/show":
+            content_length = int(self.headers.get('Content-Length', 0))
+            MockOllamaHandler.last_request = json.loads(self.rfile.read(content_length).decode())
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            response = {
+                "parameters": f"num_ctx {MockOllamaHandler.num_ctx}" if MockOllamaHandler.num_ctx else "",
+                "model_info": {"gemma3.context_length": 131072},
+            }
+            self.wfile.write(json.dumps(response).encode())
         else:
             self.send_response(404)
             self.end_headers()
@@ -166,6 +265,26 @@ class TestIconGenerator(unittest.TestCase):
             icons.append(icon)
         self.assertEqual(len(icons), 8)
 
+    def test_static_icons_cached(self):
+        """Test static icons are rendered once and reused"""
+        first = self.generator.create_icon(IconGenerator.STATUS_SUCCESS)
+        self.assertIs(self.generator.create_icon(IconGenerator.STATUS_SUCCESS), first)
+        self.assertIsNot(self.generator.create_icon(IconGenerator.STATUS_ERROR), first)
+
+    def test_translating_frames_quantized(self):
+        """Test nearby progress and rotation values share one cached frame"""
+        frame = self.generator.create_icon(IconGenerator.STATUS_TRANSLATING, progress=0.51, rotation=31)
+        same = self.generator.create_icon(IconGenerator.STATUS_TRANSLATING, progress=0.54, rotation=44)
+        self.assertIs(same, frame)
+        self.assertIsNot(self.generator.create_icon(IconGenerator.STATUS_TRANSLATING, 0.56, 31), frame)
+        self.assertIsNot(self.generator.create_icon(IconGenerator.STATUS_TRANSLATING, 0.51, 45), frame)
+
+    def test_frame_cache_bounded(self):
+        """Test a long spin at constant progress renders each rotation step only once"""
+        for tick in range(1000):
+            self.generator.create_icon(IconGenerator.STATUS_TRANSLATING, 0.1, tick * 15)
+        self.assertEqual(len(self.generator._frames), 360 // IconGenerator.ROTATION_STEP)
+
 
 class TestPromptBuilder(unittest.TestCase):
     """Test prompt building logic"""
@@ -182,6 +301,25 @@ class TestPromptBuilder(unittest.TestCase):
         self.assertIn("Chinese (Simplified)", prompt)
         self.assertIn("Hello world", prompt)
 
+    def test_system_prompt_is_stable(self):
+        """Test chat messages share an identical system prefix and match the generate prompt"""
+        first = build_messages("English", "en", "French", "fr", "Hello", "Formal", "Brief")
+        second = build_messages("English", "en", "French", "fr", "Goodbye", "Formal", "Brief", ("Hi", "Salut"))
+        self.assertEqual(first[0], second[0])
+        self.assertEqual(first[0]["content"], build_system_prompt("English", "en", "French", "fr", "Formal", "Brief"))
+        self.assertEqual(first[1:], [{"role": "user", "content": "Translate:\n\nHello"}])
+        self.assertEqual(
+            build_prompt("English", "en", "French", "fr", "Hello", "Formal", "Brief"),
+            first[0]["content"] + "\n\n" + first[1]["content"],
+        )
+
+    def test_user_message_carries_instruction(self):
+        """Test a pasted question reaches the model framed as text to translate, not as a question"""
+        messages = build_messages("English", "en", "French", "fr", "What time is it?", "Default", "Unlimited")
+        self.assertEqual(messages[-1]["role"], "user")
+        self.assertTrue(messages[-1]["content"].startswith("Translate:"))
+        self.assertTrue(messages[-1]["content"].endswith("What time is it?"))
+
     def test_style_in_prompt(self):
         """Test style instructions are included"""
         prompt = build_prompt(
@@ -228,6 +366,17 @@ class TestPromptBuilder(unittest.TestCase):
         )
         self.assertIsNotNone(prompt)
 
+    def test_reference_example(self):
+        """Test a reference translation is placed before the text to translate"""
+        prompt = build_prompt(
+            "English", "en", "French", "fr",
+            "Open the folder", "Default", "Unlimited",
+            reference=("Open the file", "Ouvrir le fichier")
+        )
+        self.assertIn("Source: Open the file\nTranslation: Ouvrir le fichier", prompt)
+        self.assertLess(prompt.index("Ouvrir le fichier"), prompt.index("Open the folder"))
+        self.assertNotIn("REFERENCE", build_prompt("English", "en", "French", "fr", "Hi", "Default", "Unlimited"))
+
 
 class TestTranslatorWorker(unittest.TestCase):
     """Test translation worker thread"""
@@ -372,6 +521,266 @@ class TestTranslatorWorker(unittest.TestCase):
             result = worker._post_process(input_text)
             self.assertEqual(result, expected)
 
+    def test_shared_client(self):
+        """Test workers reuse a shared pooled client"""
+        client = OllamaClient(f"http://localhost:{TEST_PORT}", pool_size=2)
+        results = []
+
+        try:
+            for text in ["One", "Two", "Three"]:
+                worker = TranslatorWorker(text, self.config, client=client)
+                worker.finished.connect(lambda original, translated: results.append(original))
+                worker.run()
+        finally:
+            client.close()
+
+        self.assertEqual(results, ["One", "Two", "Three"])
+
+    def test_reference_in_prompt(self):
+        """Test a translation memory reference in the config reaches the prompt"""
+        config = dict(
+            self.config, base_url=f"http://localhost:{TEST_PORT}", reference=("Good day", "日安"), api="generate"
+        )
+        worker = TranslatorWorker("Good night", config)
+        worker.run()
+        self.assertIn("Source: Good day\nTranslation: 日安", MockOllamaHandler.last_prompt)
+        self.assertNotIn("messages", MockOllamaHandler.last_request)
+
+    def test_chat_mode(self):
+        """Test chat mode keeps the instructions in a system message and streams message content"""
+        MockOllamaHandler.response_text = "晚安"
+        config = dict(self.config, base_url=f"http://localhost:{TEST_PORT}", reference=("Good day", "日安"))
+        results = []
+        worker = TranslatorWorker("Good night", config)
+        worker.finished.connect(lambda original, translated: results.append(translated))
+        worker.run()
+        self.assertEqual(results, ["晚安"])
+        messages = MockOllamaHandler.last_request["messages"]
+        self.assertEqual([m["role"] for m in messages], ["system", "user", "assistant", "user"])
+        self.assertEqual(messages[1:], [
+            {"role": "user", "content": "Translate:\n\nGood day"},
+            {"role": "assistant", "content": "日安"},
+            {"role": "user", "content": "Translate:\n\nGood night"},
+        ])
+        self.assertNotIn("Good night", messages[0]["content"])
+
+    def test_detected_language_in_prompt(self):
+        """Test a detected source language replaces the generic one in the prompt"""
+        config = dict(self.config, base_url=f"http://localhost:{TEST_PORT}", api="generate", detected_lang="French")
+        config["source_lang"] = "Auto Detect"
+        TranslatorWorker("Bonjour tout le monde", config).run()
+        self.assertIn("French (fr) to", MockOllamaHandler.last_prompt)
+        config["detected_lang"] = None
+        TranslatorWorker("Bonjour tout le monde", config).run()
+        self.assertIn("Source Language (auto) to", MockOllamaHandler.last_prompt)
+
+    def test_extra_cleaners(self):
+        """Test cleaners named in the config post-process the result"""
+        MockOllamaHandler.response_text = "<think>The user wants French.</think>\n\nBonjour"
+        config = dict(self.config, base_url=f"http://localhost:{TEST_PORT}", cleaners=["thinking"])
+        results = []
+        worker = TranslatorWorker("Hello", config)
+        worker.finished.connect(lambda original, translated: results.append(translated))
+        worker.run()
+        self.assertEqual(results, ["Bonjour"])
+
+    def test_chunked_translation(self):
+        """Test long texts are translated in chunks and reassembled in order"""
+        text = "\n\n".join(f"Paragraph number {i} is here." for i in range(6))
+        config = {
+            **self.config,
+            "base_url": f"http://localhost:{TEST_PORT}",
+            "chunk_size": 60,
+            "chunk_workers": 3,
+        }
+        worker = TranslatorWorker(text, config)
+
+        result = {"finished": None, "error": None}
+        progress_messages = []
+
+        def on_finished(original, translated):
+            result["finished"] = (original, translated)
+
+        def on_error(msg):
+            result["error"] = msg
+
+        worker.finished.connect(on_finished)
+        worker.error.connect(on_error)
+        worker.progress.connect(lambda value, msg: progress_messages.append((value, msg)))
+        worker.run()
+
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["finished"][0], text)
+        chunks = len(split_text(text, 60))
+        self.assertGreater(chunks, 1)
+        self.assertEqual(result["finished"][1], "\n\n".join(["这是测试翻译"] * chunks))
+        chunk_progress = [value for value, msg in progress_messages if "chunks" in msg and msg.startswith("Translated")]
+        self.assertEqual(len(chunk_progress), chunks)
+        self.assertEqual(chunk_progress, sorted(chunk_progress))
+
+    def test_stream_partial(self):
+        """Test sentence-complete partial translations are emitted while streaming"""
+        MockOllamaHandler.response_text = "First sentence. Second one! Tail"
+        config = {**self.config, "base_url": f"http://localhost:{TEST_PORT}", "stream_partial": True}
+        worker = TranslatorWorker("Hello. World! More", config)
+        partials = []
+        finished = []
+        worker.partial.connect(partials.append)
+        worker.finished.connect(lambda original, translated: finished.append(translated))
+        worker.run()
+
+        self.assertEqual(partials, ["First sentence.", "First sentence. Second one!"])
+        self.assertEqual(finished, ["First sentence. Second one! Tail"])
+
+    def test_stream_partial_disabled_by_default(self):
+        """Test no partial signals are emitted unless streaming is enabled"""
+        MockOllamaHandler.response_text = "First sentence. Second one."
+        worker = TranslatorWorker("Hello", {**self.config, "base_url": f"http://localhost:{TEST_PORT}"})
+        partials = []
+        worker.partial.connect(partials.append)
+        worker.run()
+        self.assertEqual(partials, [])
+
+    def test_keep_alive_and_first_token_timing(self):
+        """Test keep_alive is sent and first-token latency and model load time are reported"""
+        MockOllamaHandler.load_duration_ns = 3_000_000_000
+        try:
+            worker = TranslatorWorker(
+                "Hello", {**self.config, "base_url": f"http://localhost:{TEST_PORT}", "keep_alive": "30m"}
+            )
+            timings = []
+            worker.timing.connect(lambda first_token_ms, load_ms: timings.append((first_token_ms, load_ms)))
+            worker.run()
+        finally:
+            MockOllamaHandler.load_duration_ns = 0
+        self.assertEqual(MockOllamaHandler.last_request["keep_alive"], "30m")
+        self.assertEqual(len(timings), 1)
+        self.assertGreater(timings[0][0], 0)
+        self.assertAlmostEqual(timings[0][1], 3000.0)
+
+    def test_stage_metrics(self):
+        """Test every Ollama stage is recorded per model and endpoint"""
+        metrics = MetricsStore()
+        MockOllamaHandler.response_text = "Bonjour le monde"
+        worker = TranslatorWorker(
+            "Hello world", {**self.config, "base_url": f"http://localhost:{TEST_PORT}"}, metrics=metrics
+        )
+        worker.run()
+        endpoint = f"http://localhost:{TEST_PORT}"
+        stages = {(s.stage, s.model, s.endpoint): s for s in metrics.summaries()}
+        for stage in ("connect", "first_token", "tokens_per_second"):
+            self.assertEqual(stages[(stage, "test-model:latest", endpoint)].count, 1, stage)
+        for stage in ("prompt_build", "post_process", "translate"):
+            self.assertEqual(stages[(stage, "test-model:latest", "")].count, 1, stage)
+        self.assertEqual(stages[("tokens_per_second", "test-model:latest", endpoint)].unit, "tokens/s")
+
+    def test_generation_stats(self):
+        """Test Ollama's counters are reported, summed over chunks"""
+        MockOllamaHandler.response_text = "Traduction."
+        text = "\n\n".join(f"Paragraph number {i} is here." for i in range(4))
+        config = {**self.config, "base_url": f"http://localhost:{TEST_PORT}", "chunk_size": 40, "chunk_workers": 2}
+        worker = TranslatorWorker(text, config)
+        stats = []
+        worker.generated.connect(stats.append)
+        worker.run()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0].eval_count, 4 * len("Traduction."))
+        self.assertAlmostEqual(stats[0].eval_duration_ms, 4 * len("Traduction.") * 20)
+        self.assertAlmostEqual(stats[0].tokens_per_second, 50)
+        self.assertGreater(stats[0].prompt_eval_count, 0)
+
+    def test_calibrated_progress(self):
+        """Test progress is measured against the learned length of this language pair"""
+        MockOllamaHandler.response_text = "x" * 40
+        estimator = ProgressEstimator()
+        config = {**self.config, "base_url": f"http://localhost:{TEST_PORT}", "progress_hz": 0}
+        text = "y" * 40
+        progress = []
+        translator = Translator(config, estimator=estimator)
+        translator.translate(text, lambda value, message: progress.append(value))
+        self.assertLess(max(v for v in progress if v < 0.98), 0.7)
+        self.assertAlmostEqual(estimator.ratio("test-model:latest", "English", "Chinese (Simplified)"), 1.0)
+
+        progress.clear()
+        translator.translate(text, lambda value, message: progress.append(value))
+        self.assertAlmostEqual(max(v for v in progress if v < 0.98), 0.95)
+
+    def test_progress_throttled_on_fast_stream(self):
+        """Test a high token-rate stream crosses the thread boundary at most progress_hz times a second"""
+        MockOllamaHandler.response_text = "tok " * 500
+        config = {**self.config, "base_url": f"http://localhost:{TEST_PORT}", "progress_hz": 10}
+        worker = TranslatorWorker("Hello", config)
+        delivered = []
+        worker.progress.connect(lambda value, message: delivered.append((value, message)))
+        start = time.monotonic()
+        worker.run()
+        elapsed = time.monotonic() - start
+        self.assertLessEqual(len(delivered), elapsed * 10 + 3)
+        self.assertEqual(delivered[-1][0], 1.0)
+        self.assertTrue(delivered[-1][1].startswith("Done!"))
+
+        unthrottled = []
+        worker = TranslatorWorker("Hello", {**config, "progress_hz": 0})
+        worker.progress.connect(lambda value, message: unthrottled.append(value))
+        worker.run()
+        self.assertGreater(len(unthrottled), len("tok " * 500))
+
+    def test_progress_flushed_at_end(self):
+        """Test the update held back by the rate limit is delivered before translate() returns"""
+        config = {**self.config, "base_url": f"http://localhost:{TEST_PORT}", "progress_hz": 0.001}
+        translator = Translator(config)
+        delivered = []
+
+        def on_progress(value, message):
+            delivered.append(message)
+            translator.cancel()
+
+        self.assertIsNone(translator.translate("Hello", on_progress))
+        self.assertEqual(delivered, ["Connecting to Ollama...", "Translating..."])
+
+    def test_max_chunk_chars_caps_chunking(self):
+        """Test max_chunk_chars splits a text even with chunking turned off"""
+        text = "\n\n".join(f"Paragraph number {i} is here." for i in range(4))
+        config = {**self.config, "base_url": f"http://localhost:{TEST_PORT}", "chunk_size": 0, "max_chunk_chars": 40}
+        MockOllamaHandler.served_ports = []
+        self.assertEqual(Translator(config).translate(text), "\n\n".join(["这是测试翻译"] * 4))
+        self.assertEqual(len(MockOllamaHandler.served_ports), 4)
+
+    def test_chunked_cancel_stops_pending_chunks(self):
+        """Test cancelling a chunked translation sends no requests for chunks not started yet"""
+        text = "\n\n".join(f"Paragraph number {i} is here." for i in range(8))
+        config = {**self.config, "base_url": f"http://localhost:{TEST_PORT}", "chunk_size": 40, "chunk_workers": 1}
+        translator = Translator(config)
+        MockOllamaHandler.served_ports = []
+
+        def on_progress(value, message):
+            if message.startswith("Translated"):
+                translator.cancel()
+
+        self.assertIsNone(translator.translate(text, on_progress))
+        self.assertGreater(len(split_text(text, 40)), 4)
+        self.assertLessEqual(len(MockOllamaHandler.served_ports), 2)
+
+    def test_stream_partial_chunked_in_order(self):
+        """Test chunked partials only ever grow from the start of the text"""
+        text = "\n\n".join(f"Paragraph number {i} is here." for i in range(6))
+        config = {
+            **self.config,
+            "base_url": f"http://localhost:{TEST_PORT}",
+            "chunk_size": 60,
+            "chunk_workers": 3,
+            "stream_partial": True,
+        }
+        worker = TranslatorWorker(text, config)
+        partials = []
+        worker.partial.connect(partials.append)
+        worker.run()
+
+        self.assertTrue(partials)
+        for shorter, longer in zip(partials, partials[1:]):
+            self.assertTrue(longer.startswith(shorter))
+        self.assertEqual(partials[-1], "\n\n".join(["这是测试翻译"] * len(split_text(text, 60))))
+
     def test_custom_base_url(self):
         """Test custom base URL is used"""
         config = {**self.config, "base_url": f"http://localhost:{TEST_PORT}"}
@@ -393,6 +802,219 @@ class TestTranslatorWorker(unittest.TestCase):
         self.assertIsNotNone(result["finished"])
 
 
+class TestOllamaClient(unittest.TestCase):
+    """Test the pooled Ollama HTTP client"""
+
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.port = find_free_port()
+        cls.server = HTTPServer(('localhost', cls.port), MockOllamaHandler)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        MockOllamaHandler.should_fail = False
+        self.client = OllamaClient(f"http://localhost:{self.port}/", pool_size=2, max_retries=1)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_base_url_normalized(self):
+        """Test trailing slash is stripped from the base URL"""
+        self.assertEqual(self.client.url("/api/tags"), f"http://localhost:{self.port}/api/tags")
+
+    def test_list_models(self):
+        """Test model discovery uses the configured endpoint"""
+        self.assertIn("gemma3:1b", self.client.list_models())
+
+    def test_warm_up(self):
+        """Test warm-up sends an empty generate request with keep_alive"""
+        seconds = self.client.warm_up("gemma3:1b", keep_alive="1h")
+        self.assertGreaterEqual(seconds, 0)
+        self.assertEqual(MockOllamaHandler.last_request, {"model": "gemma3:1b", "stream": False, "keep_alive": "1h"})
+
+    def test_model_fetcher(self):
+        """Test background model discovery emits the model list"""
+        fetcher = ModelFetcher(self.client)
+        models = []
+        fetcher.finished.connect(models.extend)
+        fetcher.run()
+        self.assertEqual(sorted(models), ["gemma3:1b", "test-model:latest"])
+
+    def test_context_length(self):
+        """Test the context length comes from num_ctx, else Ollama's default capped by the model"""
+        try:
+            self.assertEqual(self.client.context_length("gemma3:1b"), 4096)
+            self.assertEqual(MockOllamaHandler.last_request, {"model": "gemma3:1b"})
+            MockOllamaHandler.num_ctx = 8192
+            fetcher = ContextLengthFetcher(self.client, "gemma3:1b")
+            lengths = []
+            fetcher.finished.connect(lambda model, length: lengths.append((model, length)))
+            fetcher.run()
+            self.assertEqual(lengths, [("gemma3:1b", 8192)])
+        finally:
+            MockOllamaHandler.num_ctx = 0
+
+    def test_model_fetcher_unreachable(self):
+        """Test model discovery reports an error instead of raising when Ollama is down"""
+        client = OllamaClient(f"http://localhost:{find_free_port()}", max_retries=0)
+        fetcher = ModelFetcher(client)
+        errors = []
+        fetcher.error.connect(errors.append)
+        fetcher.run()
+        client.close()
+        self.assertEqual(len(errors), 1)
+
+    def test_generate_http_error(self):
+        """Test HTTP errors are raised, not retried silently"""
+        MockOllamaHandler.should_fail = True
+        try:
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.client.generate({"model": "m", "prompt": "p", "stream": True})
+        finally:
+            MockOllamaHandler.should_fail = False
+
+    def test_concurrent_requests(self):
+        """Test one client can be shared across threads"""
+        results = []
+
+        def fetch():
+            results.append(len(self.client.list_models()))
+
+        threads = [threading.Thread(target=fetch) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [2] * 6)
+
+
+class BrokenOllamaHandler(MockOllamaHandler):
+    """Mock node that accepts connections but fails every request with a 503"""
+
+    def do_GET(self):
+        self.send_response(503)
+        self.end_headers()
+
+    do_POST = do_GET
+
+
+class TestBalancedClient(unittest.TestCase):
+    """Test load balancing and failover across several Ollama endpoints"""
+
+    def setUp(self):
+        MockOllamaHandler.should_fail = False
+        MockOllamaHandler.delay = 0.0
+        MockOllamaHandler.response_text = "Bonjour"
+        MockOllamaHandler.served_ports = []
+        self.servers = []
+        self.dead_url = f"http://localhost:{find_free_port()}"
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def start_node(self, handler=MockOllamaHandler):
+        server = ThreadingHTTPServer(('localhost', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.servers.append(server)
+        return f"http://localhost:{server.server_address[1]}"
+
+    def make_client(self, urls):
+        client = BalancedClient(urls, max_retries=0)
+        self.addCleanup(client.close)
+        return client
+
+    def generate(self, client):
+        response = client.generate({"model": "m", "prompt": "Hi", "stream": True})
+        text = "".join(json.loads(line)["response"] for line in response.iter_lines() if line)
+        response.close()
+        return text
+
+    def test_parse_endpoints(self):
+        """Test comma-separated URLs are split, normalized and deduplicated"""
+        self.assertEqual(parse_endpoints(" http://a:1/, http://b:2 ,http://a:1"), ["http://a:1", "http://b:2"])
+        self.assertEqual(parse_endpoints(""), [transpaste_main.OLLAMA_API_URL])
+
+    def test_failover_on_connection_error(self):
+        """Test a request to a dead node is retried on a live one and the dead node is skipped afterwards"""
+        live = self.start_node()
+        client = self.make_client([self.dead_url, live])
+        self.assertEqual(self.generate(client), "Bonjour")
+        dead_status, live_status = client.status()
+        self.assertFalse(dead_status.healthy)
+        self.assertTrue(live_status.healthy)
+        self.assertIsNotNone(live_status.latency_ms)
+        self.assertEqual(live_status.outstanding, 0)
+        self.assertEqual(self.generate(client), "Bonjour")
+        self.assertEqual(client.status()[0].failures, 1)
+
+    def test_failover_on_server_error(self):
+        """Test a 5xx response is retried on another node"""
+        broken = self.start_node(BrokenOllamaHandler)
+        live = self.start_node()
+        client = self.make_client([broken, live])
+        self.assertEqual(self.generate(client), "Bonjour")
+        self.assertEqual(client.status()[0].last_error, "HTTP 503")
+
+    def test_all_nodes_down(self):
+        """Test the translator reports a connection error when no node is reachable"""
+        config = {"source_lang": "English", "target_lang": "French", "model": "m",
+                  "base_url": f"{self.dead_url},http://localhost:{find_free_port()}"}
+        with self.assertRaises(TranslationError) as ctx:
+            Translator(config).translate("Hello")
+        self.assertIn("Cannot connect", str(ctx.exception))
+
+    def test_least_outstanding(self):
+        """Test an open stream steers the next request to the idle node"""
+        nodes = [self.start_node(), self.start_node()]
+        client = self.make_client(nodes)
+        first = client.generate({"model": "m", "prompt": "Hi", "stream": True})
+        busy = [s.url for s in client.status() if s.outstanding == 1]
+        self.assertEqual(len(busy), 1)
+        self.assertNotEqual(client.url(""), busy[0])
+        first.close()
+        self.assertEqual([s.outstanding for s in client.status()], [0, 0])
+
+    def test_latency_weighted(self):
+        """Test the node with the lower measured latency is preferred when both are idle"""
+        nodes = [self.start_node(), self.start_node()]
+        client = self.make_client(nodes)
+        client._mark_ok(0, latency_ms=500)
+        client._mark_ok(1, latency_ms=20)
+        self.generate(client)
+        self.assertEqual(MockOllamaHandler.served_ports, [int(nodes[1].rsplit(":", 1)[1])])
+
+    def test_warm_up_every_node(self):
+        """Test warm-up loads the model on every reachable node"""
+        nodes = [self.start_node(), self.start_node()]
+        client = self.make_client(nodes + [self.dead_url])
+        self.assertGreaterEqual(client.warm_up("m", "5m"), 0)
+        self.assertEqual(len(MockOllamaHandler.served_ports), 2)
+        self.assertFalse(client.status()[2].healthy)
+
+    def test_health_check_and_models(self):
+        """Test health probes update every node and models come from reachable nodes"""
+        live = self.start_node()
+        client = self.make_client([live, self.dead_url])
+        statuses = client.check_health()
+        self.assertTrue(statuses[0].healthy)
+        self.assertIsNotNone(statuses[0].probe_ms)
+        self.assertFalse(statuses[1].healthy)
+        self.assertIn("down", statuses[1].describe())
+        self.assertEqual(client.list_models(), ["test-model:latest", "gemma3:1b"])
+        self.assertEqual(client.context_length("m"), 4096)
+
+
 class TestConstants(unittest.TestCase):
     """Test defined constants"""
 
@@ -515,19 +1137,1481 @@ class TestTranslationEntry(unittest.TestCase):
         self.assertEqual(entry.source_lang, "English")
         self.assertEqual(entry.target_lang, "Chinese (Simplified)")
 
+    def test_legacy_history_parsed(self):
+        """Test history saved in QSettings by older versions can still be read"""
+        legacy = json.dumps([{"original": "a", "translated": "b", "source_lang": "English",
+                              "target_lang": "French", "timestamp": "2026-04-23T10:00:00"}])
+        self.assertEqual([e.original for e in load_history(legacy)], ["a"])
+        self.assertEqual(load_history("not json"), [])
+
+
+class TestHistoryStore(unittest.TestCase):
+    """Test the SQLite translation history store"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "history.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def entry(self, i):
+        return TranslationEntry.now(f"text {i}", f"texte {i}", "English", "French")
+
+    def test_persists_and_pages_newest_first(self):
+        """Test entries survive reopening and are paged newest first"""
+        store = HistoryStore(self.path)
+        for i in range(25):
+            store.add(self.entry(i))
+        store.close()
+
+        store = HistoryStore(self.path)
+        self.assertEqual(len(store), 25)
+        self.assertEqual([e.original for e in store.recent(3)], ["text 24", "text 23", "text 22"])
+        self.assertEqual([e.original for e in store.recent(2, offset=23)], ["text 1", "text 0"])
+        store.close()
+
+    def test_generation_stats_roundtrip(self):
+        """Test the model and Ollama counters are stored with each entry"""
+        store = HistoryStore(self.path)
+        stats = GenerationStats(prompt_eval_count=120, eval_count=40, eval_duration_ms=800.0, load_duration_ms=5.0)
+        store.add(TranslationEntry.now("hello", "bonjour", "English", "French", "gemma3:1b", stats))
+        store.add(self.entry(1))
+        cached, generated = store.recent(2)
+        self.assertEqual(
+            (generated.model, generated.prompt_eval_count, generated.eval_count, generated.eval_duration_ms),
+            ("gemma3:1b", 120, 40, 800.0),
+        )
+        self.assertEqual((cached.model, cached.eval_count), ("", None))
+        store.close()
+
+    def test_adds_stats_columns_to_old_database(self):
+        """Test a database written before the counter columns existed is upgraded in place"""
+        import sqlite3
+        db = sqlite3.connect(self.path)
+        db.execute(
+            "CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, original TEXT NOT NULL, "
+            "translated TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, "
+            "timestamp TEXT NOT NULL, created REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        db.execute("INSERT INTO history VALUES (1, 'old', 'vieux', 'English', 'French', 't', 0, 8)")
+        db.commit()
+        db.close()
+        store = HistoryStore(self.path, RetentionPolicy(max_entries=None))
+        store.add(TranslationEntry.now("new", "nouveau", "English", "French", "m", GenerationStats(eval_count=3)))
+        new, old = store.recent(2)
+        self.assertEqual((old.original, old.model, old.eval_count), ("old", "", None))
+        self.assertEqual((new.model, new.eval_count), ("m", 3))
+        store.close()
+
+    def test_retention_by_count(self):
+        """Test the count limit keeps only the newest entries"""
+        store = HistoryStore(self.path, RetentionPolicy(max_entries=5))
+        store.add_many([self.entry(i) for i in range(12)])
+        self.assertEqual(len(store), 5)
+        self.assertEqual(store.recent(1)[0].original, "text 11")
+        store.close()
+
+    def test_retention_by_size(self):
+        """Test the size limit drops the oldest entries first"""
+        store = HistoryStore(self.path, RetentionPolicy(max_entries=None, max_bytes=45))
+        store.add_many([self.entry(i) for i in range(10)])
+        self.assertEqual([e.original for e in store.recent(10)], ["text 9", "text 8", "text 7"])
+        store.close()
+
+    def test_retention_by_age(self):
+        """Test the age limit drops old entries on prune"""
+        store = HistoryStore(self.path, RetentionPolicy(max_age_days=1))
+        store.add(self.entry(0))
+        store._db.execute("UPDATE history SET created = created - 2 * 86400")
+        store.add(self.entry(1))
+        self.assertEqual(store.prune(), 1)
+        self.assertEqual([e.original for e in store.recent()], ["text 1"])
+        store.close()
+
+    def test_clear(self):
+        """Test clearing removes every entry"""
+        store = HistoryStore()
+        store.add(self.entry(0))
+        store.clear()
+        self.assertEqual(len(store), 0)
+        store.close()
+
+    def test_search_substrings(self):
+        """Test search matches case-insensitive substrings in either column, newest first"""
+        store = HistoryStore(self.path)
+        store.add(TranslationEntry.now("Good morning", "Bonjour", "English", "French"))
+        store.add(TranslationEntry.now("東京タワーへ行く", "Going to Tokyo Tower", "Japanese", "English"))
+        store.add(TranslationEntry.now("Morning coffee", "Café du matin", "English", "French"))
+        self.assertEqual([e.original for e in store.search("MORNING")], ["Morning coffee", "Good morning"])
+        self.assertEqual([e.translated for e in store.search("onjou")], ["Bonjour"])
+        self.assertEqual([e.original for e in store.search("京タワ")], ["東京タワーへ行く"])
+        self.assertEqual([e.original for e in store.search("morning coffee")], ["Morning coffee"])
+        self.assertEqual(store.search('"quoted'), [])
+        self.assertEqual(len(store.search("")), 3)
+        store.close()
+
+    def test_search_short_terms(self):
+        """Test terms below the index length still filter results"""
+        store = HistoryStore(self.path)
+        store.add(TranslationEntry.now("a cat", "un chat", "English", "French"))
+        store.add(TranslationEntry.now("a dog", "un chien", "English", "French"))
+        store.add(TranslationEntry.now("100% done", "fini", "English", "French"))
+        self.assertEqual([e.original for e in store.search("og")], ["a dog"])
+        self.assertEqual([e.original for e in store.search("un cat")], ["a cat"])
+        self.assertEqual([e.original for e in store.search("%")], ["100% done"])
+        store.close()
+
+    def test_search_index_follows_deletes(self):
+        """Test pruned and cleared entries disappear from search results"""
+        store = HistoryStore(self.path, RetentionPolicy(max_entries=2))
+        store.add_many([self.entry(i) for i in range(4)])
+        self.assertEqual([e.original for e in store.search("text")], ["text 3", "text 2"])
+        store.clear()
+        self.assertEqual(store.search("text"), [])
+        store.close()
+
+    def test_search_index_backfilled(self):
+        """Test a database without the index gets it built on open"""
+        store = HistoryStore(self.path)
+        if not store.has_fts:
+            store.close()
+            self.skipTest("SQLite built without FTS5")
+        store.add_many([self.entry(i) for i in range(3)])
+        store._db.execute("DROP TABLE history_fts")
+        store.close()
+
+        store = HistoryStore(self.path)
+        self.assertEqual([e.original for e in store.search("texte 1")], ["text 1"])
+        store.close()
+
+
+class TestTranslationMemory(unittest.TestCase):
+    """Test fuzzy reuse of earlier translations"""
+
+    def setUp(self):
+        self.memory = TranslationMemory(reuse_threshold=0.75, reference_threshold=0.6)
+        self.memory.add(
+            "Connection 4711 closed by peer 10.0.0.5", "Connexion 4711 fermée par le pair 10.0.0.5",
+            "English", "French"
+        )
+        self.memory.add("Open the file", "Ouvrir le fichier", "English", "French")
+
+    def test_edit_distance(self):
+        """Test token edit distance and its early cut-off"""
+        self.assertEqual(edit_distance(tokenize("a b c d"), tokenize("a x c")), 2)
+        self.assertEqual(edit_distance(tokenize("a b c d"), tokenize("w x y z"), limit=1), 2)
+        self.assertEqual(tokenize("東京 tower!"), ["東", "京", "tower", "!"])
+
+    def test_placeables_substituted(self):
+        """Test matches differing only in IDs are reused with the new IDs"""
+        match = self.memory.lookup("Connection 9999 closed by peer 10.0.0.7", "English", "French")
+        self.assertEqual(match.reused, "Connexion 9999 fermée par le pair 10.0.0.7")
+        self.assertEqual((self.memory.reused, self.memory.referenced, self.memory.lookups), (1, 0, 1))
+
+    def test_changed_word_becomes_reference(self):
+        """Test a changed word that is not copied into the translation is only a reference"""
+        match = self.memory.lookup("Open the folder", "English", "French")
+        self.assertEqual((match.original, match.translated), ("Open the file", "Ouvrir le fichier"))
+        self.assertIsNone(match.reused)
+        self.assertEqual(self.memory.referenced, 1)
+
+    def test_languages_and_threshold(self):
+        """Test other target languages and dissimilar texts do not match"""
+        self.assertIsNone(self.memory.lookup("Open the file", "English", "German"))
+        self.assertIsNotNone(self.memory.lookup("Open the file", "Auto Detect", "French"))
+        self.assertIsNone(self.memory.lookup("Please send the invoice tomorrow", "English", "French"))
+        self.assertEqual(self.memory.lookups, 3)
+        self.assertGreater(self.memory.average_lookup_ms, 0)
+
+    def test_substitute_placeables(self):
+        """Test only one-for-one replacements of tokens present in the translation are substituted"""
+        self.assertEqual(substitute_placeables("Hello Bob", "Bonjour Bob", "Hello Alice"), "Bonjour Alice")
+        self.assertIsNone(substitute_placeables("Hello Bob", "Bonjour Bob", "Hello Bob Smith"))
+        self.assertIsNone(substitute_placeables("3 files", "3 fichiers", "1 file"))
+
+    def test_eviction_and_replacement(self):
+        """Test the oldest entries are forgotten and re-adding a text replaces its translation"""
+        memory = TranslationMemory(max_entries=2)
+        memory.load([TranslationEntry.now(f"message number {i}", f"message {i}", "English", "French")
+                     for i in range(3)])
+        memory.add("message number 2", "message deux", "English", "French")
+        self.assertEqual(len(memory), 2)
+        self.assertEqual(memory.lookup("message number 0", "English", "French").original, "message number 1")
+        self.assertEqual(memory.lookup("message number 2", "English", "French").reused, "message deux")
+
+    def test_clear(self):
+        """Test clearing forgets entries and counters"""
+        self.memory.lookup("Open the file", "English", "French")
+        self.memory.clear()
+        self.assertEqual((len(self.memory), self.memory.lookups), (0, 0))
+        self.assertIsNone(self.memory.lookup("Open the file", "English", "French"))
+
+
+class TestWarmup(unittest.TestCase):
+    """Test keep_alive parsing and cold/warm first-token statistics"""
+
+    def test_keep_alive_seconds(self):
+        """Test numbers and Go durations are parsed, and forever/invalid values give None"""
+        self.assertEqual(keep_alive_seconds("300"), 300)
+        self.assertEqual(keep_alive_seconds("30m"), 1800)
+        self.assertEqual(keep_alive_seconds("1h30m"), 5400)
+        self.assertIsNone(keep_alive_seconds("-1"))
+        self.assertIsNone(keep_alive_seconds("-5m"))
+        self.assertIsNone(keep_alive_seconds("soon"))
+
+    def test_keep_warm_interval(self):
+        """Test pings are scheduled before keep_alive expires, but not for forever or zero"""
+        self.assertEqual(keep_warm_interval("30m"), 1440)
+        self.assertEqual(keep_warm_interval("10s"), 30)
+        self.assertIsNone(keep_warm_interval("0"))
+        self.assertIsNone(keep_warm_interval("-1"))
+
+    def test_first_token_stats(self):
+        """Test generations that loaded the model are counted as cold"""
+        stats = FirstTokenStats()
+        self.assertEqual(stats.summary(), "no translations yet")
+        self.assertEqual(stats.record(4000, 3500), "cold")
+        self.assertEqual(stats.record(100, 0), "warm")
+        stats.record(300, 1)
+        self.assertEqual(stats.average_ms("warm"), 200)
+        self.assertEqual(stats.summary(), "warm 200 ms (2), cold 4000 ms (1)")
+
+
+class TestProgressThrottle(unittest.TestCase):
+    """Test rate limiting of progress callbacks"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.delivered = []
+        self.throttle = ProgressThrottle(lambda p, m: self.delivered.append((p, m)), 10, clock=lambda: self.now)
+
+    def test_coalesces_within_interval(self):
+        """Test updates within 100 ms of a delivery are coalesced into the newest"""
+        self.throttle(0.1, "a")
+        self.now = 0.05
+        self.throttle(0.2, "b")
+        self.throttle(0.3, "c")
+        self.assertEqual(self.delivered, [(0.1, "a")])
+        self.throttle.flush()
+        self.assertEqual(self.delivered, [(0.1, "a"), (0.3, "c")])
+        self.assertEqual((self.throttle.delivered, self.throttle.dropped), (2, 1))
+
+    def test_delivers_when_due_and_final(self):
+        """Test a due update and the final update are always delivered"""
+        self.throttle(0.1, "a")
+        self.now = 0.1
+        self.assertTrue(self.throttle.ready())
+        self.throttle(0.5, "b")
+        self.now = 0.11
+        self.assertFalse(self.throttle.ready())
+        self.throttle(0.9, "c")
+        self.throttle(1.0, "Done!")
+        self.throttle(0.6, "chunk", force=True)
+        self.assertEqual([m for _, m in self.delivered], ["a", "b", "Done!", "chunk"])
+
+    def test_unlimited(self):
+        """Test max_hz 0 passes every update"""
+        throttle = ProgressThrottle(lambda p, m: self.delivered.append(p), 0, clock=lambda: 0.0)
+        for i in range(5):
+            throttle(i / 10, "x")
+        self.assertEqual(len(self.delivered), 5)
+
+
+class TestAdmission(unittest.TestCase):
+    """Test size-aware admission of texts to translate"""
+
+    def test_estimate_tokens(self):
+        """Test four ASCII characters count as a token and other characters as one each"""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("a" * 400), 100)
+        self.assertEqual(estimate_tokens("东京都" * 10), 30)
+        self.assertEqual(estimate_tokens("café"), 2)
+
+    def test_parse_context_length(self):
+        """Test num_ctx wins, the trained length caps the default, and missing info is None"""
+        self.assertEqual(parse_context_length({"parameters": 'stop "x"\nnum_ctx 32768'}), 32768)
+        self.assertEqual(parse_context_length({"model_info": {"llama.context_length": 131072}}), 4096)
+        self.assertEqual(parse_context_length({"model_info": {"llama.context_length": 2048}}), 2048)
+        self.assertIsNone(parse_context_length({"parameters": "", "model_info": {}}))
+
+    def test_decisions(self):
+        """Test texts are rejected, deferred, chunked or accepted by size"""
+        policy = AdmissionPolicy(max_chars=100_000, confirm_chars=20_000, context_tokens=4096)
+        self.assertEqual(admit("word " * 100, policy).decision, ACCEPT)
+        chunked = admit("word " * 2000, policy)
+        self.assertEqual(chunked.decision, CHUNK)
+        self.assertEqual(chunked.tokens, 2500)
+        # (4096 - 256) / 2.5 tokens of four characters each.
+        self.assertEqual(chunked.chunk_chars, 6144)
+        self.assertIn("4,096 token context", chunked.reason)
+        deferred = admit("word " * 5000, policy)
+        self.assertEqual((deferred.decision, deferred.chunk_chars), (DEFER, 6144))
+        self.assertEqual(deferred.describe(), "25,000 chars, ~6,250 tokens")
+        self.assertEqual(admit("x" * 100_001, policy).decision, REJECT)
+
+    def test_unlimited_and_unknown_context(self):
+        """Test 0 disables the character limits and an unknown context never chunks"""
+        policy = AdmissionPolicy(max_chars=0, confirm_chars=0, context_tokens=None)
+        self.assertEqual(admit("x" * 1_000_000, policy).decision, ACCEPT)
+
+    def test_cjk_chunks_smaller(self):
+        """Test texts of many tokens per character get proportionally smaller chunks"""
+        policy = AdmissionPolicy(context_tokens=4096)
+        admission = admit("东京" * 3000, policy)
+        self.assertEqual(admission.decision, CHUNK)
+        self.assertEqual(admission.chunk_chars, 1536)
+
+
+class SignalStorm:
+    """Replays clipboard events against a ClipboardGate the way the tray app delivers them.
+
+    Change signals restart a debounce timer and the clipboard is read when it
+    expires; polls read it straight away. Time is simulated in milliseconds.
+    """
+
+    def __init__(self, debounce_ms=100):
+        self.now = 0
+        self.debounce_ms = debounce_ms
+        self.gate = ClipboardGate(clock=lambda: self.now / 1000)
+        self.clipboard = ""
+        self.handled = []
+        self.due = None
+
+    def signal(self):
+        self.due = self.now + self.debounce_ms
+
+    def poll(self):
+        self.ingest()
+
+    def ingest(self):
+        if self.gate.check(self.clipboard) is None:
+            self.handled.append(self.clipboard)
+
+    def advance(self, ms):
+        end = self.now + ms
+        if self.due is not None and self.due <= end:
+            self.now, self.due = self.due, None
+            self.ingest()
+        self.now = end
+
+    def copy(self, text, signals=1):
+        """A user copy: the content changes and is announced by a burst of signals"""
+        self.clipboard = text
+        for _ in range(signals):
+            self.signal()
+            self.advance(1)
+
+    def write(self, text):
+        """TransPaste writing a translation back, with the macOS re-writes 50 and 150 ms later"""
+        self.gate.mark_written(text)
+        self.clipboard = text
+        self.signal()
+        for delay in (50, 100):
+            self.advance(delay)
+            if self.gate.is_current(text):
+                self.clipboard = text
+                self.signal()
+
+
+class TestClipboardIngestion(unittest.TestCase):
+    """Test clipboard events are deduplicated and debounced"""
+
+    def test_storm_handled_once(self):
+        """Test a copy reported by many signals and polls is handled exactly once"""
+        storm = SignalStorm()
+        storm.copy("Bonjour le monde", signals=25)
+        for _ in range(10):
+            storm.poll()
+            storm.signal()
+            storm.advance(30)
+        storm.advance(500)
+        self.assertEqual(storm.handled, ["Bonjour le monde"])
+        self.assertEqual(storm.gate.accepted, 1)
+
+    def test_random_storms(self):
+        """Test randomly interleaved signals and polls handle each copy once and no own write at all"""
+        import random
+        for seed in range(20):
+            rng = random.Random(seed)
+            storm = SignalStorm(debounce_ms=rng.choice([0, 50, 100]))
+            copies = [f"text {seed} {i}" for i in range(10)]
+            for text in copies:
+                storm.copy(text, signals=rng.randint(1, 8))
+                for _ in range(rng.randint(0, 20)):
+                    rng.choice([storm.signal, storm.poll])()
+                    storm.advance(rng.randint(0, 40))
+                storm.advance(200)
+                storm.write(text.upper())
+                storm.advance(rng.randint(0, 3000))
+                storm.poll()
+            self.assertEqual(storm.handled, copies, f"seed {seed}")
+
+    def test_own_write_ignored_after_user_copies_over_it(self):
+        """Test a delayed re-write of our translation is not taken for a new copy"""
+        storm = SignalStorm()
+        storm.gate.mark_written("Hello world")
+        storm.clipboard = "Hallo Welt"
+        storm.poll()
+        storm.clipboard = "Hello world"
+        storm.poll()
+        self.assertEqual(storm.handled, ["Hallo Welt"])
+        self.assertEqual(storm.gate.suppressed[REASON_SELF_WRITTEN], 1)
+
+    def test_recent_expire(self):
+        """Test a content seen recently is suppressed, but accepted again after the window"""
+        now = [0.0]
+        gate = ClipboardGate(window=2.0, clock=lambda: now[0])
+        self.assertIsNone(gate.check("a"))
+        self.assertIsNone(gate.check("b"))
+        self.assertEqual(gate.check("a"), REASON_SEEN)
+        self.assertEqual(gate.check("a"), REASON_UNCHANGED)
+        self.assertEqual(gate.check("  \n"), REASON_EMPTY)
+        now[0] = 5.0
+        self.assertIsNone(gate.check("b"))
+        self.assertIsNone(gate.check("a"))
+
+    def test_bounded(self):
+        """Test at most max_entries hashes are remembered"""
+        gate = ClipboardGate(max_entries=3, clock=lambda: 0.0)
+        for i in range(10):
+            gate.check(str(i))
+        self.assertEqual(len(gate._recent), 3)
+        self.assertIsNone(gate.check("0"))
+
+
+class TestStreamDecoding(unittest.TestCase):
+    """Test incremental NDJSON decoding and token accumulation"""
+
+    def test_lines_split_across_chunks(self):
+        """Test objects are decoded whatever the chunk boundaries, including inside a character"""
+        raw = (json.dumps({"response": "héllo"}, ensure_ascii=False) + "\n\n" + json.dumps({"done": True})).encode()
+        backends = ["json"] + (["orjson"] if core_stream.orjson is not None else [])
+        for backend in backends:
+            for size in (1, 2, 3, 7, len(raw)):
+                chunks = [raw[i : i + size] for i in range(0, len(raw), size)]
+                objects = list(iter_ndjson(chunks, NDJSONDecoder(backend)))
+                self.assertEqual(objects, [{"response": "héllo"}, {"done": True}], (backend, size))
+
+    def test_unknown_backend(self):
+        """Test asking for a JSON backend that does not exist fails early"""
+        with self.assertRaises(ValueError):
+            NDJSONDecoder("simdjson")
+
+    def test_malformed_lines_skipped(self):
+        """Test lines that are not JSON objects are skipped and counted"""
+        decoder = NDJSONDecoder("json")
+        stream = [b'{"response": "a"}\nnot json\n[1, 2]\n{"response": "a"} trailing\n {"response": "b"}\n']
+        objects = list(iter_ndjson(stream, decoder))
+        self.assertEqual([o["response"] for o in objects], ["a", "b"])
+        self.assertEqual(decoder.skipped, 3)
+
+    def test_feed_keeps_unfinished_line(self):
+        """Test a line is only decoded once its newline arrives"""
+        decoder = NDJSONDecoder()
+        self.assertEqual(list(decoder.feed(b'{"response": ')), [])
+        self.assertEqual(list(decoder.feed(b'"x"}\n{"resp')), [{"response": "x"}])
+        self.assertEqual(list(decoder.close()), [])
+        self.assertEqual(decoder.skipped, 1)
+
+    def test_token_buffer(self):
+        """Test the buffer joins tokens lazily and reads its tail without joining"""
+        buffer = TokenBuffer()
+        self.assertEqual((buffer.text(), buffer.tail(5), len(buffer)), ("", "", 0))
+        for token in ("Bon", "", "jour", " le", " monde"):
+            buffer.append(token)
+        self.assertEqual(len(buffer), 16)
+        self.assertEqual(buffer.tail(8), "le monde")
+        self.assertEqual(buffer.tail(100), "Bonjour le monde")
+        self.assertEqual(buffer.text(), "Bonjour le monde")
+        buffer.append("!")
+        self.assertEqual((buffer.text(), buffer.tail(2)), ("Bonjour le monde!", "e!"))
+
+
+# (raw output, original, expected) per cleaner; each case runs through that cleaner
+# alone and through post_process() with the cleaner enabled.
+POST_PROCESS_CORPUS = {
+    "thinking": [
+        ("<think>Translate to French.</think>\nBonjour", "Hello", "Bonjour"),
+        ("<THINKING>a\nb</THINKING><reasoning>c</reasoning> Salut", "Hi", "Salut"),
+        ("Bonjour <think>kept</think>", "Hello", "Bonjour <think>kept</think>"),
+        ("<think>never closed", "Hello", "<think>never closed"),
+    ],
+    "prefixes": [
+        ("Here is the translation: Hello", "x", "Hello"),
+        ("Here's the translation into French:\nBonjour", "x", "Bonjour"),
+        ("Sure, here is the translation: Test", "x", "Test"),
+        ("TRANSLATION: World", "x", "World"),
+        ("Translated text:   Hola", "x", "Hola"),
+        ("Sure, here is the translation: Translation: Ciao", "x", "Ciao"),
+        ("The translation: is fine", "x", "The translation: is fine"),
+        ("Hello\nTranslation: kept", "x", "Hello\nTranslation: kept"),
+    ],
+    "code_fence": [
+        ("```text\nHello World\n```", "x", "Hello World"),
+        ("```markdown\nTest translation\n```", "x", "Test translation"),
+        ("```\nSimple translation\n```", "x", "Simple translation"),
+        # Other language tags are not recognised and end up in the text, as they always have.
+        ("```python\nprint(1)\n```", "x", "python\nprint(1)"),
+        ("Use ```code``` here", "x", "Use ```code``` here"),
+    ],
+    "quotes": [
+        ('"translated"', "unquoted text", "translated"),
+        ("'translated'", "unquoted text", "translated"),
+        ('"translated"', '"quoted text"', '"translated"'),
+        ('"translated"', "  'quoted text'  ", '"translated"'),
+        ('"half', "unquoted", '"half'),
+    ],
+    "trailing_note": [
+        ("Bonjour le monde.\n\nNote: 'monde' means world.", "Hello world.", "Bonjour le monde."),
+        ("Hallo.\n(Translator's note: informal)", "Hi.", "Hallo."),
+        ("Hola.\nNotes: none", "Hi.", "Hola."),
+        ("Hallo.\nNote: Bring ID.", "Hi.\nNote: Bring ID.", "Hallo.\nNote: Bring ID."),
+        ("Note: first line stays", "Note: keep", "Note: first line stays"),
+    ],
+}
+
+
+class TestPostProcess(unittest.TestCase):
+    """Test the post-processing cleaner pipeline"""
+
+    def test_corpus(self):
+        """Test every cleaner against its corpus, alone and in the pipeline"""
+        cleaners = {cleaner.name: cleaner for cleaner in pipeline(cleaner_names())}
+        for name, cases in POST_PROCESS_CORPUS.items():
+            for raw, original, expected in cases:
+                with self.subTest(cleaner=name, raw=raw):
+                    self.assertEqual(cleaners[name].clean(raw, original).strip(), expected)
+                    self.assertEqual(post_process(raw, original, [name]), expected)
+
+    def test_corpus_covers_builtin_cleaners(self):
+        """Test every built-in cleaner has corpus cases"""
+        self.assertEqual(set(POST_PROCESS_CORPUS), set(cleaner_names()) - {"custom_test"})
+
+    def test_default_pipeline(self):
+        """Test the defaults run in order and optional cleaners only when named"""
+        self.assertEqual([c.name for c in pipeline()], list(DEFAULT_CLEANERS))
+        raw = '<think>x</think> Translation: ```text\n"Bonjour"\n```'
+        self.assertEqual(post_process(raw, "Hello"), raw)
+        self.assertEqual(post_process(raw, "Hello", ["thinking"]), "Bonjour")
+        self.assertEqual(post_process("  Translation:  \n ", "x"), "")
+
+    def test_register_cleaner(self):
+        """Test a user cleaner runs at its position and names are checked"""
+        register_cleaner("custom_test", lambda text, original: text.replace("Translation:", "!"), order=15)
+        self.addCleanup(register_cleaner, "custom_test", lambda text, original: text, replace=True)
+        self.assertEqual([c.name for c in pipeline(["custom_test"])][0], "custom_test")
+        self.assertEqual(post_process("Translation: x", "y", ["custom_test"]), "! x")
+        with self.assertRaises(ValueError):
+            register_cleaner("custom_test", lambda text, original: text)
+        with self.assertRaises(ValueError):
+            post_process("x", "y", ["no_such_cleaner"])
+
+
+class TestLanguageDetection(unittest.TestCase):
+    """Test offline language identification and the untranslatable-text pre-filter"""
+
+    def test_latin_languages(self):
+        """Test Latin-script languages are told apart from common-word trigrams"""
+        samples = {
+            "English": "Please restart the service after updating the configuration file.",
+            "French": "Veuillez redémarrer le service après la mise à jour du fichier.",
+            "German": "Bitte starten Sie den Dienst nach dem Aktualisieren der Datei neu.",
+            "Spanish": "¿Puedes enviarme el informe antes del viernes por la tarde?",
+            "Italian": "Riavvia il servizio dopo aver aggiornato il file di configurazione.",
+            "Portuguese": "Você pode me enviar o relatório até sexta-feira à tarde?",
+            "Vietnamese": "Cuộc họp đã được dời sang chiều thứ Năm.",
+        }
+        for language, text in samples.items():
+            detection = detect_language(text)
+            self.assertEqual((detection.language, detection.script), (language, "Latin"), text)
+            self.assertTrue(detection.confident, text)
+
+    def test_scripts(self):
+        """Test languages with their own script are identified by it"""
+        samples = {
+            "Chinese (Simplified)": "请在更新配置文件后重新启动服务。",
+            "Chinese (Traditional)": "請在更新設定檔後重新啟動服務。",
+            "Japanese": "会議は木曜日の午後に変更されました。",
+            "Korean": "회의가 목요일 오후로 변경되었습니다.",
+            "Russian": "Встреча перенесена на вечер четверга.",
+            "Arabic": "تم نقل الاجتماع إلى بعد ظهر يوم الخميس.",
+            "Hindi": "बैठक गुरुवार दोपहर तक स्थगित कर दी गई है।",
+            "Thai": "การประชุมถูกเลื่อนไปเป็นบ่ายวันพฤหัสบดี",
+        }
+        for language, text in samples.items():
+            detection = detect_language(text)
+            self.assertEqual(detection.language, language, text)
+            self.assertTrue(detection.confident, text)
+
+    def test_unsure_detections_not_confident(self):
+        """Test short, mixed or ambiguous texts are not acted on"""
+        for text in ("Hello", "OK", "東京都港区", "Hello 你好 Привет مرحبا", "12345"):
+            self.assertFalse(detect_language(text).confident, text)
+
+    def test_skip_reasons(self):
+        """Test untranslatable texts are recognised and prose is not"""
+        cases = [
+            ("  12,345.67 ", REASON_NO_LETTERS),
+            ("2026-10-17 13:52", REASON_NO_LETTERS),
+            ("https://example.com/a?b=1", REASON_URL),
+            ("www.example.org", REASON_URL),
+            ("user.name+tag@example.co.uk", REASON_EMAIL),
+            ("/usr/local/bin/python3", REASON_PATH),
+            ("C:\\Program Files\\App\\app.exe", REASON_PATH),
+            ("src/transpaste/main.py", REASON_PATH),
+            ("x = foo(bar);\ny = x + 1;", REASON_CODE),
+            ("def f(x):\n    return x + 1\n", REASON_CODE),
+            ("for (int i = 0; i < n; i++) {\n  sum += i;\n}", REASON_CODE),
+            ("The meeting has been moved to Thursday afternoon.", REASON_TARGET_LANGUAGE),
+            ("La réunion a été déplacée à jeudi après-midi.", None),
+            ("Hello", None),
+            ("if you go there, call me (maybe) tomorrow", REASON_TARGET_LANGUAGE),
+            ("and/or", None),
+            ("Please read the notes at https://example.com before the meeting", REASON_TARGET_LANGUAGE),
+        ]
+        for text, reason in cases:
+            self.assertEqual(skip_reason(text, "English"), reason, text)
+
+    def test_prose_not_skipped(self):
+        """Test prose with slashes or a lone operator is translated rather than taken for a path or code"""
+        for text in (
+            "he/she/they",
+            "input/output/error",
+            "Use a == b to compare.",
+            "x = foo(bar);",
+            "Compare with a == b.\nThen return the result to the caller.",
+        ):
+            self.assertIsNone(skip_reason(text, "French"), text)
+
+    def test_target_language_only_skipped_with_auto_source(self):
+        """Test an explicit source language disables the target-language check only"""
+        text = "The meeting has been moved to Thursday afternoon."
+        self.assertIsNone(skip_reason(text, "English", "English"))
+        self.assertIsNone(skip_reason(text, "French"))
+        self.assertEqual(skip_reason("https://example.com", "French", "English"), REASON_URL)
+
+
+class TestProgress(unittest.TestCase):
+    """Test Ollama generation counters and the learned length ratios"""
+
+    def test_from_done(self):
+        """Test nanosecond durations become milliseconds and missing counters stay None"""
+        stats = GenerationStats.from_done(
+            {"done": True, "eval_count": 100, "eval_duration": 2_000_000_000, "prompt_eval_count": 30}
+        )
+        self.assertEqual((stats.eval_count, stats.eval_duration_ms, stats.prompt_eval_count), (100, 2000.0, 30))
+        self.assertIsNone(stats.load_duration_ms)
+        self.assertEqual(stats.tokens_per_second, 50)
+        self.assertIsNone(GenerationStats.from_done({"done": True}).tokens_per_second)
+        self.assertEqual(GenerationStats().describe(), "no counters reported")
+
+    def test_merge(self):
+        """Test chunk counters add up and the longest model load wins"""
+        a = GenerationStats(10, 20, 400.0, 3000.0)
+        b = GenerationStats(None, 30, 600.0, 2.0)
+        merged = a.merge(b)
+        self.assertEqual(merged, GenerationStats(10, 50, 1000.0, 3000.0))
+        self.assertEqual(merged.tokens_per_second, 50)
+
+    def test_estimator_fallbacks(self):
+        """Test ratios fall back from model to language pair to the default"""
+        estimator = ProgressEstimator()
+        self.assertEqual(estimator.ratio("m", "English", "French"), 1.5)
+        estimator.learn("other", "English", "French", "a" * 100, "b" * 120)
+        self.assertAlmostEqual(estimator.ratio("m", "English", "French"), 1.2)
+        estimator.learn("m", "English", "French", "a" * 100, "b" * 80)
+        self.assertAlmostEqual(estimator.ratio("m", "English", "French"), 0.8)
+        estimator.learn("m", "English", "French", "short", "b" * 500)
+        self.assertAlmostEqual(estimator.ratio("m", "English", "French"), 0.8)
+        self.assertEqual(estimator.expected_chars("a" * 10, "m", "English", "French"), 20)
+
+    def test_estimator_load(self):
+        """Test ratios are learned from history, newest entries weighted most"""
+        estimator = ProgressEstimator()
+        estimator.load([
+            TranslationEntry.now("a" * 100, "b" * 50, "English", "Japanese"),
+            TranslationEntry.now("a" * 100, "b" * 50, "English", "Japanese"),
+        ])
+        self.assertAlmostEqual(estimator.ratio("any", "English", "Japanese"), 0.5)
+
+
+class TestMetrics(unittest.TestCase):
+    """Test rolling per-stage histograms and their export formats"""
+
+    def test_rolling_window(self):
+        """Test quantiles cover only the window while count and sum cover everything"""
+        histogram = RollingHistogram(window=100)
+        self.assertIsNone(histogram.quantile(0.5))
+        for value in range(1, 201):
+            histogram.observe(value)
+        self.assertEqual(histogram.quantile(0.5), 150)
+        self.assertEqual(histogram.quantile(0.95), 195)
+        self.assertEqual(histogram.count, 200)
+        self.assertEqual(histogram.total, sum(range(1, 201)))
+
+    def test_summaries(self):
+        """Test durations are reported in ms, rates as is, in pipeline order"""
+        metrics = MetricsStore()
+        for ms in range(1, 101):
+            metrics.observe("connect", ms / 1000, "m", "http://a")
+        metrics.observe("tokens_per_second", 42.0, "m", "http://a")
+        metrics.observe("clipboard_write", 0.002)
+        with metrics.timer("prompt_build", "m"):
+            pass
+        rows = metrics.summaries()
+        self.assertEqual(
+            [row.stage for row in rows], ["prompt_build", "connect", "tokens_per_second", "clipboard_write"]
+        )
+        connect = rows[1]
+        self.assertEqual((connect.count, connect.unit), (100, "ms"))
+        self.assertAlmostEqual(connect.p50, 50)
+        self.assertAlmostEqual(connect.p95, 95)
+        self.assertEqual((rows[2].p50, rows[2].unit), (42.0, "tokens/s"))
+        self.assertEqual(json.loads(metrics.to_json())["metrics"][1]["endpoint"], "http://a")
+
+    def test_prometheus_format(self):
+        """Test the export is a valid summary with escaped labels"""
+        metrics = MetricsStore()
+        metrics.observe("connect", 0.25, 'we"ird', "http://a")
+        metrics.observe("tokens_per_second", 30.0, "m", "http://a")
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE transpaste_stage_seconds summary", text)
+        self.assertIn(
+            'transpaste_stage_seconds{stage="connect",model="we\\"ird",endpoint="http://a",quantile="0.95"} 0.25',
+            text,
+        )
+        self.assertIn('transpaste_stage_seconds_count{stage="connect",model="we\\"ird",endpoint="http://a"} 1', text)
+        self.assertIn('transpaste_tokens_per_second_sum{model="m",endpoint="http://a"} 30', text)
+        self.assertEqual(MetricsStore().to_prometheus(), "\n")
+
+    def test_server(self):
+        """Test the local endpoint serves both formats"""
+        metrics = MetricsStore()
+        metrics.observe("connect", 0.1, "m", "http://a")
+        server = MetricsServer(metrics, 0)
+        try:
+            response = requests.get(server.url, timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("transpaste_stage_seconds_count", response.text)
+            self.assertEqual(requests.get(server.url + ".json", timeout=5).json()["metrics"][0]["count"], 1)
+            self.assertEqual(requests.get(server.url + "/nope", timeout=5).status_code, 404)
+        finally:
+            server.close()
+
+
+class TestSegmenter(unittest.TestCase):
+    """Test text segmentation for chunked translation"""
+
+    SAMPLE = (
+        "First paragraph. It has two sentences.\n\n"
+        "Second paragraph is a bit longer than the first one! Really?\n\n"
+        "```python\nprint('hello')\n\nx = 1\n```\n"
+        "中文句子。另一个句子！最后。"
+    )
+
+    def test_roundtrip(self):
+        """Test concatenated segments reproduce the input exactly"""
+        for max_chars in [1, 10, 40, 1000]:
+            for preserve_code in [False, True]:
+                segments = split_text(self.SAMPLE, max_chars, preserve_code=preserve_code)
+                self.assertEqual("".join(seg.text for seg in segments), self.SAMPLE)
+
+    def test_short_text_single_segment(self):
+        """Test text below the limit is not split"""
+        self.assertEqual(split_text("Hello world", 100), [Segment("Hello world")])
+
+    def test_respects_max_chars(self):
+        """Test prose segments stay within the size limit"""
+        for seg in split_text(self.SAMPLE, 40):
+            self.assertLessEqual(len(seg.text), 40)
+
+    def test_splits_on_paragraphs(self):
+        """Test paragraphs are kept whole when they fit"""
+        segments = split_text(self.SAMPLE, 70)
+        self.assertEqual(segments[0].text, "First paragraph. It has two sentences.\n\n")
+
+    def test_code_block_preserved(self):
+        """Test code-aware mode keeps fenced blocks whole and untranslated"""
+        segments = split_text(self.SAMPLE, 20, preserve_code=True)
+        code = [seg for seg in segments if not seg.translate]
+        self.assertEqual(len(code), 1)
+        self.assertEqual(code[0].text, "```python\nprint('hello')\n\nx = 1\n```\n")
+
+    def test_sentence_prefix_end(self):
+        """Test the complete-sentence prefix stops before unfinished text"""
+        self.assertEqual(sentence_prefix_end("No boundary yet"), 0)
+        self.assertEqual(sentence_prefix_end("Pi is 3.14 and"), 0)
+        text = "One. Two! Thr"
+        self.assertEqual(text[:sentence_prefix_end(text)], "One. Two!")
+        text = "第一句。第二"
+        self.assertEqual(text[:sentence_prefix_end(text)], "第一句。")
+
+    def test_join_keeps_spacing(self):
+        """Test reassembly keeps original whitespace and code"""
+        segments = split_text(self.SAMPLE, 70, preserve_code=True)
+        translations = [f" T{i} " for i in range(len(segments))]
+        joined = join_segments(segments, translations)
+        self.assertTrue(joined.startswith("T0\n\n"))
+        self.assertIn("```python\nprint('hello')\n\nx = 1\n```\n", joined)
+
+
+class TestTranslationCache(unittest.TestCase):
+    """Test the content-addressed translation cache"""
+
+    def setUp(self):
+        self.config = {
+            "source_lang": "English",
+            "target_lang": "French",
+            "model": "test-model:latest",
+            "style": "Default",
+            "length": "Unlimited",
+            "temperature": 0.3,
+        }
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_depends_on_settings(self):
+        """Test every prompt-affecting setting changes the key"""
+        base = TranslationCache.make_key("Hello", self.config)
+        self.assertEqual(base, TranslationCache.make_key("Hello", dict(self.config)))
+        self.assertNotEqual(base, TranslationCache.make_key("Hello!", self.config))
+        for field, value in [
+            ("model", "other"),
+            ("source_lang", "German"),
+            ("target_lang", "Spanish"),
+            ("style", "Formal"),
+            ("length", "Brief"),
+            ("temperature", 0.7),
+            ("api", API_GENERATE),
+        ]:
+            self.assertNotEqual(base, TranslationCache.make_key("Hello", {**self.config, field: value}))
+        self.assertEqual(base, TranslationCache.make_key("Hello", {**self.config, "api": DEFAULT_API}))
+
+    def test_key_depends_on_cleaners(self):
+        """Test extra cleaners change the key and an empty list keeps the old one"""
+        base = TranslationCache.make_key("Hello", self.config)
+        self.assertEqual(base, TranslationCache.make_key("Hello", {**self.config, "cleaners": []}))
+        self.assertNotEqual(base, TranslationCache.make_key("Hello", {**self.config, "cleaners": ["thinking"]}))
+
+    def test_key_ignores_transport_settings(self):
+        """Test base URL and proxies do not affect the key"""
+        base = TranslationCache.make_key("Hello", self.config)
+        config = {**self.config, "base_url": "http://other:11434", "proxies": {"http": "x"}}
+        self.assertEqual(base, TranslationCache.make_key("Hello", config))
+
+    def test_hit_and_miss_counters(self):
+        """Test lookups update hit/miss counters"""
+        cache = TranslationCache()
+        key = TranslationCache.make_key("Hello", self.config)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "Bonjour")
+        self.assertEqual(cache.get(key), "Bonjour")
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted from memory"""
+        cache = TranslationCache(max_memory_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertEqual(cache.get("a"), "A")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "C")
+
+    def test_persists_to_disk(self):
+        """Test entries survive reopening and memory eviction"""
+        cache = TranslationCache(self.path, max_memory_entries=1)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        self.assertEqual(cache.get("a"), "A")
+        cache.close()
+
+        reopened = TranslationCache(self.path)
+        self.assertEqual(reopened.get("b"), "B")
+        self.assertEqual(len(reopened), 2)
+        reopened.close()
+
+    def test_clear(self):
+        """Test clearing removes memory and disk entries"""
+        cache = TranslationCache(self.path)
+        cache.put("a", "A")
+        cache.clear()
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+        cache.close()
+
+
+class CountingOllamaHandler(MockOllamaHandler):
+    """Mock server that records how many generations run at the same time"""
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def do_POST(self):
+        cls = CountingOllamaHandler
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            super().do_POST()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+class TestPrefetcher(unittest.TestCase):
+    """Test speculative translation into secondary target languages"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('localhost', 0), CountingOllamaHandler)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        MockOllamaHandler.should_fail = False
+        MockOllamaHandler.response_text = "Hola"
+        MockOllamaHandler.delay = 0.0
+        CountingOllamaHandler.max_in_flight = 0
+        self.cache = TranslationCache()
+        self.config = {
+            "source_lang": "English",
+            "target_lang": "French",
+            "model": "test-model:latest",
+            "style": "Default",
+            "length": "Unlimited",
+            "temperature": 0.3,
+            "base_url": f"http://localhost:{self.server.server_address[1]}",
+            "chunk_size": 0,
+        }
+        self.prefetcher = Prefetcher(self.cache, max_workers=1)
+
+    def tearDown(self):
+        self.prefetcher.close()
+        MockOllamaHandler.response_text = "This is a test translation."
+        MockOllamaHandler.delay = 0.0
+
+    def wait_until(self, condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("timed out")
+            time.sleep(0.01)
+
+    def key(self, target):
+        return TranslationCache.make_key("Hello", dict(self.config, target_lang=target))
+
+    def test_fills_cache_for_other_targets(self):
+        """Test secondary targets are cached under the keys a re-copy would use, one at a time"""
+        config = dict(self.config, reference=("Hi", "Salut"))
+        queued = self.prefetcher.submit("Hello", config, ["French", "Spanish", "German", "Italian"])
+        self.assertEqual(queued, 3)
+        self.wait_until(lambda: self.prefetcher.completed == 3)
+        for target in ("Spanish", "German", "Italian"):
+            self.assertEqual(self.cache.get(self.key(target)), "Hola")
+        self.assertFalse(self.cache.contains(self.key("French")))
+        self.assertEqual(CountingOllamaHandler.max_in_flight, 1)
+        self.assertNotIn("REFERENCE", MockOllamaHandler.last_prompt)
+        self.assertNotIn("Salut", MockOllamaHandler.last_prompt)
+        # Already cached: nothing to do.
+        self.assertEqual(self.prefetcher.submit("Hello", self.config, ["Spanish"]), 0)
+
+    def test_pause_preempts_and_resume_restarts(self):
+        """Test pause() cancels running work for the foreground and resume() finishes it"""
+        MockOllamaHandler.delay = 0.05
+        self.prefetcher.submit("Hello", self.config, ["Spanish"])
+        self.wait_until(lambda: CountingOllamaHandler.in_flight == 1)
+        self.prefetcher.pause()
+        self.wait_until(lambda: self.prefetcher.preempted == 1)
+        time.sleep(0.1)
+        self.assertEqual(self.prefetcher.completed, 0)
+        self.assertEqual(self.prefetcher.pending(), 1)
+        MockOllamaHandler.delay = 0.0
+        self.prefetcher.resume()
+        self.wait_until(lambda: self.prefetcher.completed == 1)
+        self.assertEqual(self.cache.get(self.key("Spanish")), "Hola")
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test the pending translation job queue"""
+
+    def setUp(self):
+        self.config = {"target_lang": "French"}
+
+    def test_latest_wins(self):
+        """Test a newer copy supersedes a queued job"""
+        queue = JobQueue(coalesce=True)
+        self.assertIsNone(queue.push(TranslationJob("first", self.config)))
+        removed = queue.push(TranslationJob("second", self.config))
+        self.assertEqual(removed.text, "first")
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.pop().text, "second")
+        self.assertEqual(queue.superseded, 1)
+
+    def test_fifo_without_coalescing(self):
+        """Test jobs run in copy order when coalescing is off"""
+        queue = JobQueue(max_size=3, coalesce=False)
+        for text in ["a", "b", "c"]:
+            self.assertIsNone(queue.push(TranslationJob(text, self.config)))
+        self.assertEqual([queue.pop().text for _ in range(3)], ["a", "b", "c"])
+        self.assertIsNone(queue.pop())
+
+    def test_bounded(self):
+        """Test the oldest job is evicted and counted when the queue is full"""
+        queue = JobQueue(max_size=2, coalesce=False)
+        queue.push(TranslationJob("a", self.config))
+        queue.push(TranslationJob("b", self.config))
+        removed = queue.push(TranslationJob("c", self.config))
+        self.assertEqual(removed.text, "a")
+        self.assertEqual(queue.dropped, 1)
+        self.assertEqual(len(queue), 2)
+
+    def test_duplicate_not_queued_twice(self):
+        """Test copying the same text twice queues it once"""
+        queue = JobQueue(coalesce=False)
+        queue.push(TranslationJob("a", self.config))
+        queue.push(TranslationJob("a", self.config))
+        self.assertEqual(len(queue), 1)
+
+    def test_wait_time_and_clear(self):
+        """Test wait time reporting and clearing"""
+        queue = JobQueue(coalesce=False)
+        self.assertEqual(queue.oldest_wait(), 0.0)
+        queue.push(TranslationJob("a", self.config, enqueued_at=time.monotonic() - 2))
+        queue.push(TranslationJob("b", self.config))
+        self.assertGreaterEqual(queue.oldest_wait(), 2)
+        self.assertEqual(queue.clear(), 2)
+        self.assertEqual(len(queue), 0)
+
+
+class TestBackoff(unittest.TestCase):
+    """Test adaptive polling intervals"""
+
+    def test_grows_to_cap_and_resets(self):
+        """Test idle polls double the interval up to the cap and activity resets it"""
+        backoff = Backoff(initial=500, maximum=4000)
+        self.assertEqual([backoff.grow() for _ in range(5)], [1000, 2000, 4000, 4000, 4000])
+        self.assertEqual(backoff.reset(), 500)
+        self.assertEqual(backoff.interval, 500)
+
+    def test_maximum_not_below_initial(self):
+        """Test a maximum smaller than the initial interval is raised to it"""
+        backoff = Backoff(initial=500, maximum=100)
+        self.assertEqual(backoff.grow(), 500)
+
+
+class TestClipboardTranslator(unittest.TestCase):
+    """Test the tray app's slots on a real ClipboardTranslator under the offscreen platform"""
+
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        cls.port = find_free_port()
+        cls.server = ThreadingHTTPServer(('localhost', cls.port), MockOllamaHandler)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        MockOllamaHandler.should_fail = False
+        MockOllamaHandler.delay = 0.0
+        self.tmpdir = tempfile.TemporaryDirectory()
+        env = patch.dict(os.environ, {"XDG_DATA_HOME": self.tmpdir.name})
+        env.start()
+        self.addCleanup(env.stop)
+        QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope, self.tmpdir.name)
+        self.app.clipboard().clear()
+        self.translator = None
+
+    def tearDown(self):
+        if self.translator is not None:
+            self.translator._quit_app()
+            self.translator.tray_icon.hide()
+            self.translator.deleteLater()
+            self.app.processEvents()
+        self.tmpdir.cleanup()
+
+    def make_translator(self, **kwargs):
+        kwargs.setdefault("initial_source", "English")
+        kwargs.setdefault("initial_target", "French")
+        self.translator = ClipboardTranslator(base_url=f"http://localhost:{self.port}", **kwargs)
+        self.translator.show_notifications = False
+        return self.translator
+
+    def wait_until(self, condition, timeout=5.0):
+        """Run the event loop until condition() holds"""
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "timed out")
+            self.app.processEvents()
+            time.sleep(0.01)
+
+    def capture_jobs(self, translator):
+        """Replace the worker start with a list of started jobs; started jobs stay active"""
+        jobs = []
+
+        def run_job(job):
+            jobs.append(job)
+            translator.active_job = job
+
+        translator._run_job = run_job
+        return jobs
+
+    def copy(self, translator, text, signals=10, polls=3):
+        """A user copy announced by a burst of change signals and polls, then left to settle"""
+        translator.clipboard.setText(text)
+        for _ in range(signals):
+            translator._on_clipboard_changed()
+        for _ in range(polls):
+            translator._poll_clipboard()
+        self.wait_until(lambda: not translator.ingest_timer.isActive())
+        self.app.processEvents()
+
+    def test_clipboard_burst_starts_one_job(self):
+        """Test a copy reported by many signals and polls starts exactly one job and later copies queue"""
+        translator = self.make_translator(debounce_ms=20)
+        jobs = self.capture_jobs(translator)
+
+        self.copy(translator, "Good morning, how are you today?")
+        self.assertEqual([job.text for job in jobs], ["Good morning, how are you today?"])
+        self.assertEqual(translator.clipboard_gate.accepted, 1)
+
+        # Copies made while that job runs coalesce into one queued job for the newest.
+        self.copy(translator, "See you at the station tomorrow.")
+        self.copy(translator, "The meeting has been moved to Friday.")
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(len(translator.job_queue), 1)
+        self.assertEqual(translator.job_queue.pop().text, "The meeting has been moved to Friday.")
+
+        # Our own write back is never taken for a copy.
+        translator._copy_to_clipboard("Bonjour, comment allez-vous ?")
+        self.copy(translator, "Bonjour, comment allez-vous ?")
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(len(translator.job_queue), 0)
+
+    def test_clipboard_admission_and_skip(self):
+        """Test oversized copies are rejected or deferred and untranslatable ones skipped, before any job"""
+        translator = self.make_translator(debounce_ms=20, max_chars=5000, confirm_chars=1000)
+        jobs = self.capture_jobs(translator)
+
+        self.copy(translator, "word " * 1200)
+        self.assertEqual(translator.skipped_texts["too large"], 1)
+        self.copy(translator, "https://example.com/some/page")
+        self.assertEqual(translator.skipped_texts[REASON_URL], 1)
+        large = "Another sentence to translate. " * 40
+        self.copy(translator, large)
+        self.assertEqual(translator.deferred_text, large)
+        self.assertEqual(jobs, [])
+
+        translator._translate_deferred()
+        self.assertEqual([job.text for job in jobs], [large])
+        self.assertIsNone(translator.deferred_text)
+
+    def test_prefetch_config_without_admission_chunking(self):
+        """Test a text chunked to fit the context is prefetched under the key a foreground request computes"""
+        translator = self.make_translator(context_length=1000, confirm_chars=0)
+        translator.use_cache = True
+        translator.prefetch_targets = ["German"]
+        jobs = self.capture_jobs(translator)
+        text = "Sentence number one is right here. " * 60
+
+        translator._process_text(text)
+        self.assertEqual(jobs[0].config["chunk_size"], translator.chunk_size)
+        self.assertLess(jobs[0].config["max_chunk_chars"], translator.chunk_size)
+        with patch.object(translator.prefetcher, "submit", return_value=1) as submit:
+            translator._on_translation_finished(text, "Übersetzung")
+        prefetch_config = submit.call_args.args[1]
+        self.assertEqual(prefetch_config["chunk_size"], translator.chunk_size)
+
+        translator._set_target_lang("German")
+        translator._process_text(text)
+        expected = TranslationCache.make_key(text, dict(prefetch_config, target_lang="German"))
+        self.assertEqual(jobs[-1].cache_key, expected)
+
+    def test_cancel_resumes_prefetcher(self):
+        """Test cancelling the foreground translation lets paused speculative work continue"""
+        MockOllamaHandler.delay = 0.05
+        translator = self.make_translator()
+        translator._start_translation("Good morning to everyone here")
+        self.assertTrue(translator.prefetcher._paused)
+        translator.cancel_translation()
+        self.assertFalse(translator.prefetcher._paused)
+
+    def test_memory_reuse_not_cached(self):
+        """Test a translation adapted from a memory match is not stored as an exact cache entry"""
+        translator = self.make_translator()
+        translator.use_cache = True
+        translator.use_memory = True
+        translator.memory.add(
+            "Connection 1234 closed by peer 10.0.0.1", "Connexion 1234 fermée par le pair 10.0.0.1", "English", "French"
+        )
+        translator._start_translation("Connection 9999 closed by peer 10.0.0.7")
+        self.assertEqual(translator.memory.reused, 1)
+        self.assertEqual(len(translator.cache), 0)
+        self.assertEqual(translator.history.recent(1)[0].translated, "Connexion 9999 fermée par le pair 10.0.0.7")
+
+    def test_history_uses_job_languages(self):
+        """Test a translation is recorded with the languages it ran with, not the current ones"""
+        translator = self.make_translator()
+        translator._start_translation("Good morning to everyone here")
+        # The worker's finished signal is only delivered once the event loop runs.
+        translator._set_target_lang("German")
+        self.wait_until(lambda: translator.history.recent(1))
+        entry = translator.history.recent(1)[0]
+        self.assertEqual((entry.source_lang, entry.target_lang), ("English", "French"))
+        self.assertIsNotNone(translator.memory.lookup("Good morning to everyone here", "English", "French"))
+        self.assertIsNone(translator.memory.lookup("Good morning to everyone here", "English", "German"))
+
+    def test_stale_worker_signals_ignored(self):
+        """Test signals from a worker that is no longer current do not touch the tray's state"""
+        translator = self.make_translator()
+        stale = TranslatorWorker("Hello", {"target_lang": "French"}, client=translator.client)
+        stale.timing.connect(translator._on_translation_timing)
+        stale.generated.connect(translator._on_translation_generated)
+        stale.timing.emit(120.0, 0.0)
+        stale.generated.emit(GenerationStats(eval_count=3))
+        self.assertEqual(translator.first_token_stats.counts, {"cold": 0, "warm": 0})
+        self.assertIsNone(translator.generation_stats)
+
+    def test_memory_loaded_off_gui_thread(self):
+        """Test startup reads the history for the translation memory on a background thread"""
+        store = HistoryStore(default_history_path())
+        store.add(TranslationEntry.now("Good morning", "Bonjour", "English", "French"))
+        store.close()
+        threads = []
+        recent = HistoryStore.recent
+
+        def record(store, limit):
+            if limit > 10:  # the tray menu reads the 10 newest entries on the GUI thread
+                threads.append(threading.current_thread())
+            return recent(store, limit)
+
+        with patch.object(HistoryStore, "recent", record):
+            translator = self.make_translator()
+            self.wait_until(lambda: len(translator.memory) == 1)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+
+class TestCli(unittest.TestCase):
+    """Test the headless translate subcommand"""
+
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.port = find_free_port()
+        cls.server = HTTPServer(('localhost', cls.port), MockOllamaHandler)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        MockOllamaHandler.should_fail = False
+        MockOllamaHandler.response_text = "Bonjour"
+        MockOllamaHandler.delay = 0.0
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        MockOllamaHandler.response_text = "This is a test translation."
+        self.tmpdir.cleanup()
+
+    def run_cli(self, args, stdin_text=""):
+        import io
+        stdout = io.StringIO()
+        argv = ["--base-url", f"http://localhost:{self.port}", "--no-cache", "--target", "French"] + args
+        code = translate_command(argv, stdin=io.StringIO(stdin_text), stdout=stdout)
+        return code, stdout.getvalue()
+
+    def test_stdin_lines_jsonl(self):
+        """Test each stdin line becomes one ordered JSON record"""
+        code, output = self.run_cli(["--lines", "--format", "jsonl", "--jobs", "3"], "one\n\ntwo\nthree\n")
+        self.assertEqual(code, 0)
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([r["original"] for r in records], ["one", "two", "three"])
+        self.assertEqual([r["line"] for r in records], [1, 3, 4])
+        self.assertTrue(all(r["translated"] == "Bonjour" for r in records))
+
+    def test_glob_to_output_dir(self):
+        """Test globbed files are written next to each other with the target code"""
+        for name in ("a.txt", "b.txt"):
+            with open(os.path.join(self.tmpdir.name, name), "w", encoding="utf-8") as f:
+                f.write("Hello\n")
+        out_dir = os.path.join(self.tmpdir.name, "out")
+        code, _ = self.run_cli([os.path.join(self.tmpdir.name, "*.txt"), "--output-dir", out_dir])
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(os.listdir(out_dir)), ["a.fr.txt", "b.fr.txt"])
+        with open(os.path.join(out_dir, "a.fr.txt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "Bonjour\n")
+
+    def test_errors_reported(self):
+        """Test failures keep the original text and set a non-zero exit code"""
+        MockOllamaHandler.should_fail = True
+        code, output = self.run_cli(["--lines", "--retries", "0"], "one\n")
+        self.assertEqual(code, 1)
+        self.assertEqual(output, "one\n")
+
+    def test_missing_input(self):
+        """Test an unmatched pattern exits with code 2"""
+        code, _ = self.run_cli([os.path.join(self.tmpdir.name, "missing.txt")])
+        self.assertEqual(code, 2)
+
+    def test_ordered_map_stops_on_close(self):
+        """Test stopping early drops queued items and cancels running ones before waiting"""
+        release = threading.Event()
+        started = []
+
+        def slow(item):
+            if item.line:
+                started.append(item.line)
+                release.wait(5)
+            return BatchResult(item, translated=item.text)
+
+        items = [BatchItem("-", n, str(n)) for n in range(20)]
+        results = ordered_map(slow, items, 2, cancel=release.set)
+        self.assertEqual(next(results).translated, "0")
+        begin = time.monotonic()
+        results.close()
+        self.assertLess(time.monotonic() - begin, 2)
+        self.assertLessEqual(len(started), 2)
+
+    def test_history_search(self):
+        """Test the history subcommand prints matching entries as JSON"""
+        import io
+        path = os.path.join(self.tmpdir.name, "history.sqlite3")
+        store = HistoryStore(path)
+        store.add(TranslationEntry.now("Hello", "Bonjour", "English", "French"))
+        store.add(TranslationEntry.now("Goodbye", "Au revoir", "English", "French"))
+        store.close()
+        stdout = io.StringIO()
+        code = history_command(["revoir", "--db", path, "--format", "jsonl"], stdout=stdout)
+        self.assertEqual(code, 0)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([r["original"] for r in records], ["Goodbye"])
+        self.assertEqual(history_command(["missing", "--db", path], stdout=io.StringIO()), 1)
+
+    def snapshot(self, path):
+        """Return the mtime and content of a file"""
+        with open(path, "rb") as f:
+            return os.stat(path).st_mtime_ns, f.read()
+
+    def test_history_leaves_database_untouched(self):
+        """Test a history search neither writes to nor creates the database"""
+        import io
+        path = os.path.join(self.tmpdir.name, "history.sqlite3")
+        store = HistoryStore(path, RetentionPolicy(max_entries=None))
+        for n in range(5):
+            store.add(TranslationEntry.now(f"Hello {n}", "Bonjour", "English", "French"))
+        store.close()
+        before = self.snapshot(path)
+        for query in (["Hello"], ["He"], []):
+            stdout = io.StringIO()
+            self.assertEqual(history_command(query + ["--db", path, "--limit", "10"], stdout=stdout), 0)
+            self.assertEqual(stdout.getvalue().count("Bonjour"), 5)
+        self.assertEqual(self.snapshot(path), before)
+
+        missing = os.path.join(self.tmpdir.name, "missing.sqlite3")
+        self.assertEqual(history_command(["--db", missing], stdout=io.StringIO()), 2)
+        self.assertFalse(os.path.exists(missing))
+
+    def test_history_reads_legacy_database(self):
+        """Test a database from before the stats columns and the FTS index is searched without migrating it"""
+        import io
+        import sqlite3
+        path = os.path.join(self.tmpdir.name, "history.sqlite3")
+        db = sqlite3.connect(path)
+        db.execute(
+            "CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, original TEXT NOT NULL, "
+            "translated TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, "
+            "timestamp TEXT NOT NULL, created REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        db.execute("INSERT INTO history VALUES (1, 'Goodbye', 'Au revoir', 'English', 'French', 't', 0, 16)")
+        db.commit()
+        db.close()
+        before = self.snapshot(path)
+        stdout = io.StringIO()
+        self.assertEqual(history_command(["revoir", "--db", path, "--format", "jsonl"], stdout=stdout), 0)
+        record = json.loads(stdout.getvalue())
+        self.assertEqual((record["original"], record["model"], record["eval_count"]), ("Goodbye", "", None))
+        self.assertEqual(self.snapshot(path), before)
+
+
+class TestImportTime(unittest.TestCase):
+    """Test the GUI-free core stays cheap to import"""
+
+    BUDGET_MS = 50
+
+    def import_profile(self, statement):
+        """Return ({module: cumulative_us}, total_us) for top-level transpaste imports"""
+        import subprocess
+        src = os.path.join(os.path.dirname(__file__), '..', 'src')
+        env = dict(os.environ, PYTHONPATH=src)
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, env=env
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        modules = {}
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+                if name.startswith(" transpaste"):
+                    total += int(cumulative)
+        return modules, total
+
+    def test_build_prompt_import_budget(self):
+        """Test importing build_prompt loads neither Qt nor requests and stays within budget"""
+        modules, total = self.import_profile("from transpaste import build_prompt, TranslationEntry")
+        self.assertFalse([m for m in modules if m.startswith(("PySide6", "requests"))])
+        self.assertLess(total / 1000, self.BUDGET_MS)
+
+    def test_core_modules_avoid_qt(self):
+        """Test no core module pulls in PySide6"""
+        modules, _ = self.import_profile(
+            "import transpaste.core.cache, transpaste.core.history, transpaste.core.memory, transpaste.core.metrics, "
+            "transpaste.core.admission, transpaste.core.detect, transpaste.core.ingest, transpaste.core.postprocess, "
+            "transpaste.core.prefetch, transpaste.core.progress, transpaste.core.stream, transpaste.core.translator, transpaste.cli"
+        )
+        self.assertFalse([m for m in modules if m.startswith("PySide6")])
+
 
 class TestSetupLogging(unittest.TestCase):
     """Test logging setup"""
 
     def test_debug_mode(self):
         """Test debug logging setup"""
-        transpaste_main.setup_logging(debug=True)
-        self.assertTrue(transpaste_main.DEBUG)
+        core_log.setup_logging(debug=True)
+        self.assertTrue(core_log.DEBUG)
 
     def test_normal_mode(self):
         """Test normal logging setup"""
-        transpaste_main.setup_logging(debug=False)
-        self.assertFalse(transpaste_main.DEBUG)
+        core_log.setup_logging(debug=False)
+        self.assertFalse(core_log.DEBUG)
 
 
 def run_tests():
@@ -539,9 +2623,30 @@ def run_tests():
         TestIconGenerator,
         TestPromptBuilder,
         TestTranslatorWorker,
+        TestOllamaClient,
+        TestBalancedClient,
         TestConstants,
         TestEdgeCases,
         TestTranslationEntry,
+        TestHistoryStore,
+        TestTranslationMemory,
+        TestWarmup,
+        TestProgress,
+        TestProgressThrottle,
+        TestAdmission,
+        TestClipboardIngestion,
+        TestStreamDecoding,
+        TestPostProcess,
+        TestLanguageDetection,
+        TestMetrics,
+        TestSegmenter,
+        TestTranslationCache,
+        TestPrefetcher,
+        TestJobQueue,
+        TestBackoff,
+        TestClipboardTranslator,
+        TestCli,
+        TestImportTime,
         TestSetupLogging,
     ]
 